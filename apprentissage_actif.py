@@ -0,0 +1,217 @@
+"""
+APPRENTISSAGE ACTIF — apprentissage_actif.py
+Boucle simulateur ↔ trainer pilotée par l'erreur :
+  1. simulation grossière (n_init points) puis entraînement du MLP
+  2. évaluation du MLP sur une grille dense (coût négligeable)
+  3. estimation de l'erreur relative sur la grille : désaccord entre le MLP
+     et l'interpolation des points déjà simulés, et résidus interpolés du
+     MLP sur ces points
+  4. simulation uniquement des n_ajout tensions les plus suspectes,
+     ajout au jeu d'entraînement et reprise de l'entraînement (mêmes poids)
+Arrêt dès que E_rel sur la simulation de référence (simulateur.simuler,
+jamais vue à l'entraînement) passe sous metriques.SEUIL_IA_PASS.
+Sortie : même format que trainer.entrainer (modèle .keras, scalers, base,
+prédiction et métriques sur le balayage de référence) ; les points simulés
+retenus vont dans models/{nom}_points_actifs.npz, la simulation de
+référence en base reste inchangée.
+"""
+
+import json
+import os
+import sqlite3
+import numpy as np
+import joblib
+
+from metriques import SEUIL_IA_PASS, toutes_metriques
+
+DB_PATH    = os.path.join(os.path.dirname(__file__), "composants_db.sqlite")
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
+
+
+def _erreur_relative(I_ref: np.ndarray, I_pred: np.ndarray,
+                     epsilon: float = 1e-15) -> np.ndarray:
+    """Erreur relative point par point (même définition que calcul_erreur_rel)."""
+    return np.abs(I_ref - I_pred) / (np.abs(I_ref) + epsilon)
+
+
+def selectionner_points(V_grille: np.ndarray, erreur: np.ndarray,
+                        V_connus: np.ndarray, n_ajout: int) -> np.ndarray:
+    """
+    Sélectionne jusqu'à n_ajout tensions de la grille, par erreur décroissante,
+    en imposant un espacement minimal (1.5 pas de grille) entre elles et
+    avec les points déjà simulés.
+    """
+    ecart_min = 1.5 * float(np.min(np.diff(V_grille))) if len(V_grille) > 1 else 0.0
+    choisis: list[float] = []
+    connus = np.sort(V_connus)
+    for idx in np.argsort(erreur)[::-1]:
+        if len(choisis) >= n_ajout or erreur[idx] <= 0:
+            break
+        v = V_grille[idx]
+        pos = np.searchsorted(connus, v)
+        voisins = connus[max(0, pos - 1):pos + 1]
+        if voisins.size and np.min(np.abs(voisins - v)) <= ecart_min:
+            continue
+        if choisis and np.min(np.abs(np.asarray(choisis) - v)) <= ecart_min:
+            continue
+        choisis.append(v)
+    return np.sort(np.asarray(choisis, dtype=np.float64))
+
+
+def chemin_points_actifs(composant_nom: str) -> str:
+    return os.path.join(MODELS_DIR, f"{composant_nom}_points_actifs.npz")
+
+
+def enregistrer_points_actifs(composant_nom: str, V: np.ndarray, I: np.ndarray) -> str:
+    """
+    Sauvegarde les points simulés par la boucle active, à part de la
+    simulation de référence en base (balayage complet utilisé par les
+    rapports E_rel, la calibration PTQ/QAT et charger_simulation).
+    """
+    chemin = chemin_points_actifs(composant_nom)
+    np.savez(chemin, V=np.asarray(V, dtype=np.float64), I=np.asarray(I, dtype=np.float64))
+    return chemin
+
+
+def charger_points_actifs(composant_nom: str) -> tuple[np.ndarray, np.ndarray] | None:
+    chemin = chemin_points_actifs(composant_nom)
+    if not os.path.exists(chemin):
+        return None
+    with np.load(chemin) as donnees:
+        return donnees["V"], donnees["I"]
+
+
+def entrainer_actif(composant_nom: str,
+                    V_min: float = -5.0,
+                    V_max: float = 1.2,
+                    n_init: int = 80,
+                    n_ajout: int = 40,
+                    n_grille: int = 5000,
+                    max_iterations: int = 20,
+                    epochs_iteration: int = 100,
+                    seuil: float = SEUIL_IA_PASS) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Entraîne le MLP en ne simulant que les points où le modèle se trompe.
+
+    Args:
+        composant_nom:    Nom du composant (ex: '1N4007')
+        V_min, V_max:     Domaine de tension
+        n_init:           Points simulés au départ (sweep type simulateur)
+        n_ajout:          Points simulés ajoutés par itération
+        n_grille:         Taille de la grille dense d'évaluation du MLP
+        max_iterations:   Nombre max d'itérations simulation → entraînement
+        epochs_iteration: Époques max par itération (EarlyStopping sur loss)
+        seuil:            E_rel (%) visé sur la simulation de référence,
+                          défaut SEUIL_IA_PASS
+
+    Returns:
+        (V_pred, I_pred) sur le balayage de la simulation de référence
+    """
+    if max_iterations < 1:
+        raise ValueError(f"max_iterations doit être ≥ 1 (reçu {max_iterations}).")
+
+    from tensorflow import keras
+    from sklearn.preprocessing import MinMaxScaler
+    from simulateur import charger_simulation, simuler_points
+    from trainer import _build_model, _chemin_meta, _enregistrer_modele_ia
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, params_json FROM composants WHERE nom = ?",
+                   (composant_nom,))
+    row = cursor.fetchone()
+    conn.close()
+    if not row:
+        raise ValueError(f"Composant '{composant_nom}' introuvable.")
+    comp_id, params = row[0], json.loads(row[1])
+
+    # Référence d'évaluation : balayage complet, hors jeu d'entraînement
+    sim = charger_simulation(composant_nom)
+    if sim is None:
+        raise ValueError(f"Aucune simulation pour '{composant_nom}'. "
+                         f"Lancez simulateur.py d'abord.")
+    V_sim, I_sim = sim
+
+    # Sweep initial grossier (même répartition que simulateur.simuler)
+    V_train = np.unique(np.concatenate([
+        np.linspace(V_min, 0.4, n_init // 4),
+        np.linspace(0.4, 0.9, n_init // 2),
+        np.linspace(0.9, V_max, n_init // 4),
+    ]))
+    I_train = simuler_points(composant_nom, V_train)
+    V_grille = np.linspace(V_min, V_max, n_grille)
+
+    # Normalisation fixée sur le domaine complet (grille et balayage de référence)
+    scaler_V = MinMaxScaler(feature_range=(0, 1)).fit(
+        np.concatenate([V_grille, V_sim]).reshape(-1, 1))
+    scaler_I = MinMaxScaler(feature_range=(0, 1)).fit(I_train.reshape(-1, 1))
+
+    model = _build_model()
+    callbacks = [keras.callbacks.EarlyStopping(
+        monitor="loss", patience=15, restore_best_weights=True, verbose=0
+    )]
+
+    def _predire(V: np.ndarray) -> np.ndarray:
+        I_s = model.predict(scaler_V.transform(V.reshape(-1, 1)),
+                            batch_size=4096, verbose=0)
+        return scaler_I.inverse_transform(I_s).flatten()
+
+    print(f"[ACTIF] '{composant_nom}': départ avec {len(V_train)} points simulés.")
+    e_rel = float("inf")
+    for iteration in range(1, max_iterations + 1):
+        model.fit(
+            scaler_V.transform(V_train.reshape(-1, 1)),
+            scaler_I.transform(I_train.reshape(-1, 1)),
+            epochs=epochs_iteration, batch_size=64,
+            callbacks=callbacks, verbose=0,
+        )
+
+        e_rel = toutes_metriques(I_sim, _predire(V_sim))["E_rel_%"]
+        print(f"[ACTIF] Itération {iteration}: {len(V_train)} points simulés, "
+              f"E_rel={e_rel:.2f}% sur la référence (seuil {seuil}%)")
+        if e_rel < seuil or iteration == max_iterations:
+            break
+
+        # Estimation de l'erreur sur la grille dense (sans simulation)
+        I_fit     = _predire(V_train)
+        I_grille  = _predire(V_grille)
+        I_interp  = np.interp(V_grille, V_train, I_train)
+        residus   = np.interp(V_grille, V_train, _erreur_relative(I_train, I_fit))
+        estimation = np.maximum(_erreur_relative(I_interp, I_grille), residus)
+
+        V_nouveaux = selectionner_points(V_grille, estimation, V_train, n_ajout)
+        if V_nouveaux.size == 0:
+            print("[ACTIF] Plus aucun point candidat — arrêt.")
+            break
+        I_nouveaux = simuler_points(composant_nom, V_nouveaux)
+
+        ordre   = np.argsort(np.concatenate([V_train, V_nouveaux]))
+        V_train = np.concatenate([V_train, V_nouveaux])[ordre]
+        I_train = np.concatenate([I_train, I_nouveaux])[ordre]
+
+    # Persistance (mêmes artefacts que trainer.entrainer)
+    model_path = os.path.join(MODELS_DIR, f"{composant_nom}_model.keras")
+    joblib.dump(scaler_V, os.path.join(MODELS_DIR, f"{composant_nom}_scaler_V.pkl"))
+    joblib.dump(scaler_I, os.path.join(MODELS_DIR, f"{composant_nom}_scaler_I.pkl"))
+    model.save(model_path)
+    chemin_points = enregistrer_points_actifs(composant_nom, V_train, I_train)
+    with open(_chemin_meta(composant_nom), "w", encoding="utf-8") as f:
+        json.dump({"parametres": params, "init_from": None,
+                   "apprentissage_actif": {"points_simules": int(len(V_train)),
+                                           "iterations": iteration,
+                                           "fichier_points": os.path.basename(chemin_points)}},
+                  f, indent=2)
+
+    V_pred, I_pred = V_sim.copy(), _predire(V_sim)
+    m = toutes_metriques(I_sim, I_pred)
+    _enregistrer_modele_ia(comp_id, model_path, V_pred, I_pred, m)
+    print(f"[ACTIF] Terminé: {len(V_train)} points simulés, {iteration} itérations | "
+          f"E_rel={m['E_rel_%']:.2f}% | R²={m['R2']:.6f}")
+    return V_pred, I_pred
+
+
+if __name__ == "__main__":
+    import sys
+    nom = sys.argv[1] if len(sys.argv) > 1 else "1N4007"
+    V, I = entrainer_actif(nom)
+    print(f"\nApprentissage actif pour {nom}: prédiction sur {len(V)} points")
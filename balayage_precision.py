@@ -0,0 +1,347 @@
+"""
+BALAYAGE DE PRÉCISION — balayage_precision.py
+Exploration de l'espace des types virgule fixe pour la conversion HLS :
+  1. profilage des plages (poids, biais, accumulateurs, sorties) par couche
+     → nombre de bits entiers nécessaires
+  2. grille évaluée en parallèle (émulation bit-exacte virgule_fixe, sans
+     TensorFlow) : ap_fixed<W,I> pour W = 6..18, modes AP_TRN/AP_WRAP et
+     AP_RND/AP_SAT, bits entiers uniformes ou adaptés à chaque couche
+  3. affinage glouton par couche : réduction de la largeur d'une couche à
+     la fois tant que le critère reste respecté (précisions mixtes)
+Chaque configuration est notée par E_rel (vs modèle flottant ou simulation)
+et par une estimation DSP / BRAM18 ; la moins coûteuse respectant
+SEUIL_HLS_PASS est retenue.
+"""
+
+import json
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from metriques import SEUIL_HLS_PASS, calcul_erreur_rel, calcul_mae, calcul_r2
+from virgule_fixe import charger_couches, emuler_reseau, quantifier
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
+
+LARGEURS = tuple(range(6, 19))
+MODES = {
+    "trn_wrap": "",                  # défauts ap_fixed : AP_TRN, AP_WRAP
+    "rnd_sat":  ",AP_RND,AP_SAT",
+}
+TYPES = ("data", "weight", "bias", "accum", "result")
+
+BITS_BRAM18    = 18 * 1024
+SEUIL_MULT_LUT = 20    # largeur du produit (bits poids + bits données) sous laquelle
+                       # le multiplieur est réalisé en LUT plutôt qu'en DSP48
+
+
+def _bits_entiers(maximum: float) -> int:
+    """Bits entiers (signe compris) pour représenter [-maximum, maximum]."""
+    if maximum <= 0:
+        return 1
+    return max(1, int(np.floor(np.log2(maximum))) + 2)
+
+
+def profiler(couches: list[dict], x: np.ndarray) -> list[dict]:
+    """Bits entiers nécessaires par couche et par type, mesurés en flottant sur x."""
+    h = np.asarray(x, dtype=np.float64).reshape(len(x), -1)
+    profil = []
+    for couche in couches:
+        acc = h @ couche["W"] + couche["b"]
+        sortie = np.maximum(acc, 0.0) if couche["activation"] == "relu" else acc
+        profil.append({
+            "data":   _bits_entiers(float(np.abs(h).max())),
+            "weight": _bits_entiers(float(np.abs(couche["W"]).max())),
+            "bias":   _bits_entiers(float(np.abs(couche["b"]).max())),
+            "accum":  _bits_entiers(float(np.abs(acc).max())),
+            "result": _bits_entiers(float(np.abs(sortie).max())),
+        })
+        h = sortie
+    return profil
+
+
+def _type(W: int, I: int, mode: str) -> str:
+    return f"ap_fixed<{W},{min(I, W)}{MODES[mode]}>"
+
+
+def _config(largeurs: list[int], mode: str, profil: list[dict], uniforme: bool) -> dict:
+    """Types par couche pour des largeurs données (bits entiers : profil)."""
+    if uniforme:
+        I = max(max(p.values()) for p in profil)
+        types = [{t: _type(W, I, mode) for t in TYPES} for W in largeurs]
+    else:
+        types = [{t: _type(W, p[t], mode) for t in TYPES} for W, p in zip(largeurs, profil)]
+    precision = types[0]["data"] if uniforme and len(set(largeurs)) == 1 else None
+    nom = precision or f"[{','.join(map(str, largeurs))}] {mode} par couche"
+    return {"nom": nom, "precision": precision, "mode": mode, "uniforme": uniforme,
+            "largeurs": list(largeurs), "types_par_couche": types}
+
+
+def configurations(profil: list[dict], largeurs=LARGEURS, modes=tuple(MODES)) -> list[dict]:
+    """Grille : chaque largeur × mode, bits entiers uniformes puis adaptés par couche."""
+    n = len(profil)
+    return [_config([W] * n, mode, profil, uniforme)
+            for W in largeurs for mode in modes for uniforme in (True, False)]
+
+
+def _dsp_par_multiplication(bits_poids: int, bits_data: int) -> int:
+    """DSP48 (multiplieur 25×18) par produit ; 0 si réalisé en LUT."""
+    if bits_poids + bits_data <= SEUIL_MULT_LUT:
+        return 0
+    a, b = sorted((bits_poids, bits_data))
+    return int(np.ceil(a / 18) * np.ceil(b / 25))
+
+
+def estimer_ressources(couches: list[dict], types_par_couche: list[dict]) -> dict:
+    """
+    DSP / BRAM18 / LUT-multiplieurs estimés (ReuseFactor 1). Les poids
+    nuls après quantification ne produisent pas de multiplieur
+    (propagation de constantes à la synthèse).
+    """
+    from virgule_fixe import parse_type
+
+    dsp = lut = bits_poids = 0
+    for couche, types in zip(couches, types_par_couche):
+        bw = parse_type(types["weight"])["W"]
+        # Entrée de la couche : son type data (sortie de la couche précédente)
+        bd = parse_type(types["data"])["W"]
+        n_mult = int(np.count_nonzero(quantifier(couche["W"], types["weight"])))
+        dsp_mult = _dsp_par_multiplication(bw, bd)
+        dsp += n_mult * dsp_mult
+        lut += n_mult * bw * bd if dsp_mult == 0 else 0
+        bits_poids += couche["W"].size * bw + couche["b"].size * parse_type(types["bias"])["W"]
+    return {
+        "estimated_dsp":      int(dsp),
+        "estimated_bram18":   int(np.ceil(bits_poids / BITS_BRAM18)),
+        "estimated_lut_mult": int(lut),
+        "bits_poids":         int(bits_poids),
+    }
+
+
+def _cout(r: dict) -> tuple:
+    return (r["estimated_dsp"], r["estimated_bram18"], r["estimated_lut_mult"],
+            r["bits_poids"], r["E_rel_%"])
+
+
+def front_pareto(resultats: list[dict]) -> list[dict]:
+    """Configurations non dominées en (coût matériel, E_rel), par coût croissant."""
+    front = []
+    for r in sorted(resultats, key=_cout):
+        if all(r["E_rel_%"] < f["E_rel_%"] for f in front):
+            front.append(r)
+    return front
+
+
+# ── Évaluation (processus de travail) ─────────────────────────────────────────
+_CONTEXTE: dict = {}
+
+
+def _initialiser(couches, x, reference, scaler_I, seuil):
+    _CONTEXTE.update(couches=couches, x=x, reference=reference,
+                     scaler_I=scaler_I, seuil=seuil)
+
+
+def _evaluer(config: dict) -> dict:
+    c = _CONTEXTE
+    y = emuler_reseau(c["x"], c["couches"], types_par_couche=config["types_par_couche"])
+    if c["scaler_I"] is not None:
+        y = c["scaler_I"].inverse_transform(y.reshape(-1, 1))
+    y = y.ravel()
+    e_rel = calcul_erreur_rel(c["reference"], y)
+    return {
+        **config,
+        "E_rel_%": e_rel,
+        "MAE":     calcul_mae(c["reference"], y),
+        "R2":      calcul_r2(c["reference"], y),
+        "passe":   e_rel < c["seuil"],
+        **estimer_ressources(c["couches"], config["types_par_couche"]),
+    }
+
+
+def _evaluer_lot(configs: list[dict], pool) -> list[dict]:
+    if pool is None:
+        return [_evaluer(c) for c in configs]
+    return list(pool.map(_evaluer, configs))
+
+
+def _affiner(meilleur: dict, profil: list[dict], pool, largeur_min: int,
+             vus: set) -> list[dict]:
+    """Réduit de 2 bits la largeur d'une couche à la fois, tant que ça passe."""
+    evalues = []
+    while True:
+        candidats = []
+        for k, W in enumerate(meilleur["largeurs"]):
+            if W - 2 >= largeur_min:
+                largeurs = list(meilleur["largeurs"])
+                largeurs[k] = W - 2
+                config = _config(largeurs, meilleur["mode"], profil, uniforme=False)
+                if config["nom"] not in vus:
+                    vus.add(config["nom"])
+                    candidats.append(config)
+        resultats = _evaluer_lot(candidats, pool)
+        evalues += resultats
+        passants = [r for r in resultats if r["passe"] and _cout(r) < _cout(meilleur)]
+        if not passants:
+            return evalues
+        meilleur = min(passants, key=_cout)
+
+
+def balayer(couches: list[dict], x: np.ndarray, reference: np.ndarray,
+            scaler_I=None, largeurs=LARGEURS, modes=tuple(MODES),
+            seuil: float = SEUIL_HLS_PASS, affiner: bool = True,
+            n_processus: int | None = None) -> dict:
+    """
+    Balayage de précision d'un MLP.
+
+    Args:
+        couches:     Couches Dense (virgule_fixe.charger_couches)
+        x:           Entrées normalisées de référence
+        reference:   Sortie attendue (mêmes unités que scaler_I.inverse_transform)
+        scaler_I:    Dénormalisation de la sortie (None : sortie brute)
+        largeurs:    Largeurs W évaluées
+        modes:       Clés de MODES
+        seuil:       E_rel (%) maximal accepté
+        affiner:     Recherche gloutonne de précisions mixtes par couche
+        n_processus: Processus de travail (défaut: nombre de cœurs)
+
+    Returns:
+        {'configurations': [...] triées par coût, 'front_pareto': noms
+         des configurations non dominées, 'optimal': config
+         la moins coûteuse qui passe (ou None), 'optimal_uniforme': idem
+         parmi les types uniques, 'profil': bits entiers par couche}
+    """
+    x = np.asarray(x, dtype=np.float64).reshape(len(x), -1)
+    profil = profiler(couches, x)
+    grille = configurations(profil, largeurs, modes)
+    n_processus = n_processus or os.cpu_count() or 1
+    contexte = (couches, x, np.asarray(reference, dtype=np.float64).ravel(), scaler_I, seuil)
+
+    print(f"[HLS] Balayage précision: {len(grille)} configurations, {n_processus} processus")
+    pool = None
+    if n_processus > 1:
+        pool = ProcessPoolExecutor(max_workers=n_processus, mp_context=mp.get_context("spawn"),
+                                   initializer=_initialiser, initargs=contexte)
+    else:
+        _initialiser(*contexte)
+    try:
+        resultats = _evaluer_lot(grille, pool)
+        passants = [r for r in resultats if r["passe"]]
+        if affiner and passants:
+            depart = min((r for r in passants if not r["uniforme"]), key=_cout, default=None)
+            if depart is not None:
+                resultats += _affiner(depart, profil, pool, min(largeurs),
+                                      {r["nom"] for r in resultats})
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    resultats.sort(key=_cout)
+    passants = [r for r in resultats if r["passe"]]
+    optimal = passants[0] if passants else None
+    optimal_uniforme = next((r for r in passants if r["precision"]), None)
+
+    front = front_pareto(resultats)
+    for r in front:
+        print(f"[HLS]   {r['nom']:<42} E_rel={r['E_rel_%']:>10.2f}% "
+              f"DSP={r['estimated_dsp']:>6} BRAM18={r['estimated_bram18']:>3} "
+              f"{'PASS' if r['passe'] else 'FAIL'}")
+    if optimal:
+        print(f"[HLS] Précision optimale: {optimal['nom']} "
+              f"(E_rel={optimal['E_rel_%']:.2f}%, DSP={optimal['estimated_dsp']})")
+    else:
+        meilleur = min(resultats, key=lambda r: r["E_rel_%"])
+        print(f"[HLS] Aucune configuration sous {seuil}% "
+              f"(meilleure: {meilleur['nom']}, E_rel={meilleur['E_rel_%']:.2f}%)")
+
+    return {"configurations": resultats, "front_pareto": [r["nom"] for r in front],
+            "optimal": optimal,
+            "optimal_uniforme": optimal_uniforme, "profil": profil, "seuil": seuil}
+
+
+def config_hls4ml(resultat: dict, couches: list[dict]) -> dict:
+    """Précisions par couche au format hls_config['LayerName'] de hls4ml."""
+    return {
+        couche["nom"]: {"Precision": {"weight": types["weight"], "bias": types["bias"],
+                                      "accum": types["accum"], "result": types["result"]}}
+        for couche, types in zip(couches, resultat["types_par_couche"])
+    }
+
+
+def balayer_precisions(composant_nom: str, reference: str = "modele",
+                       modele: str = "auto", **kwargs) -> dict:
+    """
+    Balayage sur la simulation d'un composant entraîné.
+
+    Args:
+        composant_nom: Nom du composant (ex: '1N4007')
+        reference:     'modele' (sortie flottante du MLP : erreur due à la
+                       seule quantification) ou 'simulation'
+        modele:        cf. hls_converter.chemin_modele_hls
+        **kwargs:      Transmis à balayer
+
+    Returns:
+        Résultat de balayer ; aussi écrit dans
+        models/{composant}_balayage_precision.json
+    """
+    import registre_modeles
+    from hls_converter import chemin_modele_hls
+    from simulateur import charger_simulation
+
+    sim = charger_simulation(composant_nom)
+    if sim is None:
+        raise ValueError(f"Aucune simulation pour '{composant_nom}'.")
+    V_sim, I_sim = sim
+    model_path = chemin_modele_hls(composant_nom, modele)
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(
+            f"Modèle introuvable: {model_path}. Entraînez d'abord avec trainer.py."
+        )
+    couches = charger_couches(model_path)
+    scaler_V, scaler_I = registre_modeles.charger_scalers(composant_nom)
+    x = scaler_V.transform(V_sim.reshape(-1, 1))
+
+    if reference == "simulation":
+        I_ref = I_sim
+    else:
+        flottant = {t: "float" for t in TYPES}
+        I_ref = scaler_I.inverse_transform(emuler_reseau(x, couches, flottant)).ravel()
+
+    resultat = balayer(couches, x, I_ref, scaler_I=scaler_I, **kwargs)
+    if resultat["optimal"]:
+        resultat["config_hls4ml"] = config_hls4ml(resultat["optimal"], couches)
+
+    chemin = os.path.join(MODELS_DIR, f"{composant_nom}_balayage_precision.json")
+    with open(chemin, "w") as f:
+        json.dump({"composant": composant_nom, "reference": reference,
+                   "modele": os.path.basename(model_path), **resultat}, f, indent=2)
+    print(f"[HLS] Balayage enregistré: {chemin}")
+    return resultat
+
+
+def balayer_modele(model_path: str, n_points: int = 2048, seed: int = 0, **kwargs) -> dict:
+    """
+    Balayage pour un modèle importé sans données : entrées uniformes dans
+    [0, 1] (domaine MinMax), référence = sortie flottante du modèle.
+    """
+    if model_path.endswith(".keras"):
+        couches = charger_couches(model_path)
+    else:
+        import registre_modeles
+        from virgule_fixe import couches_depuis_keras
+        couches = couches_depuis_keras(registre_modeles.charger_modele(model_path))
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(0.0, 1.0, (n_points, couches[0]["W"].shape[0]))
+    reference = emuler_reseau(x, couches, {t: "float" for t in TYPES})
+    resultat = balayer(couches, x, reference, **kwargs)
+    if resultat["optimal"]:
+        resultat["config_hls4ml"] = config_hls4ml(resultat["optimal"], couches)
+    return resultat
+
+
+if __name__ == "__main__":
+    import sys
+    nom = sys.argv[1] if len(sys.argv) > 1 else "1N4007"
+    ref = sys.argv[2] if len(sys.argv) > 2 else "modele"
+    balayer_precisions(nom, reference=ref)
@@ -0,0 +1,221 @@
+"""
+BANC DE TEST C++ — banc_de_test.py
+Compilation locale (g++/clang++, sans Vivado) du firmware généré par
+hls_converter._generer_firmware_simule et digital_hls_service :
+  - firmware/shim/ : en-têtes ap_fixed.h / ap_int.h / hls_stream.h portables
+    (shim_hls/), utilisés uniquement hors Vivado (-I firmware/shim)
+  - myproject_test.cpp : lit tb_data/tb_input_features.dat, écrit
+    tb_data/csim_results.log et mesure le débit d'inférence natif ;
+    firmware io_stream (IO_STREAM) appelé avec un paquet par inférence
+  - comparaison des sorties C++ à la référence Python (émulation
+    virgule_fixe / quantification_ptq) : écart max, bit-exactitude
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import time
+
+import numpy as np
+
+SHIM_DIR = os.path.join(os.path.dirname(__file__), "shim_hls")
+
+OPTIONS_COMPILATION = ["-std=c++14", "-O2", "-ffp-contract=off"]
+DUREE_MESURE_S = 0.5          # durée minimale de la mesure de débit
+TIMEOUT_COMPILATION_S = 600
+TIMEOUT_EXECUTION_S = 300
+
+TESTBENCH_CPP = """// Banc de test C++ — {nom} (généré par banc_de_test.py)
+// Compilation hors Vivado : g++ -I firmware -I firmware/shim myproject_test.cpp firmware/myproject.cpp
+#include <chrono>
+#include <cstdio>
+#include <fstream>
+#include <sstream>
+#include <string>
+#include <vector>
+
+#include "firmware/myproject.h"
+
+#ifdef IO_STREAM
+// io_stream : un paquet d'entrée et un paquet de sortie par inférence
+static void inference(data_t input[N_INPUTS], result_t output[N_OUTPUTS]) {{
+    hls::stream<input_t> entree("input");
+    hls::stream<output_t> sortie("output");
+    input_t paquet;
+    for (int k = 0; k < N_INPUTS; k++) paquet.data[k] = input[k];
+    entree.write(paquet);
+    myproject(entree, sortie);
+    const output_t resultat = sortie.read();
+    for (int k = 0; k < N_OUTPUTS; k++) output[k] = resultat.data[k];
+}}
+#else
+static void inference(data_t input[N_INPUTS], result_t output[N_OUTPUTS]) {{ myproject(input, output); }}
+#endif
+
+int main() {{
+    std::ifstream fin("tb_data/tb_input_features.dat");
+    if (!fin) {{
+        std::fprintf(stderr, "tb_data/tb_input_features.dat introuvable\\n");
+        return 1;
+    }}
+    std::vector<std::vector<double> > entrees;
+    std::string ligne;
+    while (std::getline(fin, ligne)) {{
+        if (ligne.empty() || ligne[0] == '#') continue;
+        std::istringstream flux(ligne);
+        std::vector<double> x;
+        double v;
+        while (flux >> v) x.push_back(v);
+        if ((int)x.size() == N_INPUTS) entrees.push_back(x);
+    }}
+
+#ifdef WEIGHTS_BIN
+    // Poids binaires (poids_hls.EcrivainPoids) chargés avant la première inférence
+    if (!load_weights("firmware/weights")) {{
+        std::fprintf(stderr, "firmware/weights/*.bin illisibles\\n");
+        return 1;
+    }}
+#endif
+
+    data_t input[N_INPUTS];
+    result_t output[N_OUTPUTS];
+    FILE* fout = std::fopen("tb_data/csim_results.log", "w");
+    for (size_t n = 0; n < entrees.size(); n++) {{
+        for (int k = 0; k < N_INPUTS; k++) input[k] = entrees[n][k];
+        inference(input, output);
+        for (int k = 0; k < N_OUTPUTS; k++)
+            std::fprintf(fout, k ? " %.17g" : "%.17g", (double)output[k]);
+        std::fprintf(fout, "\\n");
+    }}
+    std::fclose(fout);
+
+    // Débit natif : passes complètes sur les entrées pendant au moins {duree} s
+    typedef std::chrono::steady_clock horloge;
+    const horloge::time_point t0 = horloge::now();
+    double duree = 0.0, controle = 0.0;
+    long inferences = 0;
+    while (!entrees.empty() && duree < {duree}) {{
+        for (size_t n = 0; n < entrees.size(); n++) {{
+            for (int k = 0; k < N_INPUTS; k++) input[k] = entrees[n][k];
+            inference(input, output);
+            controle += (double)output[0];
+        }}
+        inferences += (long)entrees.size();
+        duree = std::chrono::duration<double>(horloge::now() - t0).count();
+    }}
+    std::printf("SAMPLES %zu\\n", entrees.size());
+    std::printf("INFERENCES %ld\\n", inferences);
+    std::printf("SECONDS %.6f\\n", duree);
+    std::printf("CHECKSUM %.17g\\n", controle);
+    return 0;
+}}
+"""
+
+
+def compilateur() -> str | None:
+    """Compilateur C++ disponible ($CXX, g++, clang++), None sinon."""
+    for candidat in (os.environ.get("CXX"), "g++", "clang++", "c++"):
+        if candidat and shutil.which(candidat):
+            return shutil.which(candidat)
+    return None
+
+
+def ecrire_banc_de_test(proj_dir: str, nom: str = "myproject") -> str:
+    """Copie le shim dans firmware/shim et écrit myproject_test.cpp ; retourne son chemin."""
+    shim_dst = os.path.join(proj_dir, "firmware", "shim")
+    os.makedirs(shim_dst, exist_ok=True)
+    for fichier in os.listdir(SHIM_DIR):
+        if fichier.endswith(".h"):
+            shutil.copyfile(os.path.join(SHIM_DIR, fichier), os.path.join(shim_dst, fichier))
+    chemin = os.path.join(proj_dir, "myproject_test.cpp")
+    with open(chemin, "w", encoding="utf-8") as f:
+        f.write(TESTBENCH_CPP.format(nom=nom, duree=DUREE_MESURE_S))
+    return chemin
+
+
+def comparer(sorties: np.ndarray, reference: np.ndarray) -> dict:
+    """Écart entre sorties C++ et référence Python (même domaine, mêmes échantillons)."""
+    sorties = np.asarray(sorties, dtype=np.float64).reshape(len(reference), -1)
+    reference = np.asarray(reference, dtype=np.float64).reshape(len(reference), -1)
+    ecart = np.abs(sorties - reference)
+    return {
+        "ecart_max": float(ecart.max()) if ecart.size else 0.0,
+        "n_differences": int(np.count_nonzero(ecart)),
+        "bit_exact": bool(not np.any(ecart)),
+    }
+
+
+def executer_csim(proj_dir: str, reference: np.ndarray | None = None,
+                  nom: str = "myproject") -> dict:
+    """
+    Écrit, compile et exécute le banc de test du projet.
+
+    Args:
+        proj_dir:  Dossier projet (firmware/, tb_data/tb_input_features.dat)
+        reference: Sorties attendues (n, N_OUTPUTS) pour les entrées du banc
+        nom:       Nom affiché dans l'en-tête du banc de test
+
+    Returns:
+        {statut, compilateur, compilation_s, echantillons, debit_inferences_s,
+         latence_native_us [, ecart_max, n_differences, bit_exact] [, erreur]}
+        statut ∈ 'ok', 'compilateur absent', 'échec compilation', 'échec exécution'
+    """
+    ecrire_banc_de_test(proj_dir, nom)
+    cxx = compilateur()
+    if cxx is None:
+        return {"statut": "compilateur absent"}
+
+    executable = os.path.join(proj_dir, "csim.out")
+    commande = [cxx, *OPTIONS_COMPILATION,
+                "-I", os.path.join(proj_dir, "firmware"),
+                "-I", os.path.join(proj_dir, "firmware", "shim"),
+                os.path.join(proj_dir, "myproject_test.cpp"),
+                os.path.join(proj_dir, "firmware", "myproject.cpp"),
+                "-o", executable]
+    resultat = {"statut": "ok", "compilateur": os.path.basename(cxx)}
+
+    t0 = time.perf_counter()
+    try:
+        proc = subprocess.run(commande, capture_output=True, text=True,
+                              timeout=TIMEOUT_COMPILATION_S)
+    except subprocess.TimeoutExpired:
+        return {**resultat, "statut": "échec compilation", "erreur": "délai dépassé"}
+    resultat["compilation_s"] = round(time.perf_counter() - t0, 2)
+    if proc.returncode != 0:
+        return {**resultat, "statut": "échec compilation", "erreur": proc.stderr[-2000:]}
+
+    try:
+        proc = subprocess.run([executable], cwd=proj_dir, capture_output=True, text=True,
+                              timeout=TIMEOUT_EXECUTION_S)
+    except subprocess.TimeoutExpired:
+        return {**resultat, "statut": "échec exécution", "erreur": "délai dépassé"}
+    if proc.returncode != 0:
+        return {**resultat, "statut": "échec exécution", "erreur": proc.stderr[-2000:]}
+
+    mesures = dict(re.findall(r"^(\w+) (\S+)$", proc.stdout, flags=re.MULTILINE))
+    inferences, secondes = int(mesures.get("INFERENCES", 0)), float(mesures.get("SECONDS", 0.0))
+    resultat["echantillons"] = int(mesures.get("SAMPLES", 0))
+    resultat["debit_inferences_s"] = round(inferences / secondes, 1) if secondes > 0 else None
+    resultat["latence_native_us"] = round(1e6 * secondes / inferences, 4) if inferences else None
+
+    if reference is not None:
+        sorties = np.loadtxt(os.path.join(proj_dir, "tb_data", "csim_results.log"), ndmin=2)
+        if len(sorties) != len(reference):
+            return {**resultat, "statut": "échec exécution",
+                    "erreur": f"{len(sorties)} sorties C++ pour {len(reference)} attendues"}
+        resultat.update(comparer(sorties, reference))
+    return resultat
+
+
+def resume(resultat: dict) -> str:
+    """Ligne de log d'un résultat executer_csim."""
+    if resultat["statut"] != "ok":
+        return f"C++ csim : {resultat['statut']}"
+    debit = resultat.get("debit_inferences_s")
+    texte = (f"C++ csim ({resultat['compilateur']}, compilé en {resultat['compilation_s']} s) : "
+             + (f"{debit:.0f} inférences/s" if debit is not None else "débit non mesuré"))
+    if "bit_exact" in resultat:
+        texte += (" | bit-exact" if resultat["bit_exact"] else
+                  f" | {resultat['n_differences']} écarts (max {resultat['ecart_max']:.3e})")
+    return texte
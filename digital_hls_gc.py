@@ -0,0 +1,290 @@
+"""
+Retention of the digital HLS storage (HLS_ROOT, UPLOADS_ROOT), so the
+persistent disk never fills and directory listings stay short.
+
+    HLS_ROOT/{model}_{key}[.zip]   one project per generation key; size from
+                                   digital_hls_jobs.output_bytes, last use
+                                   from the latest job row pointing at it
+    UPLOADS_ROOT/{name}_{hash}.ext hard links to UPLOADS_STORE/{sha256}.ext
+                                   (save_uploaded_model), one copy per content
+
+collect_garbage removes, oldest use first:
+  - staging leftovers and project dirs / zips that no job row references
+  - projects idle for more than MAX_AGE_DAYS, then the least recently used
+    ones until HLS_QUOTA_BYTES is met; their job rows become 'expired'
+  - uploads idle for more than MAX_AGE_DAYS or beyond UPLOADS_QUOTA_BYTES,
+    then the stored contents no upload links to anymore
+  - finished job rows older than JOB_ROWS_MAX_AGE_DAYS
+Nothing used by a queued / running job, nor touched during the last
+GRACE_PERIOD_S, is removed. The queue runs maybe_collect_garbage after each
+job; python digital_hls_gc.py [--dry-run] runs it by hand.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from digital_hls_service import (
+    DB_PATH,
+    HLS_ROOT,
+    UPLOADS_ROOT,
+    UPLOADS_STORE,
+    _ensure_digital_table,
+    _project_lock,
+    project_bytes,
+)
+
+MB = 1024 * 1024
+HLS_QUOTA_BYTES = int(os.environ.get("DIGITAL_HLS_QUOTA_MB", "1024")) * MB
+UPLOADS_QUOTA_BYTES = int(os.environ.get("DIGITAL_UPLOADS_QUOTA_MB", "256")) * MB
+MAX_AGE_DAYS = float(os.environ.get("DIGITAL_HLS_MAX_AGE_DAYS", "30"))
+JOB_ROWS_MAX_AGE_DAYS = 90.0
+GRACE_PERIOD_S = 3600.0  # uploads not yet submitted, projects being written
+GC_INTERVAL_S = 600.0  # maybe_collect_garbage: at most one pass per interval
+
+ACTIVE_STATUSES = ("queued", "running")
+TERMINAL_STATUSES = ("error", "cancelled", "expired")
+
+_gc_lock = threading.Lock()
+_last_run = 0.0
+
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.lstat(path).st_mtime
+    except OSError:
+        return 0.0
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.lexists(path):
+        os.remove(path)
+
+
+def _project_usage(conn: sqlite3.Connection) -> dict[str, dict[str, Any]]:
+    """Projects referenced by done jobs: {project_dir: {zip, bytes, idle_s}}."""
+    rows = conn.execute(
+        """
+        SELECT output_project_dir,
+               MAX(output_zip_path) AS zip_path,
+               MAX(output_bytes) AS bytes,
+               (julianday('now') - julianday(MAX(COALESCE(finished_at, created_at)))) * 86400 AS idle_s
+        FROM digital_hls_jobs
+        WHERE status = 'done' AND output_project_dir IS NOT NULL
+        GROUP BY output_project_dir
+        """
+    ).fetchall()
+    usage = {}
+    for row in rows:
+        project_dir = os.path.normpath(row["output_project_dir"])
+        size = row["bytes"]
+        if size is None and os.path.isdir(project_dir):
+            # Rows written before output_bytes existed: measure once
+            size = project_bytes(project_dir, row["zip_path"])
+            conn.execute(
+                "UPDATE digital_hls_jobs SET output_bytes = ? WHERE output_project_dir = ? AND status = 'done'",
+                (size, row["output_project_dir"]),
+            )
+        usage[project_dir] = {
+            "row_path": row["output_project_dir"],
+            "zip": row["zip_path"],
+            "bytes": size or 0,
+            "idle_s": row["idle_s"] or 0.0,
+        }
+    return usage
+
+
+def _expire_project(conn: sqlite3.Connection, row_path: str) -> None:
+    conn.execute(
+        """
+        UPDATE digital_hls_jobs
+        SET status = 'expired', output_project_dir = NULL, output_zip_path = NULL, output_bytes = NULL
+        WHERE status = 'done' AND output_project_dir = ?
+        """,
+        (row_path,),
+    )
+
+
+def _collect_projects(
+    conn: sqlite3.Connection, quota_bytes: int, max_age_s: float, now: float, dry_run: bool
+) -> dict[str, Any]:
+    usage = _project_usage(conn)
+    removed, freed = [], 0
+
+    # Entries no job row points at: staging leftovers, failed / cancelled
+    # generations, projects of deleted rows
+    with os.scandir(HLS_ROOT) as entries:
+        names = [entry.name for entry in entries]
+    for name in names:
+        path = os.path.normpath(os.path.join(HLS_ROOT, name))
+        project_dir = path[: -len(".zip")] if name.endswith(".zip") else path
+        if project_dir in usage or now - _mtime(path) < GRACE_PERIOD_S:
+            continue
+        if not dry_run:
+            _remove(path)
+        removed.append(name)
+
+    # Referenced projects whose files are gone
+    for project_dir in [p for p in usage if not os.path.isdir(p)]:
+        entry = usage.pop(project_dir)
+        if not dry_run:
+            _expire_project(conn, entry["row_path"])
+
+    total = sum(entry["bytes"] for entry in usage.values())
+    for project_dir, entry in sorted(usage.items(), key=lambda item: -item[1]["idle_s"]):
+        if entry["idle_s"] <= max_age_s and total <= quota_bytes:
+            break
+        zip_path = entry["zip"] or project_dir + ".zip"
+        if now - max(_mtime(project_dir), _mtime(zip_path)) < GRACE_PERIOD_S:
+            continue
+        lock = _project_lock(project_dir)
+        if not lock.acquire(blocking=False):
+            continue  # being generated / served by this process
+        try:
+            if not dry_run:
+                _remove(project_dir)
+                _remove(zip_path)
+                _expire_project(conn, entry["row_path"])
+        finally:
+            lock.release()
+        total -= entry["bytes"]
+        freed += entry["bytes"]
+        removed.append(os.path.basename(project_dir))
+
+    return {"removed": removed, "freed_bytes": freed, "bytes": total}
+
+
+def _collect_uploads(
+    conn: sqlite3.Connection, quota_bytes: int, max_age_s: float, now: float, dry_run: bool
+) -> dict[str, Any]:
+    placeholders = ",".join("?" * len(ACTIVE_STATUSES))
+    rows = conn.execute(
+        f"""
+        SELECT input_model_path,
+               MAX(status IN ({placeholders})) AS active,
+               MAX(CAST(strftime('%s', created_at) AS REAL)) AS last_job
+        FROM digital_hls_jobs
+        GROUP BY input_model_path
+        """,
+        ACTIVE_STATUSES,
+    ).fetchall()
+    jobs = {os.path.normpath(row["input_model_path"]): row for row in rows}
+
+    uploads = []  # (last use, path, inode, size)
+    with os.scandir(UPLOADS_ROOT) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False):
+                stat = entry.stat(follow_symlinks=False)
+                path = os.path.normpath(entry.path)
+                last_use = max(stat.st_mtime, jobs[path]["last_job"] or 0.0) if path in jobs else stat.st_mtime
+                uploads.append((last_use, path, stat.st_ino, stat.st_size))
+    uploads.sort()
+
+    # Hard links to one stored content count once
+    links: dict[int, int] = {}
+    sizes: dict[int, int] = {}
+    for _, _, inode, size in uploads:
+        links[inode] = links.get(inode, 0) + 1
+        sizes[inode] = size
+    total = sum(sizes.values())
+
+    removed, freed = [], 0
+    for last_use, path, inode, size in uploads:
+        if now - last_use <= max_age_s and total <= quota_bytes:
+            break
+        if (path in jobs and jobs[path]["active"]) or now - last_use < GRACE_PERIOD_S:
+            continue
+        if not dry_run:
+            os.remove(path)
+        removed.append(os.path.basename(path))
+        links[inode] -= 1
+        if not links[inode]:
+            total -= size
+            freed += size
+
+    # Stored contents no remaining upload links to
+    orphans = 0
+    with os.scandir(UPLOADS_STORE) as entries:
+        for entry in entries:
+            stat = entry.stat(follow_symlinks=False)
+            if links.get(stat.st_ino) or now - stat.st_mtime < GRACE_PERIOD_S:
+                continue
+            if not dry_run:
+                os.remove(entry.path)
+            orphans += 1
+            if stat.st_ino not in sizes:
+                freed += stat.st_size
+
+    return {"removed": removed, "store_removed": orphans, "freed_bytes": freed, "bytes": total}
+
+
+def collect_garbage(
+    hls_quota_bytes: int = HLS_QUOTA_BYTES,
+    uploads_quota_bytes: int = UPLOADS_QUOTA_BYTES,
+    max_age_days: float = MAX_AGE_DAYS,
+    dry_run: bool = False,
+) -> dict[str, Any]:
+    """
+    One retention pass over HLS_ROOT, UPLOADS_ROOT and the job rows.
+
+    Returns:
+        {projects: {removed, freed_bytes, bytes}, uploads: {removed,
+         store_removed, freed_bytes, bytes}, job_rows_deleted}
+    """
+    now = time.time()
+    max_age_s = max_age_days * 86400
+    with _gc_lock:
+        conn = _connect()
+        try:
+            _ensure_digital_table(conn)
+            projects = _collect_projects(conn, hls_quota_bytes, max_age_s, now, dry_run)
+            uploads = _collect_uploads(conn, uploads_quota_bytes, max_age_s, now, dry_run)
+            placeholders = ",".join("?" * len(TERMINAL_STATUSES))
+            query = (
+                f"FROM digital_hls_jobs WHERE status IN ({placeholders}) "
+                "AND julianday('now') - julianday(COALESCE(finished_at, created_at)) > ?"
+            )
+            params = (*TERMINAL_STATUSES, JOB_ROWS_MAX_AGE_DAYS)
+            if dry_run:
+                rows_deleted = conn.execute(f"SELECT COUNT(*) {query}", params).fetchone()[0]
+            else:
+                rows_deleted = conn.execute(f"DELETE {query}", params).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+    return {"projects": projects, "uploads": uploads, "job_rows_deleted": rows_deleted}
+
+
+def maybe_collect_garbage() -> dict[str, Any] | None:
+    """collect_garbage unless a pass already ran in this process less than GC_INTERVAL_S ago."""
+    global _last_run
+    if time.monotonic() - _last_run < GC_INTERVAL_S and _last_run:
+        return None
+    _last_run = time.monotonic()
+    return collect_garbage()
+
+
+if __name__ == "__main__":
+    import sys
+
+    report = collect_garbage(dry_run="--dry-run" in sys.argv)
+    for section in ("projects", "uploads"):
+        part = report[section]
+        print(
+            f"[HLS-GC] {section}: {len(part['removed'])} removed, "
+            f"{part['freed_bytes'] / MB:.1f} MB freed, {part['bytes'] / MB:.1f} MB kept"
+        )
+    print(f"[HLS-GC] job rows deleted: {report['job_rows_deleted']}")
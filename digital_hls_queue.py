@@ -0,0 +1,266 @@
+"""
+Digital HLS job queue: generate_hls_project_from_model runs in a local pool
+of worker threads fed by the digital_hls_jobs table.
+
+    queued → running → done | error | cancelled
+
+Jobs are claimed atomically (BEGIN IMMEDIATE), at most MAX_CONCURRENT_JOBS
+running at once across every process sharing the database. Workers record
+progress / progress_message and stop at the next stage boundary once
+cancel_requested is set, then run the storage retention (digital_hls_gc).
+The page polls get_job / list_jobs / job_result.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any
+
+from digital_hls_gc import maybe_collect_garbage
+from digital_hls_service import (
+    DB_PATH,
+    JobCancelled,
+    _ensure_digital_table,
+    _insert_job,
+    _read_report,
+    _result_from_report,
+    _safe_name,
+    _update_job_error,
+    generate_hls_project_from_model,
+)
+
+MAX_CONCURRENT_JOBS = int(os.environ.get("DIGITAL_HLS_WORKERS", "2"))
+POLL_INTERVAL_S = 1.0
+ACTIVE_STATUSES = ("queued", "running")
+
+_workers: list[threading.Thread] = []
+_workers_lock = threading.Lock()
+_wakeup = threading.Event()
+
+
+def _connect() -> sqlite3.Connection:
+    # Autocommit: explicit BEGIN IMMEDIATE only where a job is claimed
+    conn = sqlite3.connect(DB_PATH, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def submit_job(model_path: str, model_name: str, **options: Any) -> int:
+    """
+    Queue a generation; options are the keyword arguments of
+    generate_hls_project_from_model, plus precision_sweep (run
+    balayage_precision.balayer_modele first and keep its uniform optimum).
+    """
+    conn = _connect()
+    try:
+        _ensure_digital_table(conn)
+        job_id = _insert_job(
+            conn,
+            model_name=_safe_name(model_name),
+            input_model_path=model_path,
+            backend="hls4ml",
+            precision=options.get("precision", "ap_fixed<16,6>"),
+            target_part=options.get("target_part", "xc7a35tcpg236-1"),
+            clock_period=options.get("clock_period", 10.0),
+            io_type=options.get("io_type", "io_parallel"),
+            status="queued",
+            options={"model_name": model_name, **options},
+        )
+    finally:
+        conn.close()
+    ensure_workers()
+    _wakeup.set()
+    return job_id
+
+
+def cancel_job(job_id: int) -> bool:
+    """Cancel a queued job now, or ask a running one to stop; False if already finished."""
+    conn = _connect()
+    try:
+        cur = conn.execute(
+            "UPDATE digital_hls_jobs SET status = 'cancelled', error_message = 'Annulé', "
+            "finished_at = CURRENT_TIMESTAMP WHERE id = ? AND status = 'queued'",
+            (job_id,),
+        )
+        if cur.rowcount:
+            return True
+        cur = conn.execute(
+            "UPDATE digital_hls_jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'",
+            (job_id,),
+        )
+        return bool(cur.rowcount)
+    finally:
+        conn.close()
+
+
+def get_job(job_id: int) -> dict[str, Any] | None:
+    conn = _connect()
+    try:
+        _ensure_digital_table(conn)
+        row = conn.execute("SELECT * FROM digital_hls_jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
+
+
+def list_jobs(limit: int = 20) -> list[dict[str, Any]]:
+    conn = _connect()
+    try:
+        _ensure_digital_table(conn)
+        rows = conn.execute("SELECT * FROM digital_hls_jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def job_result(job_id: int) -> dict[str, Any] | None:
+    """Result of a finished job (same shape as generate_hls_project_from_model), None otherwise."""
+    job = get_job(job_id)
+    if not job or job["status"] != "done":
+        return None
+    report = _read_report(job["output_project_dir"])
+    if report is None:
+        return None
+    result = _result_from_report(
+        job_id, job["output_project_dir"], job["output_zip_path"], report, bool(job["cache_hit"])
+    )
+    sweep = json.loads(job["options_json"] or "{}").get("balayage_precision")
+    if sweep:
+        result["balayage_precision"] = sweep
+    return result
+
+
+def ensure_workers() -> None:
+    """Start the worker threads of this process (once), after failing orphaned jobs."""
+    with _workers_lock:
+        if _workers:
+            return
+        conn = _connect()
+        try:
+            _ensure_digital_table(conn)
+            _fail_orphaned_jobs(conn, first_start=True)
+        finally:
+            conn.close()
+        for index in range(MAX_CONCURRENT_JOBS):
+            worker = threading.Thread(target=_worker_loop, name=f"digital-hls-{index}", daemon=True)
+            worker.start()
+            _workers.append(worker)
+
+
+def _pid_alive(pid: int | None) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _fail_orphaned_jobs(conn: sqlite3.Connection, first_start: bool = False) -> None:
+    """Running jobs whose worker process is gone (or is this process before its workers start)."""
+    rows = conn.execute("SELECT id, worker_pid FROM digital_hls_jobs WHERE status = 'running'").fetchall()
+    for row in rows:
+        pid = row["worker_pid"]
+        if not _pid_alive(pid) or (first_start and pid == os.getpid()):
+            _update_job_error(conn, row["id"], "Interrompu : processus de génération arrêté")
+
+
+def _claim_next_job(conn: sqlite3.Connection) -> sqlite3.Row | None:
+    """Oldest queued job, marked running by this process, unless the concurrency limit is reached."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        running = conn.execute("SELECT COUNT(*) FROM digital_hls_jobs WHERE status = 'running'").fetchone()[0]
+        row = None
+        if running < MAX_CONCURRENT_JOBS:
+            row = conn.execute(
+                "SELECT * FROM digital_hls_jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE digital_hls_jobs SET status = 'running', worker_pid = ?, progress = 0, "
+                "started_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (os.getpid(), row["id"]),
+            )
+        conn.execute("COMMIT")
+        return row
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _progress_callback(conn: sqlite3.Connection, job_id: int):
+    def progress(fraction: float, message: str) -> None:
+        conn.execute(
+            "UPDATE digital_hls_jobs SET progress = ?, progress_message = ? WHERE id = ?",
+            (float(fraction), message, job_id),
+        )
+        cancelled = conn.execute(
+            "SELECT cancel_requested FROM digital_hls_jobs WHERE id = ?", (job_id,)
+        ).fetchone()[0]
+        if cancelled:
+            raise JobCancelled(job_id)
+
+    return progress
+
+
+def _run_job(conn: sqlite3.Connection, job: sqlite3.Row) -> None:
+    options = json.loads(job["options_json"] or "{}")
+    model_name = options.pop("model_name", job["model_name"])
+    progress = _progress_callback(conn, job["id"])
+    if options.pop("precision_sweep", False):
+        from balayage_precision import balayer_modele
+
+        progress(0.02, "Balayage de précision")
+        sweep = balayer_modele(job["input_model_path"])
+        if sweep["optimal_uniforme"]:
+            options["precision"] = sweep["optimal_uniforme"]["precision"]
+        summary = [
+            {k: r[k] for k in ("nom", "E_rel_%", "estimated_dsp", "estimated_bram18", "passe")}
+            for r in sweep["configurations"]
+            if r["nom"] in sweep["front_pareto"]
+        ]
+        conn.execute(
+            "UPDATE digital_hls_jobs SET precision = ?, options_json = ? WHERE id = ?",
+            (
+                options.get("precision", job["precision"]),
+                json.dumps({"model_name": model_name, **options, "balayage_precision": summary}),
+                job["id"],
+            ),
+        )
+    options.pop("balayage_precision", None)
+    generate_hls_project_from_model(
+        job["input_model_path"], model_name, job_id=job["id"], progress=progress, **options
+    )
+
+
+def _worker_loop() -> None:
+    conn = _connect()
+    while True:
+        try:
+            job = _claim_next_job(conn)
+        except sqlite3.OperationalError:
+            job = None   # database busy: retry at the next poll
+        if job is None:
+            _wakeup.wait(POLL_INTERVAL_S)
+            _wakeup.clear()
+            continue
+        try:
+            _run_job(conn, job)
+        except Exception as exc:
+            # generate_hls_project_from_model records its own failures; this
+            # covers the precision sweep that runs before it
+            if get_job(job["id"])["status"] == "running":
+                if isinstance(exc, JobCancelled):
+                    _update_job_error(conn, job["id"], "Annulé", status="cancelled")
+                else:
+                    _update_job_error(conn, job["id"], str(exc))
+        try:
+            maybe_collect_garbage()
+        except (OSError, sqlite3.Error):
+            pass  # retention is best effort: retried after a later job
@@ -4,24 +4,60 @@ Service numérique: conversion d'un modèle IA vers projet HLS.
 
 from __future__ import annotations
 
+import filecmp
+import hashlib
 import json
 import os
 import re
 import shutil
 import sqlite3
+import tempfile
+import threading
 import importlib
-from datetime import datetime
-from typing import Any
+from functools import lru_cache
+from typing import Any, Callable
 
 import numpy as np
 
+import registre_modeles
+from banc_de_test import executer_csim
+from fpga_parts import resolve_part, utilization
+from poids_hls import DECLARATION_CHARGEMENT, EcrivainPoids, corps_dense, est_creuse
+
 BASE_DIR = os.path.dirname(__file__)
 DB_PATH = os.path.join(BASE_DIR, "composants_db.sqlite")
 HLS_ROOT = os.path.join(BASE_DIR, "hls_projects", "digital")
 UPLOADS_ROOT = os.path.join(BASE_DIR, "models", "digital_uploads")
+UPLOADS_STORE = os.path.join(UPLOADS_ROOT, ".store")  # one file per distinct upload content
+
+# Design-space exploration (reuse factor / strategy / clock)
+STRATEGIES = ("Latency", "Resource")
+DSE_CLOCK_PERIODS = (2.5, 5.0, 10.0)
+MULT_PATH_NS = 3.5  # DSP48 multiply, input to output register
+ADD_PATH_NS = 1.2  # one adder-tree level
+BRAM_READ_CYCLES = 1
+BRAM18_WIDTH = 36  # BRAM18 as 512 x 36
+BRAM18_DEPTH = 512
+LUT_ROM_BITS = 64  # LUT6 as 64 x 1 ROM
+DSP_PACK_BITS = 8  # two products per DSP48E2 up to this width
+
+# io_stream: one layer function per Dense layer under DATAFLOW, connected by
+# FIFOs of packed vectors (one packet per inference)
+IO_TYPES = ("io_parallel", "io_stream")
+STREAM_FIFO_DEPTH = 2  # packets per inter-layer FIFO
+STREAM_IO_CYCLES = 2  # FIFO read + write of each layer process
+SRL_DEPTH = 32  # SRLC32E: one LUT per bit and 32 FIFO entries
+
+# C++ testbench of the stub project (cf. banc_de_test.py)
+TB_SAMPLES = 256
+STUB_ACCUM_TYPE = "ap_fixed<24,10>"
+
+# Project directories are named {model}_{generation key prefix}
+GENERATION_KEY_LENGTH = 12
 
 os.makedirs(HLS_ROOT, exist_ok=True)
 os.makedirs(UPLOADS_ROOT, exist_ok=True)
+os.makedirs(UPLOADS_STORE, exist_ok=True)
 
 
 def _safe_name(value: str) -> str:
@@ -51,6 +87,24 @@ def _ensure_digital_table(conn: sqlite3.Connection) -> None:
         )
         """
     )
+    existing_columns = {row[1] for row in conn.execute("PRAGMA table_info(digital_hls_jobs)")}
+    required_columns = {
+        "generation_key": "TEXT",
+        "cache_hit": "INTEGER NOT NULL DEFAULT 0",
+        # Job queue (digital_hls_queue)
+        "options_json": "TEXT",
+        "progress": "REAL NOT NULL DEFAULT 0",
+        "progress_message": "TEXT",
+        "cancel_requested": "INTEGER NOT NULL DEFAULT 0",
+        "worker_pid": "INTEGER",
+        "started_at": "TIMESTAMP",
+        "finished_at": "TIMESTAMP",
+        # Retention (digital_hls_gc)
+        "output_bytes": "INTEGER",
+    }
+    for column_name, column_def in required_columns.items():
+        if column_name not in existing_columns:
+            conn.execute(f"ALTER TABLE digital_hls_jobs ADD COLUMN {column_name} {column_def}")
     conn.commit()
 
 
@@ -63,15 +117,29 @@ def _insert_job(
     target_part: str,
     clock_period: float,
     io_type: str,
+    status: str = "running",
+    options: dict[str, Any] | None = None,
 ) -> int:
     cur = conn.cursor()
     cur.execute(
         """
         INSERT INTO digital_hls_jobs
-            (model_name, input_model_path, backend, precision, target_part, clock_period, io_type, status)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            (model_name, input_model_path, backend, precision, target_part, clock_period, io_type, status,
+             options_json, started_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CASE WHEN ? = 'running' THEN CURRENT_TIMESTAMP END)
         """,
-        (model_name, input_model_path, backend, precision, target_part, float(clock_period), io_type, "running"),
+        (
+            model_name,
+            input_model_path,
+            backend,
+            precision,
+            target_part,
+            float(clock_period),
+            io_type,
+            status,
+            json.dumps(options) if options is not None else None,
+            status,
+        ),
     )
     conn.commit()
     return int(cur.lastrowid)
@@ -84,6 +152,8 @@ def _update_job_success(
     output_zip_path: str,
     resources: dict[str, Any],
     latency: dict[str, Any],
+    generation_key: str | None = None,
+    cache_hit: bool = False,
 ) -> None:
     conn.execute(
         """
@@ -92,7 +162,12 @@ def _update_job_success(
             output_project_dir = ?,
             output_zip_path = ?,
             resources_json = ?,
-            latency_json = ?
+            latency_json = ?,
+            generation_key = ?,
+            cache_hit = ?,
+            output_bytes = ?,
+            progress = 1.0,
+            finished_at = CURRENT_TIMESTAMP
         WHERE id = ?
         """,
         (
@@ -101,74 +176,418 @@ def _update_job_success(
             output_zip_path,
             json.dumps(resources),
             json.dumps(latency),
+            generation_key,
+            int(cache_hit),
+            project_bytes(output_project_dir, output_zip_path),
             job_id,
         ),
     )
     conn.commit()
 
 
-def _update_job_error(conn: sqlite3.Connection, job_id: int, error_message: str) -> None:
+def _update_job_error(
+    conn: sqlite3.Connection, job_id: int, error_message: str, status: str = "error"
+) -> None:
     conn.execute(
-        "UPDATE digital_hls_jobs SET status = ?, error_message = ? WHERE id = ?",
-        ("error", error_message[:1000], job_id),
+        "UPDATE digital_hls_jobs SET status = ?, error_message = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?",
+        (status, error_message[:1000], job_id),
     )
     conn.commit()
 
 
-def _estimate_resources_and_latency(model, precision: str, clock_period: float, reuse_factor: int = 1) -> tuple[dict[str, Any], dict[str, Any]]:
-    bits = 16
-    m_bits = re.search(r"<(\d+)", precision)
-    if m_bits:
-        bits = int(m_bits.group(1))
+class JobCancelled(Exception):
+    """Raised by a progress callback when cancellation of the job was requested."""
+
+
+def _quantized_weights(weight_matrix: np.ndarray, precision: str) -> np.ndarray:
+    """Weights as cast to `precision` by the firmware (unchanged if the type is not emulated)."""
+    from virgule_fixe import quantifier
+
+    try:
+        return quantifier(weight_matrix, precision)
+    except ValueError:
+        return np.asarray(weight_matrix, dtype=np.float64)
 
-    dense_layers = [layer for layer in model.layers if layer.get_weights()]
-    macs = 0
-    total_weights = 0
-    layer_sizes: list[dict[str, int]] = []
 
-    for layer in dense_layers:
+def _layer_stats(model, precision: str) -> list[dict[str, Any]]:
+    """Shape, dense and non-zero MAC count of each Dense layer."""
+    stats = []
+    for layer in model.layers:
         weights = layer.get_weights()
         if not weights:
             continue
         weight_matrix = weights[0]
         bias_vector = weights[1] if len(weights) > 1 else np.array([])
-        in_dim, out_dim = int(weight_matrix.shape[0]), int(weight_matrix.shape[1])
-        layer_sizes.append({"in": in_dim, "out": out_dim})
-        macs += in_dim * out_dim
-        total_weights += int(weight_matrix.size + bias_vector.size)
+        stats.append(
+            {
+                "name": layer.name,
+                "in": int(weight_matrix.shape[0]),
+                "out": int(weight_matrix.shape[1]),
+                "macs_dense": int(weight_matrix.size),
+                # Zero weights (pruned or quantized away) cost neither a DSP nor a cycle
+                "macs": int(np.count_nonzero(_quantized_weights(weight_matrix, precision))),
+                "weights": int(weight_matrix.size + bias_vector.size),
+            }
+        )
+    return stats
+
+
+@lru_cache(maxsize=256)
+def valid_reuse_factors(n_in: int, n_out: int) -> tuple[int, ...]:
+    """Reuse factors accepted by hls4ml for a Dense layer: divisors of n_in * n_out."""
+    n = n_in * n_out
+    small = [r for r in range(1, int(np.sqrt(n)) + 1) if n % r == 0]
+    return tuple(sorted(set(small + [n // r for r in small])))
+
+
+def _layer_reuse_factor(layer: dict[str, Any], reuse_factor: int | dict[str, int]) -> int:
+    """Largest valid reuse factor not above the requested one (per-layer dict or global int)."""
+    requested = reuse_factor.get(layer["name"], 1) if isinstance(reuse_factor, dict) else reuse_factor
+    return max(r for r in valid_reuse_factors(layer["in"], layer["out"]) if r <= max(1, int(requested)))
+
+
+def dsp_per_multiplier(bits: int, dsp_type: str = "DSP48E1") -> float:
+    """
+    DSP slices per bits x bits multiplication: two products sharing an
+    input pack into one DSP48E2 up to DSP_PACK_BITS bits, wider operands
+    are split over the multiplier ports (25x18 on DSP48E1, 27x18 on DSP48E2).
+    """
+    if dsp_type == "DSP48E2" and bits <= DSP_PACK_BITS:
+        return 0.5
+    port_a = 27 if dsp_type == "DSP48E2" else 25
+    return float(np.ceil(bits / port_a) * np.ceil(bits / 18))
+
+
+def _estimate_layer(
+    layer: dict[str, Any],
+    reuse_factor: int,
+    strategy: str,
+    bits: int,
+    clock_period: float,
+    dsp_type: str = "DSP48E1",
+    io_type: str = "io_parallel",
+    last: bool = False,
+) -> dict[str, Any]:
+    """
+    Analytical cost of one Dense layer.
+
+    Latency strategy: weights fully partitioned into fabric (LUT ROM), zero
+    weights optimised away, ceil(non-zero MACs / R) multipliers. Resource
+    strategy: dense weight matrix stored in BRAM as R words of ceil(n / R)
+    weights, one extra cycle per BRAM read. Both: II = R, multiply then
+    adder tree pipelined at the requested clock; one adder per multiplier
+    and a 2 * bits register per multiplier and pipeline stage. DSP per
+    multiplier from the bit width (cf. dsp_per_multiplier).
+
+    io_stream: the layer is a DATAFLOW process, still II = R (function
+    pipelined at II = R with Latency, rewinding reuse loop with Resource),
+    plus STREAM_IO_CYCLES of latency and, unless it is the last layer, an
+    output FIFO of STREAM_FIFO_DEPTH packets of out * bits in SRL LUTs.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Stratégie inconnue '{strategy}' (choix: {STRATEGIES})")
+    if io_type not in IO_TYPES:
+        raise ValueError(f"Type d'I/O inconnu '{io_type}' (choix: {IO_TYPES})")
+    macs = layer["macs"] if strategy == "Latency" else layer["macs_dense"]
+    multipliers = int(np.ceil(macs / reuse_factor)) if macs else 0
+    bram18 = 0
+    if strategy == "Resource":
+        word_bits = int(np.ceil(layer["macs_dense"] / reuse_factor)) * bits
+        bram18 = int(np.ceil(word_bits / BRAM18_WIDTH) * np.ceil(reuse_factor / BRAM18_DEPTH))
+    tree_levels = int(np.ceil(np.log2(max(2, layer["in"]))))
+    stages = int(np.ceil(MULT_PATH_NS / clock_period)) + int(np.ceil(tree_levels * ADD_PATH_NS / clock_period))
+    depth = stages + (BRAM_READ_CYCLES if strategy == "Resource" else 0)
+    fifo_lut = 0
+    if io_type == "io_stream":
+        depth += STREAM_IO_CYCLES
+        if not last:
+            fifo_lut = layer["out"] * bits * int(np.ceil(STREAM_FIFO_DEPTH / SRL_DEPTH))
+    cycles = reuse_factor + depth
+    lut = multipliers * bits + fifo_lut
+    if strategy == "Latency":
+        lut += int(np.ceil(layer["macs"] * bits / LUT_ROM_BITS))
+    return {
+        "name": layer["name"],
+        "reuse_factor": int(reuse_factor),
+        "strategy": strategy,
+        "multipliers": multipliers,
+        "dsp": int(np.ceil(multipliers * dsp_per_multiplier(bits, dsp_type))),
+        "bram18": bram18,
+        "lut": lut,
+        "fifo_lut": fifo_lut,
+        "ff": multipliers * 2 * bits * stages,
+        "pipeline_depth": depth,
+        "latency_cycles": cycles,
+        "ii_cycles": int(reuse_factor),
+    }
+
+
+def _estimate_design(
+    stats: list[dict[str, Any]],
+    bits: int,
+    clock_period: float,
+    reuse_factor: int | dict[str, int],
+    strategy: str,
+    dsp_type: str = "DSP48E1",
+    io_type: str = "io_parallel",
+) -> dict[str, Any]:
+    """
+    Per-layer estimates and totals (layers chained: latencies add up, II is
+    the slowest layer's, within one pipeline for io_parallel, across the
+    DATAFLOW processes for io_stream).
+    """
+    layers = [
+        _estimate_layer(
+            layer,
+            _layer_reuse_factor(layer, reuse_factor),
+            strategy,
+            bits,
+            clock_period,
+            dsp_type,
+            io_type,
+            last=index == len(stats) - 1,
+        )
+        for index, layer in enumerate(stats)
+    ]
+    cycles = sum(layer["latency_cycles"] for layer in layers)
+    ii = max((layer["ii_cycles"] for layer in layers), default=1)
+    return {
+        "strategy": strategy,
+        "io_type": io_type,
+        "clock_period_ns": float(clock_period),
+        "reuse_factors": {layer["name"]: layer["reuse_factor"] for layer in layers},
+        "dsp": sum(layer["dsp"] for layer in layers),
+        "bram18": sum(layer["bram18"] for layer in layers),
+        "lut": sum(layer["lut"] for layer in layers),
+        "ff": sum(layer["ff"] for layer in layers),
+        "latency_cycles": int(cycles),
+        "ii_cycles": int(ii),
+        "latency_ns": round(cycles * float(clock_period), 2),
+        "ii_ns": round(ii * float(clock_period), 2),
+        "layers": layers,
+    }
+
+
+def _precision_bits(precision: str) -> int:
+    m_bits = re.search(r"<(\d+)", precision)
+    return int(m_bits.group(1)) if m_bits else 16
+
 
-    dsp_est = max(1, int(np.ceil(macs / max(1, reuse_factor)))) if macs > 0 else 0
-    bram18_est = int(np.ceil((total_weights * bits) / (18 * 1024))) if total_weights > 0 else 0
-    latency_cycles = int(np.ceil(macs / max(1, reuse_factor)) + sum(layer["out"] for layer in layer_sizes))
-    latency_ns = round(latency_cycles * float(clock_period), 2)
-    throughput_msps = round(1000.0 / float(clock_period), 2)
+def _dsp_type(target_part: str | None) -> str:
+    part = resolve_part(target_part) if target_part else None
+    return part["dsp_type"] if part else "DSP48E1"
+
+
+def _estimate_resources_and_latency(
+    model,
+    precision: str,
+    clock_period: float,
+    reuse_factor: int | dict[str, int] = 1,
+    strategy: str = "Latency",
+    target_part: str | None = None,
+    io_type: str = "io_parallel",
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    stats = _layer_stats(model, precision)
+    design = _estimate_design(
+        stats, _precision_bits(precision), clock_period, reuse_factor, strategy, _dsp_type(target_part), io_type
+    )
+    macs = sum(layer["macs"] for layer in stats)
+    dense_macs = sum(layer["macs_dense"] for layer in stats)
 
     resources = {
         "params_total": int(model.count_params()),
-        "weights_total": int(total_weights),
+        "weights_total": int(sum(layer["weights"] for layer in stats)),
         "mac_operations": int(macs),
-        "estimated_dsp": int(dsp_est),
-        "estimated_bram18": int(bram18_est),
+        "mac_operations_dense": int(dense_macs),
+        "sparsity": round(1.0 - macs / dense_macs, 4) if dense_macs else 0.0,
+        "estimated_dsp": int(design["dsp"]),
+        "estimated_bram18": int(design["bram18"]),
+        "estimated_lut": int(design["lut"]),
+        "estimated_ff": int(design["ff"]),
+        "estimated_fifo_lut": int(sum(layer["fifo_lut"] for layer in design["layers"])),
         "precision": precision,
+        "strategy": strategy,
+        "reuse_factors": design["reuse_factors"],
+        "layers": design["layers"],
+        "utilization": utilization(design, target_part, clock_period) if target_part else None,
     }
 
     latency = {
-        "estimated_cycles": int(latency_cycles),
+        "estimated_cycles": int(design["latency_cycles"]),
+        "estimated_ii_cycles": int(design["ii_cycles"]),
+        "io_type": io_type,
         "clock_period_ns": float(clock_period),
-        "estimated_latency_ns": latency_ns,
-        "estimated_latency_us": round(latency_ns / 1000.0, 3),
-        "estimated_throughput_msps": throughput_msps,
+        "estimated_latency_ns": design["latency_ns"],
+        "estimated_latency_us": round(design["latency_ns"] / 1000.0, 3),
+        "estimated_throughput_msps": round(1000.0 / design["ii_ns"], 2),
     }
 
     return resources, latency
 
 
-def _write_stub_hls_project(model, project_dir: str, model_name: str, precision: str, target_part: str, clock_period: float) -> None:
+def pareto_front(
+    points: list[dict[str, Any]], keys: tuple[str, ...] = ("latency_ns", "dsp", "bram18", "lut", "ff")
+) -> list[dict[str, Any]]:
+    """Points not dominated on `keys` (all minimised), sorted by the first key."""
+    ordered = sorted(points, key=lambda p: tuple(p[k] for k in keys))
+    front: list[dict[str, Any]] = []
+    for p in ordered:
+        if not any(all(q[k] <= p[k] for k in keys) for q in front):
+            front.append(p)
+    return front
+
+
+def explore_design_space(
+    model,
+    precision: str = "ap_fixed<16,6>",
+    target_part: str = "xc7a35tcpg236-1",
+    clock_periods: tuple[float, ...] = DSE_CLOCK_PERIODS,
+    strategies: tuple[str, ...] = STRATEGIES,
+    io_type: str = "io_parallel",
+) -> dict[str, Any]:
+    """
+    Reuse factor / strategy / clock exploration.
+
+    For each clock period, strategy and target II, every layer takes the
+    largest valid reuse factor not above the target (fewest multipliers
+    meeting the II). Returns all distinct design points and the Pareto
+    front of latency vs DSP / BRAM18 / LUT / FF, restricted to the designs
+    that fit target_part when it is in fpga_parts.PARTS.
+    """
+    stats = _layer_stats(model, precision)
+    bits = _precision_bits(precision)
+    dsp_type = _dsp_type(target_part)
+    targets = sorted({r for layer in stats for r in valid_reuse_factors(layer["in"], layer["out"])})
+
+    points: list[dict[str, Any]] = []
+    for clock_period in clock_periods:
+        for strategy in strategies:
+            seen = set()
+            for target in targets:
+                design = _estimate_design(stats, bits, clock_period, target, strategy, dsp_type, io_type)
+                signature = tuple(design["reuse_factors"].values())
+                if signature in seen:
+                    continue
+                seen.add(signature)
+                design["target_ii"] = int(target)
+                usage = utilization(design, target_part, clock_period)
+                design["fits"] = usage["fits"] if usage else None
+                design["utilization_pct"] = (
+                    {k: v["utilization_pct"] for k, v in usage["resources"].items()} if usage else None
+                )
+                points.append(design)
+
+    # Front restricted to the designs that fit the part (when known and any does)
+    fitting = [p for p in points if p["fits"]]
+    front = pareto_front(fitting or points)
+    return {
+        "target_part": target_part,
+        "precision": precision,
+        "io_type": io_type,
+        "points": points,
+        "points_fitting": len(fitting),
+        "pareto": front,
+    }
+
+
+def _relu(value: str) -> str:
+    return f"{value} > 0 ? {value} : (accum_t)0"
+
+
+def _dense_body(
+    idx: int,
+    weight_matrix: np.ndarray,
+    precision: str,
+    reuse: int,
+    strategy: str,
+    source: str,
+    target: str,
+    hidden: bool,
+) -> list[str]:
+    """
+    Pragmas and MAC loops of Dense layer idx, fully unrolled under an
+    enclosing PIPELINE II=reuse (io_parallel block, io_stream Latency function).
+    """
+    nonzero = _quantized_weights(weight_matrix, precision) != 0
+    # Last layer through data_t as well: io_stream writes it to a result_t packet
+    activation = _relu("acc") if hidden else "(data_t)acc"
+    body = []
+    if strategy == "Resource":
+        body.append(f"#pragma HLS RESOURCE variable=weight{idx} core=ROM_1P_BRAM")
+    else:
+        body.append(f"#pragma HLS ARRAY_PARTITION variable=weight{idx} complete dim=0")
+    if reuse > 1:
+        # ceil(MACs / R) multipliers for this layer, each reused R times
+        macs = int(nonzero.sum()) if strategy == "Latency" else int(weight_matrix.size)
+        body.append(f"#pragma HLS ALLOCATION operation instances=mul limit={-(-macs // reuse)}")
+    if est_creuse(nonzero):
+        # Sparse layers (poids_hls.corps_dense): one MAC per non-zero weight
+        # up to MAC_DEROULES_MAX, else a loop skipping the zero weights
+        body.append(f"  // sparse layer: {int(nonzero.sum())}/{nonzero.size} MACs")
+    body.extend(corps_dense(idx, nonzero, source, lambda j: [f"{target}[{j}] = {activation};"]))
+    return body
+
+
+def _dense_reuse_loop(idx: int, in_dim: int, out_dim: int, reuse: int, hidden: bool) -> list[str]:
+    """
+    Resource strategy io_stream body: R iterations of a rewinding pipelined
+    loop, each feeding in * out / R multipliers (R divides in * out, cf.
+    valid_reuse_factors) from one BRAM word.
+    """
+    activation = _relu("acc[j]") if hidden else "(data_t)acc[j]"
+    return [
+        f"#pragma HLS RESOURCE variable=weight{idx} core=ROM_1P_BRAM",
+        f"  accum_t acc[{out_dim}];",
+        "#pragma HLS ARRAY_PARTITION variable=acc complete",
+        f"  for (int j = 0; j < {out_dim}; j++) {{",
+        "#pragma HLS UNROLL",
+        f"    acc[j] = bias{idx}[j];",
+        "  }",
+        "  ReuseLoop:",
+        f"  for (int r = 0; r < {reuse}; r++) {{",
+        "#pragma HLS PIPELINE II=1 rewind",
+        "    MultLoop:",
+        f"    for (int m = 0; m < {in_dim * out_dim // reuse}; m++) {{",
+        "#pragma HLS UNROLL",
+        f"      const int k = r + m * {reuse};  // weight index i * {out_dim} + j",
+        f"      acc[k % {out_dim}] += weight{idx}[k / {out_dim}][k % {out_dim}] * x.data[k / {out_dim}];",
+        "    }",
+        "  }",
+        f"  for (int j = 0; j < {out_dim}; j++) {{",
+        "#pragma HLS UNROLL",
+        f"    y.data[j] = {activation};",
+        "  }",
+    ]
+
+
+def _write_stub_hls_project(
+    model,
+    project_dir: str,
+    model_name: str,
+    precision: str,
+    target_part: str,
+    clock_period: float,
+    reuse_factors: dict[str, int] | None = None,
+    strategy: str = "Latency",
+    binary_weights: bool = False,
+    io_type: str = "io_parallel",
+) -> None:
+    """
+    Stub firmware: io_parallel is one function pipelined at II = max R with
+    one block per layer; io_stream is one function per layer under DATAFLOW,
+    connected by hls::stream FIFOs carrying one packed vector per inference.
+    """
+    if io_type not in IO_TYPES:
+        raise ValueError(f"Type d'I/O inconnu '{io_type}' (choix: {IO_TYPES})")
+    stream = io_type == "io_stream"
     firmware_dir = os.path.join(project_dir, "firmware")
     weights_dir = os.path.join(firmware_dir, "weights")
     os.makedirs(weights_dir, exist_ok=True)
 
     dense_layers = [layer for layer in model.layers if layer.get_weights()]
+    reuse_factors = reuse_factors or {}
+    n_inputs = int(dense_layers[0].get_weights()[0].shape[0]) if dense_layers else 1
+    n_outputs = int(dense_layers[-1].get_weights()[0].shape[1]) if dense_layers else 1
 
     with open(os.path.join(firmware_dir, "parameters.h"), "w", encoding="utf-8") as f:
         lines = [
@@ -178,80 +597,129 @@ def _write_stub_hls_project(model, project_dir: str, model_name: str, precision:
             "#include \"ap_int.h\"",
             f"typedef {precision} data_t;",
             f"typedef {precision} weight_t;",
-            "typedef ap_fixed<24,10> accum_t;",
-            "typedef ap_fixed<24,10> result_t;",
+            f"typedef {STUB_ACCUM_TYPE} accum_t;",
+            f"typedef {STUB_ACCUM_TYPE} result_t;",
+            f"#define N_INPUTS {n_inputs}",
+            f"#define N_OUTPUTS {n_outputs}",
             f"#define N_LAYERS {len(dense_layers)}",
+            f"// Strategy: {strategy}",
         ]
         for idx, layer in enumerate(dense_layers, start=1):
             w = layer.get_weights()[0]
             lines.append(f"#define N_LAYER_{idx}_IN {w.shape[0]}")
             lines.append(f"#define N_LAYER_{idx}_OUT {w.shape[1]}")
+            lines.append(f"#define REUSE_FACTOR_{idx} {reuse_factors.get(layer.name, 1)}")
+        if stream:
+            lines.extend(
+                [
+                    "#define IO_STREAM",
+                    "#include \"hls_stream.h\"",
+                    "// One FIFO packet per inference: a whole layer vector",
+                    "template <typename T, int N> struct array_t { T data[N]; };",
+                    "typedef array_t<data_t, N_INPUTS> input_t;",
+                    "typedef array_t<result_t, N_OUTPUTS> output_t;",
+                ]
+            )
+            lines.extend(
+                f"typedef array_t<data_t, N_LAYER_{idx}_OUT> layer{idx}_t;" for idx in range(1, len(dense_layers))
+            )
+        if binary_weights:
+            lines.extend(DECLARATION_CHARGEMENT)
         lines.append("#endif")
         f.write("\n".join(lines))
 
+    signature = (
+        "void myproject(hls::stream<input_t>& input, hls::stream<output_t>& output)"
+        if stream
+        else "void myproject(data_t input[N_INPUTS], result_t output[N_OUTPUTS])"
+    )
     with open(os.path.join(firmware_dir, "myproject.h"), "w", encoding="utf-8") as f:
         f.write(
             "#ifndef MYPROJECT_H_\n"
             "#define MYPROJECT_H_\n"
             "#include \"parameters.h\"\n"
-            "void myproject(data_t input[1], result_t output[1]);\n"
+            f"{signature};\n"
             "#endif\n"
         )
 
-    cpp_lines = [
-        '#include "myproject.h"',
-        '#include "weights/weights.h"',
-        "",
-        "void myproject(data_t input[1], result_t output[1]) {",
-        "#pragma HLS PIPELINE II=1",
-    ]
-
-    for idx, layer in enumerate(dense_layers, start=1):
-        w = layer.get_weights()[0]
-        in_dim, out_dim = int(w.shape[0]), int(w.shape[1])
-        source = "input" if idx == 1 else f"layer{idx-1}_out"
-        cpp_lines.extend(
-            [
-                f"  data_t layer{idx}_out[{out_dim}];",
-                f"  for (int j = 0; j < {out_dim}; j++) {{",
-                f"    accum_t acc = bias{idx}[j];",
-                f"    for (int i = 0; i < {in_dim}; i++) acc += weight{idx}[i][j] * {source}[i];",
-                f"    layer{idx}_out[j] = {'acc > 0 ? acc : (accum_t)0' if idx < len(dense_layers) else 'acc'};",
-                "  }",
-            ]
-        )
+    cpp_lines = ['#include "myproject.h"', '#include "weights/weights.h"', ""]
+    if stream:
+        calls = []
+        for idx, layer in enumerate(dense_layers, start=1):
+            w = layer.get_weights()[0]
+            in_dim, out_dim = int(w.shape[0]), int(w.shape[1])
+            hidden = idx < len(dense_layers)
+            in_t = f"layer{idx-1}_t" if idx > 1 else "input_t"
+            out_t = f"layer{idx}_t" if hidden else "output_t"
+            reuse = reuse_factors.get(layer.name, 1)
+            cpp_lines.append(
+                f"// layer {idx}, reuse factor {reuse}: II = {reuse} under DATAFLOW"
+            )
+            cpp_lines.append(f"static void dense{idx}(hls::stream<{in_t}>& input, hls::stream<{out_t}>& output) {{")
+            if strategy == "Resource":
+                cpp_lines.append(f"  {in_t} x = input.read();")
+                cpp_lines.append(f"  {out_t} y;")
+                cpp_lines.extend(_dense_reuse_loop(idx, in_dim, out_dim, reuse, hidden))
+            else:
+                cpp_lines.append(f"#pragma HLS PIPELINE II={reuse}")
+                cpp_lines.append(f"  {in_t} x = input.read();")
+                cpp_lines.append(f"  {out_t} y;")
+                cpp_lines.extend(_dense_body(idx, w, precision, reuse, strategy, "x.data", "y.data", hidden))
+            cpp_lines.append("  output.write(y);")
+            cpp_lines.append("}")
+            cpp_lines.append("")
+            source = f"layer{idx-1}_out" if idx > 1 else "input"
+            calls.append(f"  dense{idx}({source}, {f'layer{idx}_out' if hidden else 'output'});")
 
-    if dense_layers:
-        cpp_lines.append(f"  output[0] = layer{len(dense_layers)}_out[0];")
+        cpp_lines.append(signature + " {")
+        cpp_lines.append("#pragma HLS INTERFACE axis port=input")
+        cpp_lines.append("#pragma HLS INTERFACE axis port=output")
+        cpp_lines.append("#pragma HLS DATAFLOW")
+        for idx in range(1, len(dense_layers)):
+            cpp_lines.append(f'  hls::stream<layer{idx}_t> layer{idx}_out("layer{idx}_out");')
+            cpp_lines.append(f"#pragma HLS STREAM variable=layer{idx}_out depth={STREAM_FIFO_DEPTH}")
+        if dense_layers:
+            cpp_lines.extend(calls)
+        else:
+            cpp_lines.append("  output_t y;")
+            cpp_lines.append("  y.data[0] = input.read().data[0];")
+            cpp_lines.append("  output.write(y);")
+        cpp_lines.append("}")
     else:
-        cpp_lines.append("  output[0] = input[0];")
-    cpp_lines.append("}")
+        ii = max(reuse_factors.values(), default=1)
+        cpp_lines.append(signature + " {")
+        cpp_lines.append(f"#pragma HLS PIPELINE II={ii}")
+        for idx, layer in enumerate(dense_layers, start=1):
+            w = layer.get_weights()[0]
+            reuse = reuse_factors.get(layer.name, 1)
+            source = "input" if idx == 1 else f"layer{idx-1}_out"
+            body = _dense_body(
+                idx, w, precision, reuse, strategy, source, f"layer{idx}_out", idx < len(dense_layers)
+            )
+            cpp_lines.append(f"  data_t layer{idx}_out[{int(w.shape[1])}];")
+            # One scope per layer: the ALLOCATION limit applies to this layer only
+            cpp_lines.append(f"  {{  // layer {idx}, reuse factor {reuse}")
+            cpp_lines.extend(line if line.startswith("#") else "  " + line for line in body)
+            cpp_lines.append("  }")
+
+        if dense_layers:
+            cpp_lines.append(f"  for (int j = 0; j < N_OUTPUTS; j++) output[j] = layer{len(dense_layers)}_out[j];")
+        else:
+            cpp_lines.append("  output[0] = input[0];")
+        cpp_lines.append("}")
 
     with open(os.path.join(firmware_dir, "myproject.cpp"), "w", encoding="utf-8") as f:
         f.write("\n".join(cpp_lines))
 
-    weight_lines = ["#ifndef WEIGHTS_H_", "#define WEIGHTS_H_", '#include "../parameters.h"', ""]
-    for idx, layer in enumerate(dense_layers, start=1):
-        weights = layer.get_weights()
-        W = weights[0]
-        b = weights[1] if len(weights) > 1 else np.zeros((W.shape[1],), dtype=np.float32)
-
-        np.savetxt(os.path.join(weights_dir, f"w{idx}.dat"), W, fmt="%.8e")
-        np.savetxt(os.path.join(weights_dir, f"b{idx}.dat"), b, fmt="%.8e")
-
-        rows, cols = W.shape
-        weight_lines.append(f"static weight_t weight{idx}[{rows}][{cols}] = {{")
-        for r in range(rows):
-            row_data = ", ".join(f"{float(x):.8e}" for x in W[r])
-            weight_lines.append(f"  {{{row_data}}},")
-        weight_lines.append("};")
-        bias_data = ", ".join(f"{float(x):.8e}" for x in b)
-        weight_lines.append(f"static weight_t bias{idx}[{len(b)}] = {{{bias_data}}};")
-        weight_lines.append("")
-
-    weight_lines.append("#endif")
-    with open(os.path.join(weights_dir, "weights.h"), "w", encoding="utf-8") as f:
-        f.write("\n".join(weight_lines))
+    # Exact float64 literals (%.17g): the firmware sees the Keras weights unchanged
+    with EcrivainPoids(weights_dir, [], binary_weights) as writer:
+        for idx, layer in enumerate(dense_layers, start=1):
+            weights = layer.get_weights()
+            W = weights[0].astype(np.float64)
+            b = weights[1].astype(np.float64) if len(weights) > 1 else np.zeros(W.shape[1])
+            writer.tableau(f"weight{idx}", "weight_t", W, "%.17g", dat=f"w{idx}")
+            writer.tableau(f"bias{idx}", "weight_t", b, "%.17g", dat=f"b{idx}")
+            writer.ligne()
 
     with open(os.path.join(project_dir, "build_prj.tcl"), "w", encoding="utf-8") as f:
         f.write(
@@ -260,6 +728,8 @@ def _write_stub_hls_project(model, project_dir: str, model_name: str, precision:
             "add_files firmware/myproject.cpp\n"
             "add_files firmware/myproject.h\n"
             "add_files firmware/parameters.h\n"
+            "add_files -tb myproject_test.cpp\n"
+            "add_files -tb tb_data\n"
             "open_solution solution1\n"
             f"set_part {{{target_part}}}\n"
             f"create_clock -period {clock_period} -name default\n"
@@ -269,22 +739,167 @@ def _write_stub_hls_project(model, project_dir: str, model_name: str, precision:
         )
 
 
+def _write_stub_testbench(model, project_dir: str, precision: str) -> np.ndarray | None:
+    """
+    Write tb_data/ inputs (uniform grid in [-1, 1]) and return the expected
+    stub firmware outputs: data/weight/result = precision, accum =
+    STUB_ACCUM_TYPE. None if the precision cannot be emulated.
+    """
+    from virgule_fixe import couches_depuis_keras, emuler_reseau, parse_type, quantifier
+
+    dense_layers = [layer for layer in model.layers if layer.get_weights()]
+    if not dense_layers:
+        return None
+    n_inputs = int(dense_layers[0].get_weights()[0].shape[0])
+    inputs = np.linspace(-1.0, 1.0, TB_SAMPLES)[:, None].repeat(n_inputs, axis=1)
+    tb_dir = os.path.join(project_dir, "tb_data")
+    os.makedirs(tb_dir, exist_ok=True)
+    np.savetxt(os.path.join(tb_dir, "tb_input_features.dat"), inputs, fmt="%.17g")
+
+    try:
+        parse_type(precision)
+    except ValueError:
+        return None
+    layers = couches_depuis_keras(model)
+    for idx, layer in enumerate(layers, start=1):
+        # The stub applies ReLU on every hidden layer, whatever the Keras activation
+        layer["activation"] = "relu" if idx < len(layers) else "linear"
+    types = {"data": precision, "weight": precision, "accum": STUB_ACCUM_TYPE, "result": precision}
+    try:
+        expected = quantifier(emuler_reseau(inputs, layers, types), STUB_ACCUM_TYPE)
+    except ValueError:
+        return None  # products wider than the float64 mantissa: no exact reference
+    np.savetxt(os.path.join(tb_dir, "tb_output_predictions.dat"), expected, fmt="%.17g")
+    return expected
+
+
+def model_fingerprint(model) -> str:
+    """SHA-256 of the model architecture (config) and weights."""
+    digest = hashlib.sha256(json.dumps(model.get_config(), sort_keys=True, default=str).encode())
+    for weights in model.get_weights():
+        digest.update(str(weights.shape).encode())
+        digest.update(np.ascontiguousarray(weights).tobytes())
+    return digest.hexdigest()
+
+
+def generation_key(fingerprint: str, config: dict[str, Any]) -> str:
+    """Key of a generated project: model fingerprint + every option that changes its files."""
+    return hashlib.sha256(json.dumps([fingerprint, config], sort_keys=True).encode()).hexdigest()
+
+
+def _sync_tree(src: str, dst: str) -> list[str]:
+    """Copy the files of src that are missing or different in dst; return their relative paths."""
+    changed = []
+    for root, _, files in os.walk(src):
+        for name in files:
+            rel = os.path.relpath(os.path.join(root, name), src)
+            target = os.path.join(dst, rel)
+            if os.path.exists(target) and filecmp.cmp(os.path.join(src, rel), target, shallow=False):
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(os.path.join(src, rel), target)
+            changed.append(rel)
+    return changed
+
+
+def _write_if_changed(path: str, content: str) -> bool:
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            if f.read() == content:
+                return False
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return True
+
+
+_project_locks: dict[str, threading.Lock] = {}
+_project_locks_guard = threading.Lock()
+
+
+def _project_lock(project_dir: str) -> threading.Lock:
+    """One generation at a time per project directory (identical concurrent jobs)."""
+    with _project_locks_guard:
+        return _project_locks.setdefault(project_dir, threading.Lock())
+
+
+def _read_report(project_dir: str) -> dict[str, Any] | None:
+    try:
+        with open(os.path.join(project_dir, "digital_report.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def project_bytes(project_dir: str, zip_path: str | None = None) -> int:
+    """Disk usage of a project directory and its zip (recorded in output_bytes)."""
+    total = 0
+    for root, _, files in os.walk(project_dir):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    if zip_path and os.path.exists(zip_path):
+        total += os.path.getsize(zip_path)
+    return total
+
+
 def save_uploaded_model(uploaded_file, model_basename: str | None = None) -> tuple[str, str]:
+    """
+    Save an upload as UPLOADS_ROOT/{name}_{content hash prefix}{ext}, a hard
+    link to the content-addressed copy UPLOADS_STORE/{sha256}{ext}: identical
+    uploads share one copy on disk (cf. digital_hls_gc).
+    """
     ext = os.path.splitext(uploaded_file.name)[1].lower()
     if ext not in {".keras", ".h5"}:
         raise ValueError("Formats acceptés: .keras ou .h5")
 
     base_name = _safe_name(model_basename or os.path.splitext(uploaded_file.name)[0])
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{base_name}_{ts}{ext}"
-    model_path = os.path.join(UPLOADS_ROOT, filename)
+    content = uploaded_file.getbuffer()
+    digest = hashlib.sha256(content).hexdigest()
+    model_path = os.path.join(UPLOADS_ROOT, f"{base_name}_{digest[:GENERATION_KEY_LENGTH]}{ext}")
 
-    with open(model_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
+    blob_path = os.path.join(UPLOADS_STORE, digest + ext)
+    if not os.path.exists(blob_path):
+        fd, tmp_path = tempfile.mkstemp(dir=UPLOADS_STORE, suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, blob_path)
+
+    if not os.path.exists(model_path):
+        try:
+            os.link(blob_path, model_path)
+        except OSError:
+            # No hard links on this filesystem: plain copy
+            shutil.copyfile(blob_path, model_path)
+    # Last use of this content (links share one inode), for the LRU eviction
+    os.utime(model_path)
 
     return model_path, base_name
 
 
+def _result_from_report(
+    job_id: int, project_dir: str, zip_path: str, report: dict[str, Any], cache_hit: bool
+) -> dict[str, Any]:
+    return {
+        "job_id": job_id,
+        "project_dir": project_dir,
+        "zip_path": zip_path,
+        "resources": report["resources"],
+        "latency": report["latency"],
+        "engine": report["engine"],
+        "target_part": report["target_part"],
+        "clock_period": report["clock_period_ns"],
+        "precision": report["precision"],
+        "io_type": report["io_type"],
+        "strategy": report["strategy"],
+        "design_space": report.get("design_space"),
+        "csim": report.get("csim"),
+        "generation_key": report["generation_key"],
+        "cache_hit": cache_hit,
+    }
+
+
 def generate_hls_project_from_model(
     model_path: str,
     model_name: str,
@@ -293,67 +908,155 @@ def generate_hls_project_from_model(
     precision: str = "ap_fixed<16,6>",
     io_type: str = "io_parallel",
     backend: str = "Vivado",
+    reuse_factor: int | dict[str, int] = 1,
+    strategy: str = "Latency",
+    explore: bool = False,
+    binary_weights: bool = False,
+    job_id: int | None = None,
+    progress: Callable[[float, str], None] | None = None,
 ) -> dict[str, Any]:
-    import tensorflow as tf
+    """
+    Generate (or reuse) the HLS project of a model.
 
+    job_id: existing digital_hls_jobs row to update (queued jobs, cf.
+    digital_hls_queue); a new row is inserted otherwise. progress(fraction,
+    message) is called between stages and may raise JobCancelled.
+    """
     safe_model_name = _safe_name(model_name)
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    project_name = f"{safe_model_name}_{ts}"
-    project_dir = os.path.join(HLS_ROOT, project_name)
-    os.makedirs(project_dir, exist_ok=True)
+    progress = progress or (lambda fraction, message: None)
 
     conn = sqlite3.connect(DB_PATH)
     _ensure_digital_table(conn)
-    job_id = _insert_job(
-        conn,
-        model_name=safe_model_name,
-        input_model_path=model_path,
-        backend="hls4ml",
-        precision=precision,
-        target_part=target_part,
-        clock_period=clock_period,
-        io_type=io_type,
-    )
+    if job_id is None:
+        job_id = _insert_job(
+            conn,
+            model_name=safe_model_name,
+            input_model_path=model_path,
+            backend="hls4ml",
+            precision=precision,
+            target_part=target_part,
+            clock_period=clock_period,
+            io_type=io_type,
+        )
 
+    project_lock = None
     try:
-        model = tf.keras.models.load_model(model_path)
-        resources, latency = _estimate_resources_and_latency(model, precision=precision, clock_period=clock_period)
+        progress(0.05, "Chargement du modèle")
+        model = registre_modeles.charger_modele(model_path)
+        config = {
+            "precision": precision,
+            "target_part": target_part,
+            "clock_period": float(clock_period),
+            "io_type": io_type,
+            "backend": backend,
+            "reuse_factor": reuse_factor,
+            "strategy": strategy,
+            "binary_weights": binary_weights,
+        }
+        key = generation_key(model_fingerprint(model), config)
+        project_dir = os.path.join(HLS_ROOT, f"{safe_model_name}_{key[:GENERATION_KEY_LENGTH]}")
+        zip_path = project_dir + ".zip"
+        project_lock = _project_lock(project_dir)
+        project_lock.acquire()
 
-        engine = "hls4ml"
-        try:
-            hls4ml = importlib.import_module("hls4ml")
-
-            hls_config = hls4ml.utils.config_from_keras_model(model, granularity="name")
-            hls_config["Model"]["Precision"] = precision
-            hls_config["Model"]["ReuseFactor"] = 1
-            hls_config["Model"]["Strategy"] = "Latency"
-
-            hls_model = hls4ml.converters.convert_from_keras_model(
-                model,
-                hls_config=hls_config,
-                output_dir=project_dir,
-                backend=backend,
-                project_name="myproject",
-                part=target_part,
-                clock_period=float(clock_period),
-                io_type=io_type,
+        # Same model and options: reuse the project and its zip as they are
+        previous = _read_report(project_dir)
+        if previous is not None and previous.get("generation_key") != key:
+            previous = None
+        if previous and os.path.exists(zip_path) and (previous.get("design_space") or not explore):
+            _update_job_success(
+                conn,
+                job_id=job_id,
+                output_project_dir=project_dir,
+                output_zip_path=zip_path,
+                resources=previous["resources"],
+                latency=previous["latency"],
+                generation_key=key,
+                cache_hit=True,
             )
-            hls_model.compile()
-
-            with open(os.path.join(project_dir, "hls4ml_config.json"), "w", encoding="utf-8") as f:
-                json.dump(hls_config, f, indent=2)
-
-        except Exception:
-            engine = "stub"
-            _write_stub_hls_project(
-                model=model,
-                project_dir=project_dir,
-                model_name=safe_model_name,
-                precision=precision,
-                target_part=target_part,
-                clock_period=float(clock_period),
+            return _result_from_report(job_id, project_dir, zip_path, previous, cache_hit=True)
+
+        progress(0.15, "Estimation ressources / latence")
+        resources, latency = _estimate_resources_and_latency(
+            model,
+            precision=precision,
+            clock_period=clock_period,
+            reuse_factor=reuse_factor,
+            strategy=strategy,
+            target_part=target_part,
+            io_type=io_type,
+        )
+        reuse_factors = resources["reuse_factors"]
+        design_space = None
+        if explore:
+            progress(0.2, "Exploration de l'espace de conception")
+            design_space = explore_design_space(
+                model, precision=precision, target_part=target_part, io_type=io_type
             )
 
+        progress(0.3, "Génération du projet HLS")
+
+        # Generate in a staging directory, then copy only the files that differ
+        staging_dir = tempfile.mkdtemp(prefix=".staging_", dir=HLS_ROOT)
+        try:
+            engine = "hls4ml"
+            expected = None
+            try:
+                hls4ml = importlib.import_module("hls4ml")
+
+                hls_config = hls4ml.utils.config_from_keras_model(model, granularity="name")
+                hls_config["Model"]["Precision"] = precision
+                hls_config["Model"]["ReuseFactor"] = max(reuse_factors.values(), default=1)
+                hls_config["Model"]["Strategy"] = strategy
+                for layer_name, layer_reuse in reuse_factors.items():
+                    if layer_name in hls_config.get("LayerName", {}):
+                        hls_config["LayerName"][layer_name]["ReuseFactor"] = layer_reuse
+                        hls_config["LayerName"][layer_name]["Strategy"] = strategy
+
+                hls_model = hls4ml.converters.convert_from_keras_model(
+                    model,
+                    hls_config=hls_config,
+                    output_dir=staging_dir,
+                    backend=backend,
+                    project_name="myproject",
+                    part=target_part,
+                    clock_period=float(clock_period),
+                    io_type=io_type,
+                )
+                hls_model.compile()
+
+                with open(os.path.join(staging_dir, "hls4ml_config.json"), "w", encoding="utf-8") as f:
+                    json.dump(hls_config, f, indent=2)
+
+            except Exception:
+                engine = "stub"
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                os.makedirs(staging_dir)
+                _write_stub_hls_project(
+                    model=model,
+                    project_dir=staging_dir,
+                    model_name=safe_model_name,
+                    precision=precision,
+                    target_part=target_part,
+                    clock_period=float(clock_period),
+                    reuse_factors=reuse_factors,
+                    strategy=strategy,
+                    binary_weights=binary_weights,
+                    io_type=io_type,
+                )
+                expected = _write_stub_testbench(model, staging_dir, precision)
+            changed = _sync_tree(staging_dir, project_dir)
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+        csim = None
+        if engine == "stub":
+            # Firmware and testbench data unchanged: the previous C simulation still holds
+            csim = previous.get("csim") if previous and not changed else None
+            if csim is None:
+                progress(0.6, "Compilation et simulation C++")
+                csim = executer_csim(project_dir, expected, safe_model_name)
+
         report_payload = {
             "engine": engine,
             "model_name": safe_model_name,
@@ -361,13 +1064,27 @@ def generate_hls_project_from_model(
             "clock_period_ns": float(clock_period),
             "precision": precision,
             "io_type": io_type,
+            "strategy": strategy,
+            "binary_weights": binary_weights and engine == "stub",
+            "generation_key": key,
             "resources": resources,
             "latency": latency,
         }
-        with open(os.path.join(project_dir, "digital_report.json"), "w", encoding="utf-8") as f:
-            json.dump(report_payload, f, indent=2)
+        if csim:
+            report_payload["csim"] = csim
+        if design_space:
+            report_payload["design_space"] = {
+                "points_evaluated": len(design_space["points"]),
+                "points_fitting": design_space["points_fitting"],
+                "pareto": design_space["pareto"],
+            }
+        report_changed = _write_if_changed(
+            os.path.join(project_dir, "digital_report.json"), json.dumps(report_payload, indent=2)
+        )
 
-        zip_path = shutil.make_archive(project_dir, "zip", project_dir)
+        if changed or report_changed or not os.path.exists(zip_path):
+            progress(0.9, "Archive du projet")
+            zip_path = shutil.make_archive(project_dir, "zip", project_dir)
         _update_job_success(
             conn,
             job_id=job_id,
@@ -375,22 +1092,17 @@ def generate_hls_project_from_model(
             output_zip_path=zip_path,
             resources=resources,
             latency=latency,
+            generation_key=key,
         )
 
-        return {
-            "job_id": job_id,
-            "project_dir": project_dir,
-            "zip_path": zip_path,
-            "resources": resources,
-            "latency": latency,
-            "engine": engine,
-            "target_part": target_part,
-            "clock_period": float(clock_period),
-            "precision": precision,
-            "io_type": io_type,
-        }
+        return _result_from_report(job_id, project_dir, zip_path, report_payload, cache_hit=False)
+    except JobCancelled:
+        _update_job_error(conn, job_id=job_id, error_message="Annulé", status="cancelled")
+        raise
     except Exception as exc:
         _update_job_error(conn, job_id=job_id, error_message=str(exc))
         raise
     finally:
+        if project_lock is not None:
+            project_lock.release()
         conn.close()
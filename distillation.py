@@ -0,0 +1,174 @@
+"""
+DISTILLATION — distillation.py
+Compression du MLP entraîné (professeur, ~35k paramètres) en un réseau
+compact (élève) destiné à l'export HLS :
+  - cibles = prédictions du professeur sur une grille dense
+             + points de simulation (vérité terrain), pondérés par alpha
+  - élèves triés par nombre de paramètres décroissant, arrêt au premier
+    échec, le plus petit élève valide est retenu
+  - critère : E_rel(simulation) < seuil, ou, si le professeur lui-même
+    dépasse le seuil, E_rel ≤ E_rel(professeur) × (1 + tolerance)
+Sortie : models/{composant}_model_compact.keras (plus petit élève valide),
+utilisé en priorité par hls_converter.convertir_hls.
+"""
+
+import json
+import os
+import numpy as np
+
+from metriques import SEUIL_IA_PASS, toutes_metriques
+from recherche_hyperparams import nb_parametres
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
+
+# Architectures élèves (couches cachées) ; essayées par nombre de
+# paramètres décroissant (ordonner_etudiants), pas dans l'ordre de la liste
+ETUDIANTS = [
+    (32, 32, 16),
+    (32, 16),
+    (16, 16),
+    (16, 8),
+    (16,),
+    (8, 8),
+    (8,),
+    (4,),
+]
+
+
+def chemin_modele_compact(composant_nom: str) -> str:
+    return os.path.join(MODELS_DIR, f"{composant_nom}_model_compact.keras")
+
+
+def ordonner_etudiants(etudiants: list[tuple[int, ...]]) -> list[tuple[int, ...]]:
+    """Architectures par nombre de paramètres décroissant (ordre stable à égalité)."""
+    return sorted(etudiants, key=nb_parametres, reverse=True)
+
+
+def selectionner_eleve(etudiants: list[tuple[int, ...]], evaluer, limite: float):
+    """
+    Essaie les élèves du plus grand au plus petit et s'arrête au premier
+    échec (E_rel > limite) : un élève plus petit ferait au mieux pareil.
+
+    Args:
+        evaluer: couches -> (E_rel %, modèle entraîné)
+
+    Returns:
+        (couches, E_rel, modèle) de l'élève valide le plus petit, ou None
+    """
+    retenu = None
+    for couches in ordonner_etudiants(etudiants):
+        e_rel, modele = evaluer(couches)
+        valide = e_rel <= limite
+        print(f"[DISTIL] Élève {couches}: {nb_parametres(couches)} paramètres, "
+              f"E_rel={e_rel:.2f}% → {'OK' if valide else 'ÉCHEC'}")
+        if not valide:
+            break
+        if retenu is None or nb_parametres(couches) < nb_parametres(retenu[0]):
+            retenu = (couches, e_rel, modele)
+    return retenu
+
+
+def distiller(composant_nom: str,
+              etudiants: list[tuple[int, ...]] = ETUDIANTS,
+              alpha: float = 0.5,
+              n_grille: int = 4000,
+              epochs: int = 300,
+              seuil: float = SEUIL_IA_PASS,
+              tolerance: float = 0.10) -> dict | None:
+    """
+    Distille le modèle du composant en réseaux de plus en plus petits.
+
+    Args:
+        composant_nom: Nom du composant (modèle + simulation requis)
+        etudiants:     Architectures candidates (triées par ordonner_etudiants)
+        alpha:         Poids des points de simulation vs cibles du professeur
+        n_grille:      Points de la grille dense évaluée par le professeur
+        epochs:        Époques max par élève (EarlyStopping actif)
+        seuil:         E_rel (%) visé, défaut SEUIL_IA_PASS
+        tolerance:     Dégradation relative admise si le professeur échoue
+
+    Returns:
+        dict décrivant l'élève retenu, ou None si aucun n'est valide
+    """
+    from tensorflow import keras
+    from simulateur import charger_simulation
+    from trainer import _build_model
+    import registre_modeles
+
+    model_path = os.path.join(MODELS_DIR, f"{composant_nom}_model.keras")
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(
+            f"Modèle introuvable: {model_path}. Entraînez d'abord avec trainer.py."
+        )
+    sim = charger_simulation(composant_nom)
+    if sim is None:
+        raise ValueError(f"Aucune simulation pour '{composant_nom}'.")
+    V_sim, I_sim = sim
+
+    professeur = registre_modeles.charger_modele(model_path)
+    scaler_V, scaler_I = registre_modeles.charger_scalers(composant_nom)
+
+    V_sim_s = scaler_V.transform(V_sim.reshape(-1, 1))
+    I_sim_s = scaler_I.transform(I_sim.reshape(-1, 1))
+
+    def _e_rel(model) -> float:
+        I_s = model.predict(V_sim_s, batch_size=4096, verbose=0)
+        return toutes_metriques(I_sim, scaler_I.inverse_transform(I_s).flatten())["E_rel_%"]
+
+    # Jeu de distillation : grille dense étiquetée par le professeur + simulation
+    V_grille_s = np.linspace(V_sim_s.min(), V_sim_s.max(), n_grille).reshape(-1, 1)
+    I_prof_s   = professeur.predict(V_grille_s, batch_size=4096, verbose=0)
+    X = np.concatenate([V_grille_s, V_sim_s]).astype(np.float32)
+    y = np.concatenate([I_prof_s, I_sim_s]).astype(np.float32)
+    poids = np.concatenate([
+        np.full(len(V_grille_s), (1.0 - alpha) / len(V_grille_s)),
+        np.full(len(V_sim_s), alpha / len(V_sim_s)),
+    ]) * len(X)
+
+    e_rel_prof = _e_rel(professeur)
+    limite = seuil if e_rel_prof < seuil else e_rel_prof * (1.0 + tolerance)
+    n_prof = int(professeur.count_params())
+    print(f"[DISTIL] Professeur '{composant_nom}': {n_prof} paramètres, "
+          f"E_rel={e_rel_prof:.2f}% → limite élève {limite:.2f}%")
+
+    def _evaluer(couches: tuple[int, ...]):
+        eleve = _build_model(couches=couches)
+        eleve.fit(
+            X, y, sample_weight=poids,
+            epochs=epochs, batch_size=128, shuffle=True, verbose=0,
+            callbacks=[
+                keras.callbacks.EarlyStopping(monitor="loss", patience=25,
+                                              restore_best_weights=True),
+                keras.callbacks.ReduceLROnPlateau(monitor="loss", factor=0.5,
+                                                  patience=10, min_lr=1e-6),
+            ],
+        )
+        return _e_rel(eleve), eleve
+
+    selection = selectionner_eleve(etudiants, _evaluer, limite)
+    if selection is None:
+        print(f"[DISTIL] Aucun élève valide pour '{composant_nom}'.")
+        return None
+    couches, e_rel, modele_retenu = selection
+    retenu = {
+        "couches":        list(couches),
+        "n_params":       nb_parametres(couches),
+        "E_rel_%":        e_rel,
+        "professeur":     {"n_params": n_prof, "E_rel_%": e_rel_prof},
+        "limite_E_rel_%": limite,
+    }
+
+    chemin = chemin_modele_compact(composant_nom)
+    modele_retenu.save(chemin)
+    with open(chemin.replace(".keras", ".json"), "w", encoding="utf-8") as f:
+        json.dump(retenu, f, indent=2)
+    print(f"[DISTIL] Modèle compact {tuple(retenu['couches'])} "
+          f"({retenu['n_params']} vs {n_prof} paramètres) sauvegardé: {chemin}")
+    return retenu
+
+
+if __name__ == "__main__":
+    import sys
+    nom = sys.argv[1] if len(sys.argv) > 1 else "1N4007"
+    res = distiller(nom)
+    print(f"\nDistillation {nom}: {res}")
@@ -0,0 +1,177 @@
+"""
+ÉLAGAGE — elagage.py
+Élagage par magnitude du MLP entraîné avant l'export HLS :
+  - sparsité atteinte progressivement (PALIERS, calendrier cubique
+    s_k = s·(1 - (1 - k/PALIERS)³)), seuil |w| par couche
+  - fine-tuning après chaque palier, masques ré-appliqués à chaque batch
+  - biais conservés
+Sortie : models/{composant}_model_elague.keras (+ .json : sparsité par
+couche, MAC non nuls, E_rel/R² avant et après). Le générateur firmware
+(hls_converter) n'émet que les MAC dont le poids quantifié est non nul.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from metriques import toutes_metriques
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
+
+SPARSITE_DEFAUT  = 0.7
+PALIERS          = 4
+PATIENCE_ELAGAGE = 8
+
+
+def chemin_modele_elague(composant_nom: str) -> str:
+    return os.path.join(MODELS_DIR, f"{composant_nom}_model_elague.keras")
+
+
+def calendrier(sparsite: float, paliers: int = PALIERS) -> list[float]:
+    """Sparsité visée à chaque palier (croissance rapide puis raffinement)."""
+    return [sparsite * (1.0 - (1.0 - k / paliers) ** 3) for k in range(1, paliers + 1)]
+
+
+def masque_magnitude(W: np.ndarray, sparsite: float) -> np.ndarray:
+    """Masque booléen conservant les (1 - sparsite)·n poids de plus grande magnitude."""
+    n_zero = int(round(np.clip(sparsite, 0.0, 1.0) * W.size))
+    masque = np.ones(W.shape, dtype=bool)
+    if n_zero:
+        ordre = np.argsort(np.abs(W), axis=None, kind="stable")
+        masque.flat[ordre[:n_zero]] = False
+    return masque
+
+
+def compter_macs(couches: list[dict]) -> dict:
+    """MAC denses et non nuls d'une liste de couches {'W', ...} (poids éventuellement quantifiés)."""
+    total = sum(int(c["W"].size) for c in couches)
+    non_nuls = sum(int(np.count_nonzero(c["W"])) for c in couches)
+    return {"macs": total, "macs_non_nuls": non_nuls,
+            "sparsite": 1.0 - non_nuls / total if total else 0.0}
+
+
+def elaguer(composant_nom: str,
+            sparsite: float = SPARSITE_DEFAUT,
+            paliers: int = PALIERS,
+            epochs: int | None = None,
+            learning_rate: float | None = None,
+            modele: str = "base") -> dict:
+    """
+    Élague le MLP du composant jusqu'à la sparsité visée avec fine-tuning.
+
+    Args:
+        composant_nom: Nom du composant (modèle + simulation requis)
+        sparsite:      Fraction des poids (hors biais) mis à zéro, par couche
+        paliers:       Nombre de paliers du calendrier d'élagage
+        epochs:        Époques max de fine-tuning par palier (défaut: trainer.EPOCHS_FINETUNE)
+        learning_rate: Taux d'apprentissage (défaut: trainer.LR_FINETUNE)
+        modele:        Modèle de départ ('base' ou 'compact')
+
+    Returns:
+        Métadonnées : sparsité par couche, MAC, E_rel/R² avant et après
+    """
+    from tensorflow import keras
+    import registre_modeles
+    from hls_converter import chemin_modele_hls
+    from simulateur import charger_simulation
+    from trainer import (EPOCHS_FINETUNE, LR_FINETUNE, poids_regions,
+                         regions_iv, split_stratifie)
+    from virgule_fixe import couches_depuis_keras
+
+    if not 0.0 <= sparsite < 1.0:
+        raise ValueError(f"Sparsité hors plage [0, 1): {sparsite}")
+    epochs = epochs or EPOCHS_FINETUNE
+    learning_rate = learning_rate or LR_FINETUNE
+
+    source_path = chemin_modele_hls(composant_nom, modele)
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(
+            f"Modèle introuvable: {source_path}. Entraînez d'abord avec trainer.py."
+        )
+    sim = charger_simulation(composant_nom)
+    if sim is None:
+        raise ValueError(f"Aucune simulation pour '{composant_nom}'.")
+    V_sim, I_sim = sim
+
+    source = registre_modeles.charger_modele(source_path)
+    scaler_V, scaler_I = registre_modeles.charger_scalers(composant_nom)
+    x = scaler_V.transform(V_sim.reshape(-1, 1))
+    y = scaler_I.transform(I_sim.reshape(-1, 1))
+
+    regions = regions_iv(V_sim, I_sim)
+    idx_train, idx_val = split_stratifie(regions)
+    poids = poids_regions(regions)
+
+    def evaluer(model) -> dict:
+        I_pred = scaler_I.inverse_transform(model.predict(x, batch_size=4096, verbose=0))
+        return toutes_metriques(I_sim, I_pred.ravel())
+
+    model = keras.models.clone_model(source)
+    model.set_weights(source.get_weights())
+    model.compile(optimizer=keras.optimizers.Adam(learning_rate=learning_rate),
+                  loss="mse", metrics=["mae"])
+    denses = [l for l in model.layers if l.get_weights()]
+    masques = [np.ones(l.kernel.shape, dtype=bool) for l in denses]
+
+    def appliquer_masques():
+        for l, m in zip(denses, masques):
+            l.kernel.assign(l.kernel.numpy() * m)
+
+    class _Masques(keras.callbacks.Callback):
+        def on_train_batch_end(self, batch, logs=None):
+            appliquer_masques()
+
+    avant = evaluer(model)
+    print(f"[ELAG] '{composant_nom}' avant: E_rel={avant['E_rel_%']:.2f}% | R²={avant['R2']:.6f}")
+
+    for k, cible in enumerate(calendrier(sparsite, paliers), start=1):
+        for i, l in enumerate(denses):
+            masques[i] = masque_magnitude(l.kernel.numpy(), cible)
+        appliquer_masques()
+        model.fit(
+            x[idx_train], y[idx_train],
+            sample_weight=poids[idx_train],
+            epochs=epochs, batch_size=64, verbose=0,
+            validation_data=(x[idx_val], y[idx_val], poids[idx_val]),
+            callbacks=[
+                _Masques(),
+                keras.callbacks.EarlyStopping(monitor="val_loss", patience=PATIENCE_ELAGAGE,
+                                              restore_best_weights=True),
+            ],
+        )
+        appliquer_masques()
+        m = evaluer(model)
+        print(f"[ELAG] Palier {k}/{paliers} sparsité {cible:.1%}: "
+              f"E_rel={m['E_rel_%']:.2f}% | R²={m['R2']:.6f}")
+
+    apres = evaluer(model)
+    couches = couches_depuis_keras(model)
+    macs = compter_macs(couches)
+    print(f"[ELAG] '{composant_nom}' après : E_rel={apres['E_rel_%']:.2f}% | R²={apres['R2']:.6f} "
+          f"| MAC {macs['macs_non_nuls']}/{macs['macs']}")
+
+    chemin = chemin_modele_elague(composant_nom)
+    model.save(chemin)
+    registre_modeles.invalider(chemin)
+    meta = {
+        "sparsite":          sparsite,
+        "paliers":           paliers,
+        "source":            os.path.basename(source_path),
+        "sparsite_couches":  {c["nom"]: 1.0 - np.count_nonzero(c["W"]) / c["W"].size
+                              for c in couches},
+        **macs,
+        "avant":             {"E_rel_%": avant["E_rel_%"], "R2": avant["R2"], "MAE": avant["MAE"]},
+        "apres":             {"E_rel_%": apres["E_rel_%"], "R2": apres["R2"], "MAE": apres["MAE"]},
+    }
+    with open(chemin.replace(".keras", ".json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    print(f"[ELAG] Modèle élagué sauvegardé: {chemin}")
+    return meta
+
+
+if __name__ == "__main__":
+    import sys
+    nom = sys.argv[1] if len(sys.argv) > 1 else "1N4007"
+    s   = float(sys.argv[2]) if len(sys.argv) > 2 else SPARSITE_DEFAUT
+    print(elaguer(nom, sparsite=s))
@@ -0,0 +1,272 @@
+"""
+ENTRAÎNEMENT INFORMÉ PAR LA PHYSIQUE — entrainement_physique.py
+Perte = MSE données (points simulés) + λ × résidu de l'équation implicite de
+la diode (simulateur._equation_diode) en des tensions de collocation
+aléatoires, qui ne coûtent aucune simulation :
+  r = (I - I_modèle(V, I)) / (|I| + |I_modèle| + plancher)
+  I_modèle = IS·(exp((V - I·RS)/(N·VT)) - 1), ou -IBV en claquage
+Résidu relatif symétrique (borné) : pertinent sur toutes les décades du
+courant ; le plancher (fraction de la plage de I) évite d'imposer en inverse
+une précision inférieure à la résolution de la sortie normalisée.
+Les points de collocation passent dans model.fit avec les données : la
+cible empaquette [I_s, masque données, V_s] (callbacks Keras inchangés).
+Sortie : mêmes artefacts que trainer.entrainer, et
+models/{composant}_pinn_benchmark.json pour comparer_entrainements.
+"""
+
+import json
+import os
+import sqlite3
+import time
+import numpy as np
+import joblib
+
+from metriques import toutes_metriques
+from simulateur import VT
+
+DB_PATH    = os.path.join(os.path.dirname(__file__), "composants_db.sqlite")
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
+
+LAMBDA_PHYSIQUE = 0.1     # poids du résidu dans la perte
+PLANCHER_REL    = 1e-3    # plancher du résidu, en fraction de la plage de I
+EPOCHS_RAMPE    = 50      # montée linéaire de λ (le résidu relatif sature loin
+                          # de la solution : on part d'un ajustement aux données)
+
+
+def residu_diode(V: np.ndarray, I: np.ndarray, params: dict,
+                 plancher: float) -> np.ndarray:
+    """Résidu relatif de l'équation diode (NumPy, même forme que la perte)."""
+    exp_arg = np.clip((V - I * params["RS"]) / (params["N"] * VT), -500, 500)
+    I_modele = params["IS"] * (np.exp(exp_arg) - 1.0)
+    I_modele = np.where(V < -params["BV"] + 0.1, -params["IBV"], I_modele)
+    return (I - I_modele) / (np.abs(I) + np.abs(I_modele) + plancher)
+
+
+def creer_perte_physique(params: dict, scaler_V, scaler_I,
+                         lambda_phys: float = LAMBDA_PHYSIQUE,
+                         plancher_rel: float = PLANCHER_REL):
+    """
+    Perte Keras sur cibles empaquetées y_true = [I_s, masque, V_s] :
+    MSE sur les lignes masque=1 (données), λ·résidu² sur masque=0
+    (collocation). Calcul du résidu en float64 (exponentielle).
+    λ effectif = lambda_phys × perte.rampe (tf.Variable dans [0, 1]).
+    """
+    import tensorflow as tf
+    from prediction import _affine
+
+    aV, bV = _affine(scaler_V.transform)
+    aI, bI = _affine(scaler_I.transform)
+    plancher = plancher_rel / aI
+    IS, RS, N = params["IS"], params["RS"], params["N"]
+    BV, IBV = params["BV"], params["IBV"]
+    rampe = tf.Variable(1.0, trainable=False, dtype=tf.float32)
+
+    def perte(y_true, y_pred):
+        I_vrai, masque, V_s = y_true[:, 0], y_true[:, 1], y_true[:, 2]
+        I_s = y_pred[:, 0]
+        n_data = tf.maximum(tf.reduce_sum(masque), 1.0)
+        mse = tf.reduce_sum(masque * tf.square(I_s - I_vrai)) / n_data
+        if not lambda_phys:
+            return mse
+
+        V = (tf.cast(V_s, tf.float64) - bV) / aV
+        I = (tf.cast(I_s, tf.float64) - bI) / aI
+        exp_arg = tf.clip_by_value((V - I * RS) / (N * VT), -500.0, 500.0)
+        I_modele = IS * (tf.exp(exp_arg) - 1.0)
+        I_modele = tf.where(V < -BV + 0.1, tf.constant(-IBV, tf.float64), I_modele)
+        r = (I - I_modele) / (tf.abs(I) + tf.abs(I_modele) + plancher)
+
+        colloc = 1.0 - masque
+        n_colloc = tf.maximum(tf.reduce_sum(colloc), 1.0)
+        phys = tf.reduce_sum(colloc * tf.cast(tf.square(r), tf.float32)) / n_colloc
+        return mse + lambda_phys * rampe * phys
+
+    perte.rampe = rampe
+    return perte
+
+
+def _sous_echantillonner(V: np.ndarray, I: np.ndarray, n_points: int | None):
+    """n_points répartis comme la simulation (densité du genou conservée), bornes incluses."""
+    if not n_points or n_points >= len(V):
+        return V, I
+    idx = np.unique(np.linspace(0, len(V) - 1, n_points).round().astype(int))
+    return V[idx], I[idx]
+
+
+def _entrainer(V: np.ndarray, I: np.ndarray, params: dict,
+               lambda_phys: float, n_colloc: int, epochs: int,
+               seed: int = 0) -> tuple:
+    """Entraîne un MLP (trainer._build_model). Retourne (model, scaler_V, scaler_I, infos)."""
+    import tensorflow as tf
+    from tensorflow import keras
+    from sklearn.preprocessing import MinMaxScaler
+    from trainer import _build_model
+
+    tf.keras.utils.set_random_seed(seed)
+    rng = np.random.default_rng(seed)
+
+    scaler_V = MinMaxScaler(feature_range=(0, 1)).fit(V.reshape(-1, 1))
+    scaler_I = MinMaxScaler(feature_range=(0, 1)).fit(I.reshape(-1, 1))
+    V_s = scaler_V.transform(V.reshape(-1, 1)).ravel()
+    I_s = scaler_I.transform(I.reshape(-1, 1)).ravel()
+
+    # Cibles empaquetées : données puis collocation (V_s uniforme sur [0, 1])
+    n_c = n_colloc if lambda_phys else 0
+    V_c = rng.uniform(0.0, 1.0, n_c)
+    X = np.concatenate([V_s, V_c]).reshape(-1, 1).astype(np.float32)
+    y = np.column_stack([
+        np.concatenate([I_s, np.zeros(n_c)]),
+        np.concatenate([np.ones(len(V_s)), np.zeros(n_c)]),
+        np.concatenate([V_s, V_c]),
+    ]).astype(np.float32)
+    perm = rng.permutation(len(X))
+    X, y = X[perm], y[perm]
+
+    model = _build_model()
+    perte = creer_perte_physique(params, scaler_V, scaler_I, lambda_phys)
+    model.compile(optimizer=model.optimizer, loss=perte)
+    rampe = keras.callbacks.LambdaCallback(
+        on_epoch_begin=lambda epoch, logs: perte.rampe.assign(
+            min(1.0, epoch / EPOCHS_RAMPE)))
+    # EarlyStopping armé après la rampe (val_loss non comparable pendant)
+    arret = keras.callbacks.EarlyStopping(monitor="val_loss", patience=30,
+                                          restore_best_weights=True, verbose=0,
+                                          start_from_epoch=EPOCHS_RAMPE if lambda_phys else 0)
+    t0 = time.perf_counter()
+    history = model.fit(
+        X, y, epochs=epochs, batch_size=64, validation_split=0.1,
+        callbacks=[rampe, arret, keras.callbacks.ReduceLROnPlateau(
+            monitor="val_loss", factor=0.5, patience=15, min_lr=1e-6, verbose=0)],
+        verbose=0,
+    )
+    duree = time.perf_counter() - t0
+
+    # Perte standard pour la sauvegarde (.keras rechargeable sans la closure)
+    model.compile(optimizer=model.optimizer, loss="mse", metrics=["mae"])
+    infos = {
+        "lambda_phys":     lambda_phys,
+        "points_simules":  int(len(V)),
+        "points_colloc":   int(n_c),
+        "epochs":          len(history.history["loss"]),
+        "meilleure_epoch": int(arret.best_epoch) + 1 if arret.best_weights is not None
+                           else len(history.history["loss"]),
+        "duree_s":         round(duree, 2),
+    }
+    return model, scaler_V, scaler_I, infos
+
+
+def _predire(model, scaler_V, scaler_I, V: np.ndarray) -> np.ndarray:
+    I_s = model.predict(scaler_V.transform(V.reshape(-1, 1)), batch_size=4096, verbose=0)
+    return scaler_I.inverse_transform(I_s).flatten()
+
+
+def _charger_composant_diode(composant_nom: str) -> tuple[int, dict, np.ndarray, np.ndarray]:
+    from simulateur import charger_simulation
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, type, params_json FROM composants WHERE nom = ?",
+                   (composant_nom,))
+    row = cursor.fetchone()
+    conn.close()
+    if not row:
+        raise ValueError(f"Composant '{composant_nom}' introuvable.")
+    if row[1] != "diode":
+        raise NotImplementedError(f"Résidu physique non disponible pour le type '{row[1]}'.")
+    sim = charger_simulation(composant_nom)
+    if sim is None:
+        raise ValueError(f"Aucune simulation pour '{composant_nom}'. "
+                         f"Lancez simulateur.py d'abord.")
+    return row[0], json.loads(row[2]), sim[0], sim[1]
+
+
+def entrainer_physique(composant_nom: str,
+                       lambda_phys: float = LAMBDA_PHYSIQUE,
+                       n_points: int | None = None,
+                       n_colloc: int = 2000,
+                       epochs: int = 400) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Entraîne le MLP du composant avec la perte physique et enregistre les
+    mêmes artefacts que trainer.entrainer.
+
+    Args:
+        composant_nom: Nom du composant (diode, simulation requise)
+        lambda_phys:   Poids du résidu (0 → entraînement données seul)
+        n_points:      Sous-échantillon de la simulation utilisé (None = tout)
+        n_colloc:      Tensions de collocation aléatoires
+        epochs:        Nombre max d'époques (EarlyStopping actif)
+
+    Returns:
+        (V_pred, I_pred) sur les points de la simulation complète
+    """
+    from trainer import _chemin_meta, _enregistrer_modele_ia
+
+    comp_id, params, V_sim, I_sim = _charger_composant_diode(composant_nom)
+    V, I = _sous_echantillonner(V_sim, I_sim, n_points)
+    print(f"[PINN] '{composant_nom}': {len(V)} points simulés + {n_colloc} "
+          f"points de collocation, λ={lambda_phys}")
+
+    model, scaler_V, scaler_I, infos = _entrainer(V, I, params, lambda_phys,
+                                                  n_colloc, epochs)
+
+    model_path = os.path.join(MODELS_DIR, f"{composant_nom}_model.keras")
+    joblib.dump(scaler_V, os.path.join(MODELS_DIR, f"{composant_nom}_scaler_V.pkl"))
+    joblib.dump(scaler_I, os.path.join(MODELS_DIR, f"{composant_nom}_scaler_I.pkl"))
+    model.save(model_path)
+    with open(_chemin_meta(composant_nom), "w", encoding="utf-8") as f:
+        json.dump({"parametres": params, "init_from": None,
+                   "epochs": infos["epochs"], "physique": infos}, f, indent=2)
+
+    V_pred, I_pred = V_sim.copy(), _predire(model, scaler_V, scaler_I, V_sim)
+    m = toutes_metriques(I_sim, I_pred)
+    _enregistrer_modele_ia(comp_id, model_path, V_pred, I_pred, m)
+    print(f"[PINN] Terminé en {infos['epochs']} époques ({infos['duree_s']}s) | "
+          f"E_rel={m['E_rel_%']:.2f}% | R²={m['R2']:.6f}")
+    return V_pred, I_pred
+
+
+def comparer_entrainements(composant_nom: str,
+                           tailles: tuple[int, ...] = (30, 60, 120, 250),
+                           lambda_phys: float = LAMBDA_PHYSIQUE,
+                           n_colloc: int = 2000,
+                           epochs: int = 400,
+                           seed: int = 0) -> list[dict]:
+    """
+    Benchmark données seules vs perte physique, pour plusieurs nombres de
+    points simulés (même initialisation). Métriques mesurées sur la
+    simulation complète ; résidu RMS sur une grille dense. Aucun modèle
+    n'est enregistré en base.
+    """
+    _, params, V_sim, I_sim = _charger_composant_diode(composant_nom)
+    V_grille = np.linspace(V_sim.min(), V_sim.max(), 5000)
+    plancher = PLANCHER_REL * float(np.ptp(I_sim))
+
+    resultats = []
+    for n in tailles:
+        V, I = _sous_echantillonner(V_sim, I_sim, n)
+        for lam in (0.0, lambda_phys):
+            model, sV, sI, infos = _entrainer(V, I, params, lam, n_colloc, epochs, seed)
+            m = toutes_metriques(I_sim, _predire(model, sV, sI, V_sim))
+            r = residu_diode(V_grille, _predire(model, sV, sI, V_grille), params, plancher)
+            ligne = {**infos, "E_rel_%": m["E_rel_%"], "R2": m["R2"], "RMSE": m["RMSE"],
+                     "residu_rms": float(np.sqrt(np.mean(r ** 2)))}
+            resultats.append(ligne)
+            print(f"[PINN] {len(V):>5} pts | λ={lam:<5} | {infos['meilleure_epoch']:>4} époques "
+                  f"| {infos['duree_s']:>7.1f}s | RMSE={m['RMSE']:.3e} | R²={m['R2']:.6f} "
+                  f"| résidu={ligne['residu_rms']:.3e}")
+
+    chemin = os.path.join(MODELS_DIR, f"{composant_nom}_pinn_benchmark.json")
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump({"composant": composant_nom, "resultats": resultats}, f, indent=2)
+    print(f"[PINN] Benchmark sauvegardé: {chemin}")
+    return resultats
+
+
+if __name__ == "__main__":
+    import sys
+    nom = sys.argv[1] if len(sys.argv) > 1 else "1N4007"
+    if "--benchmark" in sys.argv:
+        comparer_entrainements(nom)
+    else:
+        V, I = entrainer_physique(nom)
+        print(f"\nPrédiction PINN pour {nom}: {len(V)} points")
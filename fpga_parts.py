@@ -0,0 +1,79 @@
+"""
+Capacités des FPGA courants pour l'estimation HLS (sans Vivado).
+Valeurs des fiches produit AMD/Xilinx (BRAM exprimées en blocs de 18 Kb).
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+# Au-delà : placement/routage difficile même si la ressource n'est pas saturée
+HIGH_UTILIZATION = 0.8
+
+PARTS: dict[str, dict[str, Any]] = {
+    "xc7a35t":  {"family": "Artix-7",      "lut": 20800,   "ff": 41600,   "dsp": 90,    "bram18": 100,  "dsp_type": "DSP48E1", "fmax_mhz": 450},
+    "xc7a100t": {"family": "Artix-7",      "lut": 63400,   "ff": 126800,  "dsp": 240,   "bram18": 270,  "dsp_type": "DSP48E1", "fmax_mhz": 450},
+    "xc7a200t": {"family": "Artix-7",      "lut": 133800,  "ff": 267600,  "dsp": 740,   "bram18": 730,  "dsp_type": "DSP48E1", "fmax_mhz": 450},
+    "xc7z010":  {"family": "Zynq-7000",    "lut": 17600,   "ff": 35200,   "dsp": 80,    "bram18": 120,  "dsp_type": "DSP48E1", "fmax_mhz": 450},
+    "xc7z020":  {"family": "Zynq-7000",    "lut": 53200,   "ff": 106400,  "dsp": 220,   "bram18": 280,  "dsp_type": "DSP48E1", "fmax_mhz": 450},
+    "xc7k325t": {"family": "Kintex-7",     "lut": 203800,  "ff": 407600,  "dsp": 840,   "bram18": 890,  "dsp_type": "DSP48E1", "fmax_mhz": 550},
+    "xczu3eg":  {"family": "Zynq US+",     "lut": 70560,   "ff": 141120,  "dsp": 360,   "bram18": 432,  "dsp_type": "DSP48E2", "fmax_mhz": 600},
+    "xczu9eg":  {"family": "Zynq US+",     "lut": 274080,  "ff": 548160,  "dsp": 2520,  "bram18": 1824, "dsp_type": "DSP48E2", "fmax_mhz": 600},
+    "xcku115":  {"family": "Kintex US",    "lut": 663360,  "ff": 1326720, "dsp": 5520,  "bram18": 4320, "dsp_type": "DSP48E2", "fmax_mhz": 600},
+    "xcvu9p":   {"family": "Virtex US+",   "lut": 1182240, "ff": 2364480, "dsp": 6840,  "bram18": 4320, "dsp_type": "DSP48E2", "fmax_mhz": 650},
+    "xcu250":   {"family": "Alveo U250",   "lut": 1728000, "ff": 3456000, "dsp": 12288, "bram18": 5376, "dsp_type": "DSP48E2", "fmax_mhz": 650},
+}
+
+_RESOURCES = ("dsp", "bram18", "lut", "ff")
+
+
+def resolve_part(part: str) -> dict[str, Any] | None:
+    """Capacités d'une référence complète (ex: 'xc7a35tcpg236-1' → xc7a35t), None si inconnue."""
+    part = (part or "").strip().lower()
+    matches = [name for name in PARTS if part.startswith(name)]
+    if not matches:
+        return None
+    name = max(matches, key=len)
+    return {"name": name, **PARTS[name]}
+
+
+def utilization(estimates: dict[str, int], part: str, clock_period: float | None = None) -> dict[str, Any] | None:
+    """
+    Taux d'utilisation des ressources estimées {dsp, bram18, lut, ff} sur la
+    cible. Signale les dépassements (> 100 %), les taux élevés
+    (> HIGH_UTILIZATION) et une horloge au-delà de la fmax de la famille.
+    None si la référence n'est pas dans la table.
+    """
+    capacities = resolve_part(part)
+    if capacities is None:
+        return None
+    rows = {}
+    warnings = []
+    for resource in _RESOURCES:
+        used = int(estimates.get(resource, 0))
+        available = int(capacities[resource])
+        ratio = used / available
+        rows[resource] = {
+            "used": used,
+            "available": available,
+            "utilization_pct": round(100.0 * ratio, 1),
+            "over": ratio > 1.0,
+        }
+        if ratio > 1.0:
+            warnings.append(f"{resource.upper()} : {used} / {available} ({100.0 * ratio:.0f} %) — dépasse la capacité")
+        elif ratio > HIGH_UTILIZATION:
+            warnings.append(f"{resource.upper()} : {100.0 * ratio:.0f} % — routage difficile au-delà de {HIGH_UTILIZATION:.0%}")
+    clock_ok = True
+    if clock_period:
+        clock_ok = 1000.0 / float(clock_period) <= capacities["fmax_mhz"]
+        if not clock_ok:
+            warnings.append(
+                f"Horloge {1000.0 / float(clock_period):.0f} MHz > fmax {capacities['fmax_mhz']} MHz ({capacities['family']})"
+            )
+    return {
+        "part": capacities["name"],
+        "family": capacities["family"],
+        "resources": rows,
+        "fits": clock_ok and not any(row["over"] for row in rows.values()),
+        "warnings": warnings,
+    }
@@ -6,7 +6,7 @@ Mode 1 (hls4ml installé) : génère un vrai projet HLS dans hls_projects/{compo
     hls_projects/{composant}/
     ├── firmware/
     │   ├── parameters.h        ← types ap_fixed<16,6>, tailles couches
-    │   ├── weights/            ← poids .dat au format HLS
+    │   ├── weights/            ← poids .dat au format HLS (ou .bin, cf. poids_hls)
     │   ├── myproject.cpp       ← implémentation accélérateur C++
     │   └── myproject.h
     ├── build_prj.tcl           ← script Vivado HLS
@@ -16,23 +16,28 @@ Mode 1 (hls4ml installé) : génère un vrai projet HLS dans hls_projects/{compo
     └── hls4ml_config.yml       ← configuration hls4ml
 
 Mode 2 (fallback, sans Vivado) : simule la quantification int8/float16
-  sur les poids Keras et mesure l'erreur de quantification.
+  sur les poids Keras et mesure l'erreur de quantification ; pour un type
+  ap_fixed<W,I,...>, la sortie du firmware est émulée bit à bit (virgule_fixe),
+  pour 'ptq<bits>' la quantification entière calibrée (quantification_ptq).
 """
 
 import json
 import os
 import sqlite3
 import numpy as np
-import joblib
+
+import registre_modeles
 
 DB_PATH      = os.path.join(os.path.dirname(__file__), "composants_db.sqlite")
 MODELS_DIR   = os.path.join(os.path.dirname(__file__), "models")
 HLS_PROJ_DIR = os.path.join(os.path.dirname(__file__), "hls_projects")
+
 os.makedirs(HLS_PROJ_DIR, exist_ok=True)
 
 
 def _generer_projet_hls4ml(composant_nom: str, model, scaler_V, scaler_I,
-                           V_sim: np.ndarray, I_sim: np.ndarray) -> str:
+                           V_sim: np.ndarray, I_sim: np.ndarray,
+                           reuse_factor: int = 1, strategy: str = "Latency") -> str:
     """
     Génère un vrai projet HLS via hls4ml.
     Retourne le chemin du dossier projet créé.
@@ -60,8 +65,8 @@ def _generer_projet_hls4ml(composant_nom: str, model, scaler_V, scaler_I,
     # Configuration hls4ml
     hls_config = hls4ml.utils.config_from_keras_model(model, granularity="name")
     hls_config["Model"]["Precision"]    = "ap_fixed<16,6>"
-    hls_config["Model"]["ReuseFactor"]  = 1
-    hls_config["Model"]["Strategy"]     = "Latency"
+    hls_config["Model"]["ReuseFactor"]  = reuse_factor
+    hls_config["Model"]["Strategy"]     = strategy
 
     # Sauvegarder la config YAML
     config_path = os.path.join(proj_dir, "hls4ml_config.yml")
@@ -103,10 +108,15 @@ def _generer_projet_hls4ml(composant_nom: str, model, scaler_V, scaler_I,
 
 
 def _generer_firmware_simule(composant_nom: str, model, scaler_V, scaler_I,
-                             V_sim: np.ndarray, quant_type: str = "int8") -> tuple:
+                             V_sim: np.ndarray, quant_type: str = "int8",
+                             reuse_factor: int = 1, strategy: str = "Latency",
+                             poids_binaires: bool = False, csim: bool = False) -> tuple:
     """
     Génère un projet HLS simulé (sans Vivado) avec les fichiers firmware
     C++ synthétisés manuellement depuis les poids quantifiés.
+    poids_binaires : poids en weights/*.bin chargés par le banc de test
+    (gros modèles ; la synthèse requiert le mode texte).
+    csim : compiler et exécuter le banc de test C++ (sinon seulement l'écrire).
     Retourne (proj_dir, I_hls).
     """
     proj_dir  = os.path.join(HLS_PROJ_DIR, composant_nom)
@@ -119,19 +129,78 @@ def _generer_firmware_simule(composant_nom: str, model, scaler_V, scaler_I,
     print(f"[HLS-SIM] Génération firmware simulé dans: {proj_dir}")
 
     # ── Quantifier les poids ──────────────────────────────────────────
-    model_q    = _quantifier_poids(model, quant_type)
-    V_scaled   = scaler_V.transform(V_sim.reshape(-1, 1))
-    I_q_scaled = model_q.predict(V_scaled, verbose=0)
-    I_hls      = scaler_I.inverse_transform(I_q_scaled).flatten()
+    from quantification_ptq import parse_quant_type
 
-    # ── Générer parameters.h ──────────────────────────────────────────
+    V_scaled = scaler_V.transform(V_sim.reshape(-1, 1))
+    ap_type  = quant_type.startswith("ap_")
+    ptq      = parse_quant_type(quant_type)
+    if ptq:
+        # Entiers par canal + activations calibrées sur le balayage
+        from quantification_ptq import coder_entree, construire, inferer, _niveaux
+        from virgule_fixe import couches_depuis_keras
+        bits, bits_act, methode = ptq
+        reseau_q   = construire(couches_depuis_keras(model), V_scaled, bits, methode, bits_act)
+        I_q_scaled = inferer(reseau_q, V_scaled)
+    elif ap_type:
+        # Sortie bit-exacte du firmware (data/weight/accum/result = quant_type)
+        from virgule_fixe import couches_depuis_keras, emuler_reseau, quantifier
+        couches    = couches_depuis_keras(model)
+        I_q_scaled = emuler_reseau(V_scaled, couches, {
+            "data": quant_type, "weight": quant_type,
+            "accum": quant_type, "result": quant_type,
+        })
+    else:
+        model_q    = _quantifier_poids(model, quant_type)
+        I_q_scaled = model_q.predict(V_scaled, verbose=0)
+    I_hls = scaler_I.inverse_transform(I_q_scaled).flatten()
+
+    # ── Poids du firmware (écrits dans weights.h) ─────────────────────
     layers      = [l for l in model.layers if l.get_weights()]
     layer_sizes = []
     for l in layers:
         w = l.get_weights()[0]
         layer_sizes.append(w.shape)
 
-    prec = "ap_int<8>" if quant_type == "int8" else "ap_fixed<16,6>"
+    # Les poids quantifiés nuls ne sont pas émis en MAC (couches creuses)
+    poids_quantifies = []
+    for i, l in enumerate(layers):
+        ws = l.get_weights()
+        W, b = ws[0], ws[1]
+
+        if ptq:
+            W_q, b_q = reseau_q[i]["W_int"], reseau_q[i]["b_int"]
+            fmt      = "%d"
+        elif quant_type == "int8":
+            # Échelles séparées poids / biais (comme _quantifier_poids)
+            W_q   = np.round(W * 127.0 / max(np.max(np.abs(W)), 1e-8)).astype(np.int8)
+            b_q   = np.round(b * 127.0 / max(np.max(np.abs(b)), 1e-8)).astype(np.int8)
+            fmt   = "%d"
+        elif ap_type:
+            # Valeurs exactement représentables : pas de double arrondi à la compilation
+            W_q = quantifier(W, quant_type)
+            b_q = quantifier(b, quant_type)
+            fmt = "%.17g"
+        else:
+            W_q = W.astype(np.float16)
+            b_q = b.astype(np.float16)
+            fmt = "%.4f"
+        poids_quantifies.append((W_q, b_q))
+
+    # ── Générer parameters.h ──────────────────────────────────────────
+    prec  = "ap_int<8>" if quant_type == "int8" else "ap_fixed<16,6>"
+    prec  = quant_type if ap_type else prec
+    accum = quant_type if ap_type else "ap_fixed<16,6>"
+    types_h = f"""typedef {prec} weight_t;
+typedef {accum} data_t;
+typedef {accum} accum_t;
+typedef {accum} result_t;"""
+    if ptq:
+        types_h = f"""typedef ap_int<{bits}> weight_t;       // poids, échelle par canal
+typedef ap_int<{bits_act + 1}> data_t;         // codes d'activation (non signés après ReLU)
+typedef ap_int<32> bias_t;         // biais à l'échelle de l'accumulateur
+typedef ap_int<32> accum_t;
+typedef float scale_t;
+typedef float result_t;            // sortie déquantifiée"""
     params_h = f"""// Auto-generated by hls_converter.py — Quantization: {quant_type}
 // Composant: {composant_nom}
 #ifndef PARAMETERS_H_
@@ -142,10 +211,7 @@ def _generer_firmware_simule(composant_nom: str, model, scaler_V, scaler_I,
 #include <complex>
 
 // Précision de quantification
-typedef {prec} weight_t;
-typedef ap_fixed<16,6> data_t;
-typedef ap_fixed<16,6> accum_t;
-typedef ap_fixed<16,6> result_t;
+{types_h}
 
 // Architecture réseau
 #define N_INPUTS    1
@@ -157,6 +223,10 @@ typedef ap_fixed<16,6> result_t;
 
     params_h += "\n// Paramètres SPICE encodés\n"
     params_h += f'#define COMPOSANT "{composant_nom}"\n'
+    if poids_binaires:
+        from poids_hls import DECLARATION_CHARGEMENT
+        params_h += "\n// Poids chargés depuis weights/*.bin (simulation C uniquement)\n"
+        params_h += "\n".join(DECLARATION_CHARGEMENT) + "\n"
     params_h += "#endif\n"
 
     with open(os.path.join(firm_dir, "parameters.h"), "w") as f:
@@ -184,26 +254,54 @@ void myproject(data_t input[N_INPUTS], result_t output[N_OUTPUTS]);
         '#include "weights/weights.h"',
         "",
         "void myproject(data_t input[N_INPUTS], result_t output[N_OUTPUTS]) {",
-        "#pragma HLS PIPELINE II=1",
+        f"#pragma HLS PIPELINE II={reuse_factor}",
         "#pragma HLS ARRAY_PARTITION variable=input complete",
         "",
     ]
+    if ptq:
+        cpp_lines.insert(2, "#include <cmath>")
+    from poids_hls import corps_dense, est_creuse
     for i, l in enumerate(layers):
         sz = l.get_weights()[0].shape
+        relu = i < len(layers) - 1
+        source = "input" if i == 0 else f"layer{i}_out"
+        W_nz = poids_quantifies[i][0] != 0
+        creuse = est_creuse(W_nz)
+
+        def sortie(j: str) -> list[str]:
+            if ptq and relu:
+                # Déquantification, ReLU, re-quantification vers les codes de la couche suivante
+                return [
+                    f"scale_t y = acc * scale{i+1}[{j}];",
+                    f"y = std::nearbyint((y > 0 ? y : (scale_t)0) * INV_S_IN{i+2});",
+                    f"layer{i+1}_out[{j}] = y > ACT_MAX{i+2} ? (data_t)ACT_MAX{i+2} : (data_t)y;",
+                ]
+            if ptq:
+                return [f"layer{i+1}_out[{j}] = acc * scale{i+1}[{j}];  // sortie linéaire"]
+            return [f"layer{i+1}_out[{j}] = acc > 0 ? acc : (accum_t)0;  // ReLU"
+                    if relu else f"layer{i+1}_out[{j}] = acc;  // sortie linéaire"]
+
         cpp_lines += [
-            f"    // Layer {i+1}: Dense({sz[1]})",
-            f"    static data_t layer{i+1}_out[{sz[1]}];",
+            f"    // Layer {i+1}: Dense({sz[1]})"
+            + (f" — creuse : {int(W_nz.sum())}/{W_nz.size} MAC" if creuse else ""),
+            f"    static {'data_t' if relu else 'result_t'} layer{i+1}_out[{sz[1]}];",
             f"    #pragma HLS ARRAY_PARTITION variable=layer{i+1}_out complete",
-            f"    for (int j = 0; j < {sz[1]}; j++) {{",
-            f"        accum_t acc = bias{i+1}[j];",
-            f"        for (int k = 0; k < {sz[0]}; k++)",
-            f"            acc += weight{i+1}[k][j] * "
-            f"({'input[k]' if i == 0 else f'layer{i}_out[k]'});",
-            f"        layer{i+1}_out[j] = (j < {sz[1]-0}) ? "
-            f"(acc > 0 ? acc : (accum_t)0) : acc;  // ReLU sauf dernier",
-            "    }",
-            "",
         ]
+        corps = []
+        if strategy == "Resource":
+            # Poids en BRAM, un mot lu par cycle (cf. digital_hls_service.explore_design_space)
+            corps.append(f"    #pragma HLS RESOURCE variable=weight{i+1} core=ROM_1P_BRAM")
+        if reuse_factor > 1:
+            n_mac = int(W_nz.sum()) if strategy == "Latency" else W_nz.size
+            corps.append(f"    #pragma HLS ALLOCATION operation instances=mul "
+                         f"limit={-(-n_mac // reuse_factor)}")
+        # Creuse : un MAC par poids non nul (plafonné), cf. poids_hls.corps_dense
+        corps += corps_dense(i + 1, W_nz, source, sortie, retrait="    ")
+        if reuse_factor > 1:
+            # Portée propre à la couche : la limite ALLOCATION ne vaut que pour elle
+            corps = ["    {"] + ["    " + ligne for ligne in corps] + ["    }"]
+        cpp_lines += corps
+        cpp_lines.append("")
     n_last = len(layers)
     cpp_lines += [
         f"    output[0] = layer{n_last}_out[0];",
@@ -212,42 +310,20 @@ void myproject(data_t input[N_INPUTS], result_t output[N_OUTPUTS]);
     with open(os.path.join(firm_dir, "myproject.cpp"), "w") as f:
         f.write("\n".join(cpp_lines))
 
-    # ── Sauvegarder les poids quantifiés en .dat ───────────────────────
-    weight_h_lines = [
-        f"// Weights — {composant_nom} — {quant_type}",
-        "#ifndef WEIGHTS_H_", "#define WEIGHTS_H_",
-        '#include "../parameters.h"', "",
-    ]
-    for i, l in enumerate(layers):
-        ws = l.get_weights()
-        W, b = ws[0], ws[1]
-
-        if quant_type == "int8":
-            w_max = max(np.max(np.abs(W)), 1e-8)
-            scale = 127.0 / w_max
-            W_q   = np.round(W * scale).astype(np.int8)
-            b_q   = np.round(b * scale).astype(np.int8)
-        else:
-            W_q = W.astype(np.float16)
-            b_q = b.astype(np.float16)
-
-        np.savetxt(os.path.join(w_dir, f"w{i+1}.dat"), W_q, fmt="%d" if quant_type == "int8" else "%.4f")
-        np.savetxt(os.path.join(w_dir, f"b{i+1}.dat"), b_q, fmt="%d" if quant_type == "int8" else "%.4f")
-
-        rows, cols = W_q.shape
-        dtype = "weight_t"
-        weight_h_lines.append(f"static {dtype} weight{i+1}[{rows}][{cols}] = {{")
-        for r in range(rows):
-            row_str = ", ".join(str(int(x)) if quant_type == "int8" else f"{x:.4f}" for x in W_q[r])
-            weight_h_lines.append(f"  {{{row_str}}},")
-        weight_h_lines.append("};")
-        bias_str = ", ".join(str(int(x)) if quant_type == "int8" else f"{x:.4f}" for x in b_q)
-        weight_h_lines.append(f"static {dtype} bias{i+1}[{len(b_q)}] = {{{bias_str}}};")
-        weight_h_lines.append("")
-
-    weight_h_lines.append("#endif")
-    with open(os.path.join(w_dir, "weights.h"), "w") as f:
-        f.write("\n".join(weight_h_lines))
+    # ── weights.h + .dat (ou .bin), écrits en flux (cf. poids_hls) ────
+    from poids_hls import EcrivainPoids
+    with EcrivainPoids(w_dir, [f"// Weights — {composant_nom} — {quant_type}"], poids_binaires) as ecrivain:
+        for i, (W_q, b_q) in enumerate(poids_quantifies):
+            ecrivain.tableau(f"weight{i+1}", "weight_t", W_q, fmt, dat=f"w{i+1}")
+            ecrivain.tableau(f"bias{i+1}", "bias_t" if ptq else "weight_t", b_q, fmt, dat=f"b{i+1}")
+            if ptq:
+                couche_q = reseau_q[i]
+                # float32 écrits en %.9g : relus à l'identique par le compilateur
+                ecrivain.tableau(f"scale{i+1}", "scale_t", couche_q["echelle"], "%.9gf", const=True)
+                ecrivain.ligne(f"#define INV_S_IN{i+1} {couche_q['inv_s_in']:.9g}f")
+                ecrivain.ligne(f"#define ACT_MAX{i+1} "
+                               f"{_niveaux(couche_q['bits_act'], couche_q['in_signe'])[1]}")
+            ecrivain.ligne()
 
     # ── Script TCL Vivado HLS ─────────────────────────────────────────
     tcl = f"""# Auto-generated Vivado HLS TCL script — {composant_nom}
@@ -256,6 +332,7 @@ set_top myproject
 add_files firmware/myproject.cpp
 add_files firmware/myproject.h
 add_files firmware/parameters.h
+add_files -tb myproject_test.cpp
 add_files -tb tb_data/tb_input_features.dat
 add_files -tb tb_data/tb_output_predictions.dat
 open_solution solution1
@@ -269,8 +346,12 @@ exit
         f.write(tcl)
 
     # ── Données de test tb_data/ ──────────────────────────────────────
-    np.savetxt(os.path.join(tb_dir, "tb_input_features.dat"),
-               V_scaled, fmt="%.6f", header="V_normalized")
+    if ptq:
+        np.savetxt(os.path.join(tb_dir, "tb_input_features.dat"),
+                   coder_entree(reseau_q, V_scaled), fmt="%d", header=f"V_normalized codes (s_in={reseau_q[0]['s_in']:.9g})")
+    else:
+        np.savetxt(os.path.join(tb_dir, "tb_input_features.dat"),
+                   V_scaled, fmt="%.17g", header="V_normalized")
     np.savetxt(os.path.join(tb_dir, "tb_output_predictions.dat"),
                I_hls, fmt="%.8e", header="I_hls (A)")
 
@@ -278,6 +359,20 @@ exit
     print(f"[HLS-SIM] Poids     : {w_dir}/ ({len(layers)} couches)")
     print(f"[HLS-SIM] Script TCL: {proj_dir}/build_prj.tcl")
     print(f"[HLS-SIM] tb_data   : {tb_dir}/")
+
+    # ── Banc de test C++ compilé hors Vivado (shim ap_fixed) ──────────
+    # Sorties comparées à l'émulation Python pour les types émulés bit à
+    # bit (ap_*, ptq) ; int8/float16 : débit natif seulement
+    from banc_de_test import ecrire_banc_de_test, executer_csim, resume
+    if csim:
+        csim = executer_csim(proj_dir, I_q_scaled if (ap_type or ptq) else None, composant_nom)
+        print(f"[HLS-SIM] {resume(csim)}")
+    else:
+        ecrire_banc_de_test(proj_dir, composant_nom)
+        csim = None
+    with open(os.path.join(proj_dir, "digital_report.json"), "w", encoding="utf-8") as f:
+        json.dump({"engine": "simulated", "quant_type": quant_type,
+                   "reuse_factor": reuse_factor, "strategy": strategy, "csim": csim}, f, indent=2)
     return proj_dir, I_hls
 
 
@@ -331,22 +426,89 @@ def _quantifier_poids(model, quant_type: str = "int8"):
     return new_model
 
 
+def chemin_modele_hls(composant_nom: str, modele: str = "auto",
+                      quant_type: str | None = None) -> str:
+    """
+    Chemin du modèle Keras à convertir.
+    modele: 'base' ({nom}_model.keras), 'compact' (sortie de distillation.py),
+            'elague' (sortie de elagage.py), 'qat' (sortie de
+            quantification_qat.py) ou 'auto' : le modèle QAT s'il a été
+            affiné pour quant_type, sinon le plus récent des modèles élagué
+            et compact, sinon base — un modèle dérivé plus ancien que le
+            modèle de base est ignoré.
+    """
+    base = os.path.join(MODELS_DIR, f"{composant_nom}_model.keras")
+    derives = {m: os.path.join(MODELS_DIR, f"{composant_nom}_model_{m}.keras")
+               for m in ("compact", "elague", "qat")}
+    if modele == "base":
+        return base
+    if modele in derives:
+        return derives[modele]
+
+    def a_jour(chemin: str) -> bool:
+        return os.path.exists(chemin) and (not os.path.exists(base)
+                                           or os.path.getmtime(chemin) >= os.path.getmtime(base))
+
+    qat = derives["qat"]
+    if quant_type and a_jour(qat):
+        meta_path = qat.replace(".keras", ".json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                if json.load(f).get("quant_type") == quant_type:
+                    return qat
+    candidats = [derives[m] for m in ("compact", "elague") if a_jour(derives[m])]
+    return max(candidats, key=os.path.getmtime) if candidats else base
+
+
+def _ensure_colonnes_hls(conn: sqlite3.Connection):
+    """Colonnes ajoutées à modeles_hls après sa création (cf. upload_spice.init_db)."""
+    colonnes = {row[1] for row in conn.execute("PRAGMA table_info(modeles_hls)")}
+    if colonnes and "config_json" not in colonnes:
+        conn.execute("ALTER TABLE modeles_hls ADD COLUMN config_json TEXT")
+        conn.commit()
+
+
+def _config_conversion(model_path: str, reuse_factor: int, strategy: str,
+                       poids_binaires: bool) -> dict:
+    """Ce dont dépend un résultat modeles_hls en plus de quant_type : modèle source et options firmware."""
+    return {"modele": os.path.basename(model_path),
+            "modele_mtime": os.path.getmtime(model_path) if os.path.exists(model_path) else None,
+            "reuse_factor": reuse_factor, "strategy": strategy,
+            "poids_binaires": bool(poids_binaires)}
+
+
 def convertir_hls(composant_nom: str,
                   quant_type: str = "int8",
-                  force: bool = False) -> tuple[np.ndarray, np.ndarray]:
+                  force: bool = False,
+                  modele: str = "auto",
+                  reuse_factor: int = 1,
+                  strategy: str = "Latency",
+                  poids_binaires: bool = False,
+                  csim: bool = False) -> tuple[np.ndarray, np.ndarray]:
     """
     Simule la conversion HLS par quantification des poids du modèle IA.
 
     Args:
         composant_nom: Nom du composant (ex: '1N4007')
-        quant_type:   Type de quantification ('int8' ou 'float16')
+        quant_type:   Type de quantification ('int8', 'float16', un type
+                      HLS 'ap_fixed<W,I[,Q,O]>' émulé bit à bit par
+                      virgule_fixe, ou 'ptq<bits>[a<bits_act>][-methode]'
+                      : entiers par canal et activations calibrées,
+                      cf. quantification_ptq)
         force:        Recalculer même si déjà fait
+        modele:       Modèle source ('auto', 'base', 'compact', 'elague' ou 'qat'),
+                      cf. chemin_modele_hls
+        reuse_factor: ReuseFactor hls4ml (II du pipeline firmware)
+        strategy:     'Latency' ou 'Resource' (poids en BRAM)
+        poids_binaires: Firmware simulé : poids en .bin chargés à l'exécution
+                      au lieu d'initialiseurs dans weights.h (cf. poids_hls)
+        csim:         Firmware simulé : compiler et exécuter le banc de test
+                      C++ (débit natif, écart bit à bit) ; plusieurs secondes
+                      de compilation, désactivé par défaut (interface)
 
     Returns:
         (V_hls, I_hls) arrays numpy
     """
-    import tensorflow as tf
-
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
@@ -357,16 +519,21 @@ def convertir_hls(composant_nom: str,
         raise ValueError(f"Composant '{composant_nom}' introuvable.")
     comp_id = row[0]
 
-    # Vérifier si déjà fait
+    # Modèle source (auto : QAT, élagué ou compact s'ils sont à jour)
+    model_path = chemin_modele_hls(composant_nom, modele, quant_type)
+    config = _config_conversion(model_path, reuse_factor, strategy, poids_binaires)
+
+    # Vérifier si déjà fait, pour ce modèle (même fichier, non modifié) et ces options
+    _ensure_colonnes_hls(conn)
     if not force:
         cursor.execute(
-            "SELECT V_hls_json, I_hls_json FROM modeles_hls "
+            "SELECT V_hls_json, I_hls_json, config_json FROM modeles_hls "
             "WHERE composant_id = ? AND quant_type = ? "
             "ORDER BY created_at DESC LIMIT 1",
             (comp_id, quant_type)
         )
         existing = cursor.fetchone()
-        if existing:
+        if existing and existing[2] and json.loads(existing[2]) == config:
             V_hls = np.array(json.loads(existing[0]))
             I_hls = np.array(json.loads(existing[1]))
             conn.close()
@@ -389,31 +556,31 @@ def convertir_hls(composant_nom: str,
     I_sim = np.array(json.loads(sim[1]))
 
     # Charger le modèle Keras
-    model_path = os.path.join(MODELS_DIR, f"{composant_nom}_model.keras")
     if not os.path.exists(model_path):
         raise FileNotFoundError(
             f"Modèle introuvable: {model_path}. Entraînez d'abord avec trainer.py."
         )
 
     print(f"[HLS] Chargement modèle: {model_path}")
-    model = tf.keras.models.load_model(model_path)
+    model = registre_modeles.charger_modele(model_path)
 
     # Charger les scalers
-    scaler_V = joblib.load(os.path.join(MODELS_DIR, f"{composant_nom}_scaler_V.pkl"))
-    scaler_I = joblib.load(os.path.join(MODELS_DIR, f"{composant_nom}_scaler_I.pkl"))
+    scaler_V, scaler_I = registre_modeles.charger_scalers(composant_nom)
 
     # ── Tentative avec hls4ml réel, sinon firmware simulé ────────────
     try:
         import hls4ml  # noqa: F401
         print(f"[HLS] hls4ml détecté — génération projet HLS réel...")
         proj_dir, I_hls = _generer_projet_hls4ml(
-            composant_nom, model, scaler_V, scaler_I, V_sim, I_sim
+            composant_nom, model, scaler_V, scaler_I, V_sim, I_sim,
+            reuse_factor, strategy
         )
         print(f"[HLS] Projet HLS réel: {proj_dir}")
     except ImportError:
         print(f"[HLS] hls4ml absent → génération firmware simulé ({quant_type})...")
         proj_dir, I_hls = _generer_firmware_simule(
-            composant_nom, model, scaler_V, scaler_I, V_sim, quant_type
+            composant_nom, model, scaler_V, scaler_I, V_sim, quant_type,
+            reuse_factor, strategy, poids_binaires, csim
         )
 
     V_hls = V_sim.copy()
@@ -434,12 +601,12 @@ def convertir_hls(composant_nom: str,
     cursor.execute("""
         INSERT INTO modeles_hls
             (composant_id, quant_type, V_hls_json, I_hls_json,
-             mae, rmse, erreur_max, erreur_rel)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+             mae, rmse, erreur_max, erreur_rel, config_json)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
     """, (
         comp_id, quant_type,
         json.dumps(V_hls.tolist()), json.dumps(I_hls.tolist()),
-        m["MAE"], m["RMSE"], m["E_max"], m["E_rel_%"]
+        m["MAE"], m["RMSE"], m["E_max"], m["E_rel_%"], json.dumps(config)
     ))
     conn.commit()
     conn.close()
@@ -473,5 +640,5 @@ if __name__ == "__main__":
     import sys
     nom   = sys.argv[1] if len(sys.argv) > 1 else "1N4007"
     quant = sys.argv[2] if len(sys.argv) > 2 else "int8"
-    V, I  = convertir_hls(nom, quant_type=quant, force=True)
+    V, I  = convertir_hls(nom, quant_type=quant, force=True, csim=True)
     print(f"\nRésultats HLS ({quant}) pour {nom}: {len(V)} points")
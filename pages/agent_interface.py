@@ -527,7 +527,12 @@ def _action_erreurs(nom: str):
     lignes = [f"## ◆ Métriques d'erreur — {nom}\n"]
 
     if ia:
-        I_pred = np.interp(V_sim, np.array(json.loads(ia[0])), np.array(json.loads(ia[1])))
+        # Évaluation directe du MLP aux tensions simulées (sinon interpolation)
+        try:
+            from prediction import predire
+            I_pred = predire(nom, V_sim)
+        except (FileNotFoundError, ValueError):
+            I_pred = np.interp(V_sim, np.array(json.loads(ia[0])), np.array(json.loads(ia[1])))
         m = toutes_metriques(I_sim, I_pred)
         v = verdict_pass_fail(m["E_rel_%"], "ia")
         lignes.append(f"### ◉ Modèle IA (MLP)")
@@ -590,6 +595,44 @@ def _aide_texte() -> str:
 # INTERFACE PRINCIPALE STREAMLIT — Horizontal Dashboard
 # ─────────────────────────────────────────────────────────────────────────────
 
+def _panneau_telemetrie(nom: str):
+    """Historique des entraînements du composant (table telemetrie_epochs)."""
+    from telemetrie import lister_entrainements, charger_epochs, detecter_regression
+
+    with st.expander("📈 Télémétrie d'entraînement", expanded=False):
+        runs = lister_entrainements(nom, limite=20)
+        if not runs:
+            st.caption(f"Aucun entraînement enregistré pour {nom}.")
+            return
+
+        regression = detecter_regression(nom)
+        if regression and regression["regression"]:
+            st.warning(f"⚠ Débit en baisse : {regression['echantillons_s']:,.0f} éch/s "
+                       f"({regression['ratio']:.0%} de la médiane précédente).")
+
+        st.dataframe([{
+            "id": r["id"], "date": r["created_at"], "statut": r["statut"],
+            "époques": r["epochs"],
+            "durée (s)": round(r["duree_s"] or 0.0, 1),
+            "éch/s": round(r["echantillons_s"] or 0.0),
+            "val_loss min": r["meilleure_val"],
+            "profil": r["config"].get("profil"),
+        } for r in runs], use_container_width=True, hide_index=True)
+
+        run_id = st.selectbox("Exécution", [r["id"] for r in runs],
+                              format_func=lambda i: f"#{i}")
+        courbes = charger_epochs(run_id)
+        if len(courbes["epoch"]):
+            st.caption("Pertes (log10)")
+            st.line_chart({
+                "loss":     np.log10(np.maximum(courbes["loss"], 1e-30)),
+                "val_loss": np.log10(np.maximum(np.nan_to_num(courbes["val_loss"], nan=1e-30), 1e-30)),
+            })
+            st.caption("Durée par époque (s) · learning rate")
+            st.bar_chart({"durée (s)": courbes["duree_s"]})
+            st.line_chart({"learning rate": courbes["learning_rate"]})
+
+
 def main():
     init_session()
 
@@ -847,6 +890,8 @@ def main():
         if st.button("🗑 Vider le chat", use_container_width=True):
             st.session_state.messages = []; st.rerun()
 
+        _panneau_telemetrie(composant_sel)
+
 
 if __name__ == "__main__":
     main()
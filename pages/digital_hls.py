@@ -7,7 +7,8 @@ import os
 
 import streamlit as st
 
-from digital_hls_service import generate_hls_project_from_model, save_uploaded_model
+from digital_hls_queue import ACTIVE_STATUSES, cancel_job, ensure_workers, get_job, job_result, list_jobs, submit_job
+from digital_hls_service import STRATEGIES, save_uploaded_model
 from utils.navbar import render_navbar
 
 st.set_page_config(
@@ -83,6 +84,8 @@ st.markdown(
 
 render_navbar(active_page="digital")
 
+JOB_POLL_INTERVAL_S = 2
+
 st.markdown(
     """
     <div class="page-hero">
@@ -118,9 +121,36 @@ with left:
             ["ap_fixed<16,6>", "ap_fixed<12,4>", "ap_int<8>"],
             index=0,
         )
+        balayage = st.checkbox(
+            "🔎 Balayage de précision",
+            value=False,
+            help="Émule ap_fixed<6..18,I> (uniformes et mixtes par couche) et retient "
+                 "la précision uniforme la moins coûteuse sous le seuil HLS.",
+        )
     with c2:
         clock_period = st.number_input("Clock period (ns)", min_value=1.0, max_value=50.0, value=10.0, step=0.5)
         io_type = st.selectbox("I/O Type", ["io_parallel", "io_stream"], index=0)
+        reuse_factor = st.number_input(
+            "Reuse factor",
+            min_value=1,
+            max_value=4096,
+            value=1,
+            step=1,
+            help="Multiplications par multiplieur (II). Ramené par couche au plus grand diviseur valide.",
+        )
+        strategy = st.selectbox("Stratégie", list(STRATEGIES), index=0)
+        exploration = st.checkbox(
+            "🧭 Exploration reuse / stratégie / horloge",
+            value=False,
+            help="Estime DSP / BRAM18 / latence / II pour chaque combinaison et affiche le front de Pareto.",
+        )
+        poids_binaires = st.checkbox(
+            "💾 Poids binaires (.bin)",
+            value=False,
+            help="Projet stub : poids chargés à l'exécution par le banc de test au lieu d'initialiseurs "
+                 "dans weights.h. Génération et compilation rapides pour les gros modèles, "
+                 "mais non synthétisable tel quel.",
+        )
 
     generate = st.button("🚀 Générer projet HLS", type="primary", use_container_width=True)
     st.markdown("</div>", unsafe_allow_html=True)
@@ -129,26 +159,82 @@ with left:
         if uploaded_model is None:
             st.warning("Veuillez charger un modèle .keras ou .h5.")
         else:
-            with st.spinner("Génération HLS en cours..."):
-                try:
-                    stored_model_path, safe_name = save_uploaded_model(uploaded_model, model_alias or None)
-                    result = generate_hls_project_from_model(
-                        model_path=stored_model_path,
-                        model_name=model_alias or safe_name,
-                        target_part=target_part,
-                        clock_period=float(clock_period),
-                        precision=precision,
-                        io_type=io_type,
-                    )
-                    st.session_state["digital_hls_result"] = result
-                    st.success("Projet HLS généré avec succès.")
-                except Exception as exc:
-                    st.error(f"Échec génération HLS: {exc}")
+            try:
+                stored_model_path, safe_name = save_uploaded_model(uploaded_model, model_alias or None)
+                job_id = submit_job(
+                    stored_model_path,
+                    model_alias or safe_name,
+                    target_part=target_part,
+                    clock_period=float(clock_period),
+                    precision=precision,
+                    io_type=io_type,
+                    reuse_factor=int(reuse_factor),
+                    strategy=strategy,
+                    explore=exploration,
+                    binary_weights=poids_binaires,
+                    precision_sweep=balayage,
+                )
+                st.session_state["digital_hls_job_id"] = job_id
+                st.success(f"Job #{job_id} ajouté à la file de génération.")
+            except Exception as exc:
+                st.error(f"Échec génération HLS: {exc}")
+
+    ensure_workers()
+
+
+def _suivi_jobs():
+    """État du job courant et des derniers jobs ; recharge la page quand le job courant se termine."""
+    job_id = st.session_state.get("digital_hls_job_id")
+    job = get_job(job_id) if job_id else None
+    if job and job["status"] in ACTIVE_STATUSES:
+        st.progress(
+            float(job["progress"] or 0.0),
+            text=f"Job #{job_id} — {job['progress_message'] or 'En attente'}",
+        )
+        if st.button("⛔ Annuler", key=f"cancel_{job_id}", disabled=bool(job["cancel_requested"])):
+            cancel_job(job_id)
+    elif job and st.session_state.get("digital_hls_result_job") != job_id:
+        st.session_state["digital_hls_result_job"] = job_id
+        if job["status"] == "done":
+            st.session_state["digital_hls_result"] = job_result(job_id)
+        elif job["status"] == "error":
+            st.session_state["digital_hls_error"] = f"Échec génération HLS (job #{job_id}): {job['error_message']}"
+        st.rerun()
+
+    jobs = list_jobs(limit=8)
+    if jobs:
+        with st.expander("🗂️ File de génération", expanded=any(j["status"] in ACTIVE_STATUSES for j in jobs)):
+            st.dataframe(
+                [
+                    {
+                        "Job": j["id"],
+                        "Modèle": j["model_name"],
+                        "Précision": j["precision"],
+                        "Statut": j["status"],
+                        "Progression (%)": round(100 * (j["progress"] or 0.0)),
+                        "Étape": j["progress_message"] or "",
+                        "Cache": "oui" if j["cache_hit"] else "",
+                    }
+                    for j in jobs
+                ],
+                use_container_width=True,
+                hide_index=True,
+            )
+
 
 with right:
     st.markdown("<div class='section-card'>", unsafe_allow_html=True)
     st.markdown("### 📊 Rapport Ressources / Latence")
 
+    # Polling de la file sans bloquer la session (rafraîchissement manuel si st.fragment est absent)
+    if hasattr(st, "fragment"):
+        st.fragment(run_every=JOB_POLL_INTERVAL_S)(_suivi_jobs)()
+    else:
+        _suivi_jobs()
+        st.button("🔄 Rafraîchir")
+    if st.session_state.get("digital_hls_error"):
+        st.error(st.session_state.pop("digital_hls_error"))
+
     result = st.session_state.get("digital_hls_result")
     if not result:
         st.info("Aucun résultat pour le moment. Lancez une génération.")
@@ -159,26 +245,111 @@ with right:
                 <span class="kpi-chip">Engine: {result['engine']}</span>
                 <span class="kpi-chip">Precision: {result['precision']}</span>
                 <span class="kpi-chip">Clock: {result['clock_period']} ns</span>
+                <span class="kpi-chip">Strategy: {result.get('strategy', 'Latency')}</span>
             </div>
             """,
             unsafe_allow_html=True,
         )
 
+        if result.get("cache_hit"):
+            st.caption(
+                f"♻️ Modèle et configuration identiques : projet existant réutilisé "
+                f"(clé {result['generation_key'][:12]})."
+            )
+
         resources = result.get("resources", {})
         latency = result.get("latency", {})
 
         m1, m2 = st.columns(2)
         with m1:
             st.metric("Paramètres", f"{resources.get('params_total', 0):,}")
-            st.metric("MAC ops", f"{resources.get('mac_operations', 0):,}")
+            st.metric(
+                "MAC ops",
+                f"{resources.get('mac_operations', 0):,}",
+                delta=f"-{resources['sparsity']:.0%} (poids nuls)" if resources.get("sparsity") else None,
+                delta_color="off",
+            )
             st.metric("DSP estimés", resources.get("estimated_dsp", 0))
         with m2:
             st.metric("BRAM18 estimées", resources.get("estimated_bram18", 0))
             st.metric("Latence (cycles)", f"{latency.get('estimated_cycles', 0):,}")
             st.metric("Latence (µs)", latency.get("estimated_latency_us", 0.0))
+            st.metric("II (cycles)", latency.get("estimated_ii_cycles", 1))
 
+        if latency.get("io_type") == "io_stream":
+            st.caption(
+                f"🔀 io_stream : une fonction par couche sous DATAFLOW, FIFOs inter-couches "
+                f"≈ {resources.get('estimated_fifo_lut', 0):,} LUT (SRL) inclus dans l'estimation."
+            )
         st.caption("Estimation analytique initiale; la synthèse finale dépendra de l’outil FPGA.")
 
+        usage = resources.get("utilization")
+        if usage:
+            st.markdown(f"**Utilisation {usage['part']}** ({usage['family']})")
+            st.dataframe(
+                [
+                    {
+                        "Ressource": name.upper(),
+                        "Estimé": row["used"],
+                        "Disponible": row["available"],
+                        "Utilisation (%)": row["utilization_pct"],
+                    }
+                    for name, row in usage["resources"].items()
+                ],
+                use_container_width=True,
+                hide_index=True,
+            )
+            for warning in usage["warnings"]:
+                (st.error if not usage["fits"] else st.warning)(warning)
+        elif resources:
+            st.caption(f"Part {result['target_part']} absente de la table fpga_parts : utilisation non vérifiée.")
+
+        csim = result.get("csim")
+        if csim:
+            if csim["statut"] != "ok":
+                st.warning(f"Banc de test C++ : {csim['statut']}. {csim.get('erreur', '')}")
+            else:
+                c1, c2, c3 = st.columns(3)
+                debit = csim.get("debit_inferences_s")
+                c1.metric("C-sim native (inférences/s)", f"{debit:,.0f}" if debit is not None else "—")
+                c2.metric("Compilation (s)", csim["compilation_s"])
+                if "bit_exact" in csim:
+                    c3.metric(
+                        "Écart C++ / Python",
+                        "bit-exact" if csim["bit_exact"] else f"{csim['ecart_max']:.3e}",
+                        delta=None if csim["bit_exact"] else f"{csim['n_differences']} écarts",
+                        delta_color="inverse",
+                    )
+
+        if result.get("balayage_precision"):
+            with st.expander("🔎 Front de Pareto E_rel / DSP (balayage de précision)"):
+                st.dataframe(result["balayage_precision"], use_container_width=True, hide_index=True)
+
+        if result.get("design_space"):
+            with st.expander(f"🧭 Front de Pareto latence / ressources ({result['target_part']})", expanded=True):
+                pareto = [
+                    {
+                        "Stratégie": p["strategy"],
+                        "Horloge (ns)": p["clock_period_ns"],
+                        "II cible": p["target_ii"],
+                        "Latence (ns)": p["latency_ns"],
+                        "II (ns)": p["ii_ns"],
+                        "DSP": p["dsp"],
+                        "BRAM18": p["bram18"],
+                        "LUT": p["lut"],
+                        "FF": p["ff"],
+                        "Tient": p.get("fits"),
+                        "Reuse par couche": ", ".join(str(r) for r in p["reuse_factors"].values()),
+                    }
+                    for p in result["design_space"]["pareto"]
+                ]
+                st.caption(
+                    f"{len(pareto)} points non dominés sur {result['design_space']['points_evaluated']} évalués "
+                    f"({result['design_space'].get('points_fitting', 0)} tiennent sur la cible)."
+                )
+                st.scatter_chart(pareto, x="DSP", y="Latence (ns)", color="Stratégie")
+                st.dataframe(pareto, use_container_width=True, hide_index=True)
+
         if os.path.exists(result["zip_path"]):
             with open(result["zip_path"], "rb") as f:
                 st.download_button(
@@ -0,0 +1,239 @@
+"""
+ÉMISSION DES POIDS HLS — poids_hls.py
+Écriture rapide de firmware/weights/ pour les générateurs simulés
+(hls_converter._generer_firmware_simule, digital_hls_service) :
+  - formatage par blocs : un seul `%` Python par bloc de VALEURS_BLOC
+    valeurs (gabarit de ligne répété) au lieu d'une f-string par élément
+  - écriture en flux : weights.h et les .dat sont écrits bloc par bloc
+    dans une seule passe, sans liste de lignes en mémoire
+  - mode binaire optionnel : tableaux déclarés sans initialiseur dans
+    weights.h, valeurs dans {nom}.bin (float64 little-endian, exact pour
+    les types ≤ 53 bits et les codes entiers) et load_weights(dossier)
+    appelée par le banc de test. Pour la synthèse Vivado, le mode texte
+    reste requis (poids en ROM initialisée).
+  - corps_dense : boucles MAC d'une couche Dense ; une couche creuse
+    (poids quantifiés nuls ≥ SPARSITE_CREUSE) est déroulée, un MAC par
+    poids non nul, jusqu'à MAC_DEROULES_MAX MAC, au-delà la boucle est
+    gardée et saute les poids nuls
+Benchmark : python poids_hls.py --benchmark (modèle de ~1M paramètres).
+"""
+
+import os
+import time
+
+import numpy as np
+
+VALEURS_BLOC = 1 << 16
+
+# À ajouter à parameters.h en mode binaire (appel depuis le banc de test)
+DECLARATION_CHARGEMENT = ["#define WEIGHTS_BIN", "bool load_weights(const char* dossier);"]
+
+# Couches creuses (cf. elagage.py) : fraction de poids quantifiés nuls à
+# partir de laquelle les MAC sont déroulés, et plafond du déroulage (taille
+# du source et temps de synthèse)
+SPARSITE_CREUSE  = 0.25
+MAC_DEROULES_MAX = 4096
+
+
+class EcrivainPoids:
+    """
+    weights.h (+ .dat ou .bin) écrit en flux.
+
+        with EcrivainPoids(w_dir, entete, binaire) as ecrivain:
+            ecrivain.tableau("weight1", "weight_t", W_q, "%.17g", dat="w1")
+            ecrivain.ligne("#define ACT_MAX2 63")
+    """
+
+    def __init__(self, dossier: str, entete: list[str], binaire: bool = False):
+        self.dossier = dossier
+        self.binaire = binaire
+        self._charges = []   # (nom C, fichier .bin, nombre de valeurs, rang)
+        os.makedirs(dossier, exist_ok=True)
+        self._f = open(os.path.join(dossier, "weights.h"), "w", encoding="utf-8")
+        self._f.write("\n".join(entete + ["#ifndef WEIGHTS_H_", "#define WEIGHTS_H_",
+                                          '#include "../parameters.h"'] + [""]) + "\n")
+        if binaire:
+            self._f.write("#include <cstdio>\n\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def ligne(self, texte: str = "") -> None:
+        self._f.write(texte + "\n")
+
+    def tableau(self, nom: str, type_c: str, valeurs: np.ndarray, fmt: str,
+                dat: str | None = None, const: bool = False) -> None:
+        """
+        Déclare `static [const] type_c nom[...]` (1D ou 2D).
+
+        Args:
+            valeurs: Valeurs déjà quantifiées (celles que le firmware doit voir)
+            fmt:     Format printf d'une valeur, sans espace (ex: '%d', '%.17g', '%.9gf')
+            dat:     Nom de base du fichier texte weights/{dat}.dat (mode texte,
+                     fmt sans suffixe de littéral C)
+            const:   Qualificatif const (ignoré en mode binaire : tableau chargé)
+        """
+        valeurs = np.asarray(valeurs)
+        dims = "".join(f"[{n}]" for n in valeurs.shape)
+        prefixe = "static const" if const and not self.binaire else "static"
+        if self.binaire:
+            fichier = f"{nom}.bin"
+            valeurs.astype("<f8").tofile(os.path.join(self.dossier, fichier))
+            self._charges.append((nom, fichier, int(valeurs.size), valeurs.ndim))
+            self._f.write(f"{prefixe} {type_c} {nom}{dims};\n")
+            return
+
+        # Chaque valeur n'est formatée qu'une fois : le bloc au format .dat
+        # (espaces / retours ligne) donne l'initialiseur C par remplacements
+        f_dat = open(os.path.join(self.dossier, f"{dat}.dat"), "w", encoding="utf-8") if dat else None
+        self._f.write(f"{prefixe} {type_c} {nom}{dims} = {{" + ("\n" if valeurs.ndim == 2 else ""))
+        for texte in _blocs(valeurs.reshape(len(valeurs), -1), fmt):
+            if f_dat:
+                f_dat.write(texte)
+            if valeurs.ndim == 2:
+                self._f.write("  {" + texte[:-1].replace(" ", ", ").replace("\n", "},\n  {") + "},\n")
+            else:
+                self._f.write(texte.replace("\n", ", "))
+        self._f.write("};\n")
+        if f_dat:
+            f_dat.close()
+
+    def fermer(self) -> None:
+        if self._f.closed:
+            return
+        if self.binaire:
+            self._f.write("\n" + _CHARGEUR_BIN + "\n")
+            self._f.write("bool load_weights(const char* dossier) {\n    return true")
+            for nom, fichier, n, rang in self._charges:
+                self._f.write(f'\n        && lire_bin(dossier, "{fichier}", &{nom}{"[0]" * rang}, {n})')
+            self._f.write(";\n}\n")
+        self._f.write("\n#endif\n")
+        self._f.close()
+
+
+_CHARGEUR_BIN = """// Valeurs float64 little-endian converties vers le type du tableau
+template <typename T>
+static bool lire_bin(const char* dossier, const char* fichier, T* dst, long n) {
+    char chemin[1024];
+    std::snprintf(chemin, sizeof chemin, "%s/%s", dossier, fichier);
+    FILE* f = std::fopen(chemin, "rb");
+    if (!f) return false;
+    double tampon[4096];
+    long k = 0;
+    size_t lus;
+    while (k < n && (lus = std::fread(tampon, sizeof(double), 4096, f)) > 0)
+        for (size_t i = 0; i < lus && k < n; i++) dst[k++] = tampon[i];
+    std::fclose(f);
+    return k == n;
+}"""
+
+
+def est_creuse(non_nuls: np.ndarray) -> bool:
+    """Couche à dérouler ou dont la boucle saute les poids nuls."""
+    return 1.0 - non_nuls.mean() >= SPARSITE_CREUSE
+
+
+def corps_dense(idx: int, non_nuls: np.ndarray, source: str, sortie,
+                retrait: str = "  ") -> list[str]:
+    """
+    MAC de la couche Dense idx (weight{idx}, bias{idx}) vers accum_t acc.
+    non_nuls : masque (n_in, n_out) des poids quantifiés non nuls ;
+    sortie(j) : instructions écrivant la sortie j depuis acc.
+    """
+    n_in, n_out = non_nuls.shape
+    r1, r2 = retrait, retrait * 2
+    creuse = est_creuse(non_nuls)
+    lignes = []
+    if creuse and non_nuls.sum() <= MAC_DEROULES_MAX:
+        for j in range(n_out):
+            lignes += [f"{r1}{{", f"{r2}accum_t acc = bias{idx}[{j}];"]
+            lignes += [f"{r2}acc += weight{idx}[{i}][{j}] * {source}[{i}];"
+                       for i in np.flatnonzero(non_nuls[:, j])]
+            lignes += [r2 + ligne for ligne in sortie(str(j))] + [f"{r1}}}"]
+        return lignes
+    mac = f"acc += weight{idx}[i][j] * {source}[i];"
+    if creuse:
+        # Poids constants nuls : aucun multiplieur une fois la boucle déroulée
+        mac = f"if (weight{idx}[i][j] != 0) {mac}"
+    lignes += [f"{r1}for (int j = 0; j < {n_out}; j++) {{",
+               f"{r2}accum_t acc = bias{idx}[j];",
+               f"{r2}for (int i = 0; i < {n_in}; i++) {mac}"]
+    return lignes + [r2 + ligne for ligne in sortie("j")] + [f"{r1}}}"]
+
+
+def _blocs(lignes: np.ndarray, fmt: str):
+    """Texte 'v v v\\n' par bloc de lignes, un seul formatage `%` par bloc."""
+    gabarit = " ".join([fmt] * lignes.shape[1]) + "\n"
+    par_bloc = max(1, VALEURS_BLOC // max(1, lignes.shape[1]))
+    for d in range(0, len(lignes), par_bloc):
+        bloc = lignes[d:d + par_bloc]
+        yield (gabarit * len(bloc)) % tuple(bloc.ravel().tolist())
+
+
+def _emission_elementaire(dossier: str, couches: list[tuple]) -> None:
+    """Ancienne émission (une f-string par élément + np.savetxt), référence du benchmark."""
+    lignes = ["#ifndef WEIGHTS_H_", "#define WEIGHTS_H_", '#include "../parameters.h"', ""]
+    for i, (W, b) in enumerate(couches, start=1):
+        np.savetxt(os.path.join(dossier, f"w{i}.dat"), W, fmt="%.17g")
+        np.savetxt(os.path.join(dossier, f"b{i}.dat"), b, fmt="%.17g")
+        lignes.append(f"static weight_t weight{i}[{W.shape[0]}][{W.shape[1]}] = {{")
+        for r in range(W.shape[0]):
+            lignes.append("  {" + ", ".join(f"{float(x):.17g}" for x in W[r]) + "},")
+        lignes.append("};")
+        lignes.append(f"static weight_t bias{i}[{len(b)}] = {{{', '.join(f'{float(x):.17g}' for x in b)}}};")
+    lignes.append("#endif")
+    with open(os.path.join(dossier, "weights.h"), "w", encoding="utf-8") as f:
+        f.write("\n".join(lignes))
+
+
+def benchmark(tailles: tuple = (128, 1024, 768, 128, 1), repetitions: int = 3) -> dict:
+    """
+    Temps d'émission de weights.h pour un MLP aléatoire (défaut : ~1,02M
+    paramètres) : ancienne méthode, mode texte, mode binaire.
+    """
+    import shutil
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    couches = [(rng.standard_normal((n_in, n_out)).astype(np.float32).astype(np.float64),
+                rng.standard_normal(n_out).astype(np.float32).astype(np.float64))
+               for n_in, n_out in zip(tailles[:-1], tailles[1:])]
+    n_parametres = sum(W.size + b.size for W, b in couches)
+
+    def emettre(dossier: str, binaire: bool) -> None:
+        with EcrivainPoids(dossier, [], binaire) as ecrivain:
+            for i, (W, b) in enumerate(couches, start=1):
+                ecrivain.tableau(f"weight{i}", "weight_t", W, "%.17g", dat=f"w{i}")
+                ecrivain.tableau(f"bias{i}", "weight_t", b, "%.17g", dat=f"b{i}")
+
+    methodes = {
+        "elementaire": lambda d: _emission_elementaire(d, couches),
+        "texte":       lambda d: emettre(d, False),
+        "binaire":     lambda d: emettre(d, True),
+    }
+    resultats = {"parametres": n_parametres}
+    for nom, methode in methodes.items():
+        durees = []
+        for _ in range(repetitions):
+            dossier = tempfile.mkdtemp()
+            try:
+                t0 = time.perf_counter()
+                methode(dossier)
+                durees.append(time.perf_counter() - t0)
+                taille = sum(os.path.getsize(os.path.join(dossier, f)) for f in os.listdir(dossier))
+            finally:
+                shutil.rmtree(dossier)
+        resultats[nom] = {"secondes": round(min(durees), 3), "octets": taille,
+                          "parametres_s": round(n_parametres / min(durees))}
+        print(f"[POIDS] {nom:<11} : {min(durees):7.3f} s | {taille / 1e6:6.1f} Mo "
+              f"| {n_parametres / min(durees) / 1e6:.2f} M paramètres/s")
+    return resultats
+
+
+if __name__ == "__main__":
+    import sys
+    if "--benchmark" in sys.argv:
+        benchmark()
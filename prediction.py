@@ -0,0 +1,141 @@
+"""
+PRÉDICTION PAR LOTS — prediction.py
+Évaluation du MLP entraîné d'un composant sur n'importe quel tableau de
+tensions (au lieu d'interpoler V_pred_json / I_pred_json de la base) :
+  - réseau extrait une fois en NumPy (float32) et mis en cache via
+    registre_modeles, normalisations MinMax repliées dans la première et
+    la dernière couche Dense
+  - évaluation par blocs de taille fixe → mémoire bornée
+  - repli sur model.predict si une activation n'est pas gérée en NumPy
+"""
+
+import os
+import numpy as np
+
+import registre_modeles
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
+
+TAILLE_BLOC = 4096    # points par bloc : activations (4096 × 128 × 4 o) tenant en cache
+
+_ACTIVATIONS = {
+    "linear":  lambda x: x,
+    "relu":    lambda x: np.maximum(x, 0.0, out=x),
+    "tanh":    lambda x: np.tanh(x, out=x),
+    "sigmoid": lambda x: 1.0 / (1.0 + np.exp(-x)),
+    "elu":     lambda x: np.where(x > 0, x, np.expm1(np.minimum(x, 0.0))),
+}
+
+
+def _affine(transform) -> tuple[float, float]:
+    """(a, b) tels que transform(x) = a·x + b (scaler 1-D affine, ex: MinMaxScaler)."""
+    y = transform(np.array([[0.0], [1.0], [2.0]])).ravel()
+    a, b = y[1] - y[0], y[0]
+    if not np.isclose(y[2], 2 * a + b, rtol=1e-9, atol=1e-12):
+        raise ValueError("Normalisation non affine : repli impossible.")
+    return float(a), float(b)
+
+
+def _extraire_reseau(model, scaler_V, scaler_I) -> list[tuple] | None:
+    """
+    Couches (W, b, activation) en float32, scalers repliés :
+      V_s = aV·V + bV           → W0' = aV·W0,  b0' = bV·W0 + b0
+      I   = (I_s - bI) / aI     → Wn' = Wn/aI,  bn' = (bn - bI)/aI
+    None si une couche ou activation n'est pas gérée.
+    """
+    from tensorflow import keras
+
+    couches = []
+    for layer in model.layers:
+        if not isinstance(layer, keras.layers.Dense):
+            return None
+        activation = keras.activations.serialize(layer.activation)
+        if isinstance(activation, dict):
+            activation = activation.get("config", {}).get("name", activation.get("class_name"))
+        if activation not in _ACTIVATIONS:
+            return None
+        W, b = (np.asarray(w, dtype=np.float64) for w in layer.get_weights())
+        couches.append([W, b, activation])
+
+    aV, bV = _affine(scaler_V.transform)
+    aI, bI = _affine(scaler_I.transform)
+    W0, b0 = couches[0][:2]
+    couches[0][:2] = aV * W0, bV * W0.sum(axis=0) + b0
+    Wn, bn = couches[-1][:2]
+    couches[-1][:2] = Wn / aI, (bn - bI) / aI
+
+    return [(W.astype(np.float32), b.astype(np.float32), act) for W, b, act in couches]
+
+
+def _charger(composant_nom: str, model_path: str):
+    """(réseau NumPy ou None, scaler_V, scaler_I) depuis le registre."""
+    scaler_V, scaler_I = registre_modeles.charger_scalers(composant_nom)
+    empreinte = "|".join(
+        str(os.stat(os.path.join(MODELS_DIR, f"{composant_nom}_scaler_{x}.pkl")).st_mtime_ns)
+        for x in ("V", "I")
+    )
+    reseau = registre_modeles.obtenir(
+        model_path,
+        lambda p: _extraire_reseau(registre_modeles.charger_modele(p), scaler_V, scaler_I),
+        espace=f"numpy:{empreinte}",
+    )
+    return reseau, scaler_V, scaler_I
+
+
+def _propager(reseau: list[tuple], V: np.ndarray) -> np.ndarray:
+    x = V.reshape(-1, 1).astype(np.float32)
+    for W, b, activation in reseau:
+        x = _ACTIVATIONS[activation](x @ W + b)
+    return x[:, 0]
+
+
+def predire(composant_nom: str, V, taille_bloc: int = TAILLE_BLOC,
+            modele: str = "base") -> np.ndarray:
+    """
+    Courant prédit par le MLP du composant aux tensions V.
+
+    Args:
+        composant_nom: Nom du composant (modèle + scalers entraînés requis)
+        V:             Tensions (scalaire ou tableau de forme quelconque)
+        taille_bloc:   Points évalués par bloc (borne la mémoire)
+        modele:        'base', 'compact' ou 'auto' (cf. hls_converter.chemin_modele_hls)
+
+    Returns:
+        I (float64) de même forme que V
+    """
+    from hls_converter import chemin_modele_hls
+
+    model_path = chemin_modele_hls(composant_nom, modele)
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(
+            f"Modèle introuvable: {model_path}. Entraînez d'abord avec trainer.py."
+        )
+    reseau, scaler_V, scaler_I = _charger(composant_nom, model_path)
+
+    V = np.asarray(V, dtype=np.float64)
+    V_plat = V.ravel()
+    I = np.empty(V_plat.shape, dtype=np.float64)
+    for debut in range(0, len(V_plat), taille_bloc):
+        bloc = V_plat[debut:debut + taille_bloc]
+        if reseau is not None:
+            I[debut:debut + len(bloc)] = _propager(reseau, bloc)
+        else:
+            model = registre_modeles.charger_modele(model_path)
+            I_s = model.predict(scaler_V.transform(bloc.reshape(-1, 1)),
+                                batch_size=8192, verbose=0)
+            I[debut:debut + len(bloc)] = scaler_I.inverse_transform(I_s).ravel()
+    return I.reshape(V.shape)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    nom = sys.argv[1] if len(sys.argv) > 1 else "1N4007"
+    n   = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000_000
+    V = np.linspace(-5.0, 1.2, n)
+    predire(nom, V[:10])   # chargement + extraction
+    t0 = time.perf_counter()
+    I = predire(nom, V)
+    dt = time.perf_counter() - t0
+    print(f"[IA] {n:,} points en {dt:.3f}s ({n / dt:,.0f} points/s) "
+          f"| I(0.7V)={predire(nom, 0.7) * 1000:.4f} mA")
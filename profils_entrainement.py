@@ -0,0 +1,231 @@
+"""
+PROFILS D'ENTRAÎNEMENT — profils_entrainement.py
+Réglages d'exécution TensorFlow pour trainer.entrainer :
+  - threads intra-op / inter-op (0 = défaut TensorFlow)
+  - précision : float32 ou mixed_bfloat16 (CPU avec AVX512_BF16 / AMX)
+  - compilation XLA (jit_compile)
+Le débit (échantillons/s) mesuré à chaque entraînement est enregistré par
+machine et par profil, afin de choisir puis reproduire le profil le plus
+rapide (profil='auto').
+Sortie : models/profils_debit.json
+"""
+
+import json
+import os
+import platform
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+MODELS_DIR  = os.path.join(os.path.dirname(__file__), "models")
+DEBITS_PATH = os.path.join(MODELS_DIR, "profils_debit.json")
+
+PROFIL_DEFAUT = {
+    "intra_op":    0,
+    "inter_op":    0,
+    "precision":   "float32",
+    "jit_compile": "auto",
+}
+
+PROFILS = {
+    "defaut":      {},
+    "xla":         {"jit_compile": True},
+    "sans_xla":    {"jit_compile": False},
+    "bf16":        {"precision": "mixed_bfloat16"},
+    "bf16_xla":    {"precision": "mixed_bfloat16", "jit_compile": True},
+    "mono_thread": {"intra_op": 1, "inter_op": 1, "jit_compile": False},
+    "demi_coeurs": {"intra_op": max(1, (os.cpu_count() or 2) // 2), "inter_op": 1},
+}
+
+
+def cle_machine() -> str:
+    """Identifiant de la machine (hôte, CPU, nombre de coeurs, version TF)."""
+    try:
+        from importlib.metadata import version
+        tf_version = version("tensorflow")
+    except Exception:
+        tf_version = "?"
+    cpu = platform.processor() or platform.machine()
+    return f"{platform.node()}|{cpu}|{os.cpu_count()}cpu|tf{tf_version}"
+
+
+def _charger_debits() -> dict:
+    if not os.path.exists(DEBITS_PATH):
+        return {}
+    with open(DEBITS_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def meilleur_profil(machine: str | None = None) -> str | None:
+    """Nom du profil de PROFILS au meilleur débit mesuré sur cette machine, ou None."""
+    mesures = {nom: m for nom, m in _charger_debits().get(machine or cle_machine(), {}).items()
+               if nom in PROFILS}
+    if not mesures:
+        return None
+    return max(mesures, key=lambda nom: mesures[nom]["debit_echantillons_s"])
+
+
+def resoudre_profil(profil: str | dict | None) -> dict | None:
+    """
+    Profil complet (PROFIL_DEFAUT surchargé) à partir d'un nom de PROFILS,
+    d'un dict de réglages ou de 'auto' (meilleur profil mesuré sur la machine).
+    None → aucun réglage (comportement historique).
+    """
+    if profil is None:
+        return None
+    if profil == "auto":
+        profil = meilleur_profil()
+        if profil is None:
+            print("[IA] Aucun débit mesuré sur cette machine — profil 'defaut'.")
+            profil = "defaut"
+    if isinstance(profil, str):
+        if profil not in PROFILS:
+            raise ValueError(f"Profil inconnu '{profil}' (disponibles: {sorted(PROFILS)}).")
+        return dict(PROFIL_DEFAUT, **PROFILS[profil], nom=profil)
+    inconnus = set(profil) - set(PROFIL_DEFAUT)
+    if inconnus:
+        raise ValueError(f"Réglages inconnus {sorted(inconnus)} (disponibles: {sorted(PROFIL_DEFAUT)}).")
+    return dict(PROFIL_DEFAUT, **profil, nom="personnalise")
+
+
+def appliquer_profil(profil: dict) -> str:
+    """
+    Applique threads et précision du profil. Retourne la politique de
+    précision précédente (à restaurer via keras.mixed_precision).
+    Les threads ne sont modifiables qu'avant l'initialisation du runtime
+    TensorFlow : sinon, avertissement et threads inchangés.
+    """
+    import tensorflow as tf
+    from tensorflow import keras
+
+    try:
+        if profil["intra_op"]:
+            tf.config.threading.set_intra_op_parallelism_threads(profil["intra_op"])
+        if profil["inter_op"]:
+            tf.config.threading.set_inter_op_parallelism_threads(profil["inter_op"])
+    except RuntimeError:
+        print("[IA] Runtime TensorFlow déjà initialisé — threads inchangés "
+              "(lancer le profil dans un nouveau processus).")
+
+    precedente = keras.mixed_precision.global_policy().name
+    keras.mixed_precision.set_global_policy(profil["precision"])
+    return precedente
+
+
+def creer_callback_debit(n_echantillons: int):
+    """
+    Callback Keras mesurant le débit d'entraînement (échantillons/s) par
+    époque. La première époque (traçage / compilation XLA) est exclue de
+    la moyenne `debit` sauf si c'est la seule.
+    """
+    from tensorflow import keras
+
+    class _MesureDebit(keras.callbacks.Callback):
+        def __init__(self):
+            super().__init__()
+            self.durees: list[float] = []
+
+        def on_epoch_begin(self, epoch, logs=None):
+            self._t0 = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            self.durees.append(time.perf_counter() - self._t0)
+
+        @property
+        def debit(self) -> float:
+            durees = self.durees[1:] or self.durees
+            if not durees:
+                return 0.0
+            return n_echantillons / float(np.median(durees))
+
+    return _MesureDebit()
+
+
+def enregistrer_debit(profil: dict, debit: float, composant_nom: str | None = None):
+    """
+    Ajoute la mesure de débit du profil pour la machine courante. Seuls les
+    profils de PROFILS sont enregistrés : un dict de réglages ('personnalise')
+    ne peut pas être reproduit par profil='auto'.
+    """
+    if profil["nom"] not in PROFILS:
+        return
+    debits = _charger_debits()
+    mesures = debits.setdefault(cle_machine(), {})
+    precedent = mesures.get(profil["nom"], {})
+    n = precedent.get("n_mesures", 0)
+    # Moyenne glissante sur les mesures successives du même profil
+    moyenne = (precedent.get("debit_echantillons_s", 0.0) * n + debit) / (n + 1)
+    mesures[profil["nom"]] = {
+        "reglages":             {k: profil[k] for k in PROFIL_DEFAUT},
+        "debit_echantillons_s": round(moyenne, 1),
+        "n_mesures":            n + 1,
+        "derniere_mesure":      datetime.now().isoformat(timespec="seconds"),
+        "composant":            composant_nom,
+    }
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    with open(DEBITS_PATH, "w", encoding="utf-8") as f:
+        json.dump(debits, f, indent=2)
+
+
+def _mesurer_dans_processus(args: tuple) -> float:
+    """Exécuté dans un processus neuf : les threads TF y sont encore réglables."""
+    nom_profil, V, I, epochs = args
+    import tensorflow as tf
+    from trainer import _build_model
+
+    tf.keras.utils.set_random_seed(0)
+    profil = resoudre_profil(nom_profil)
+    appliquer_profil(profil)
+    model = _build_model(jit_compile=profil["jit_compile"])
+    mesure = creer_callback_debit(len(V))
+    model.fit(V, I, epochs=epochs, batch_size=64, callbacks=[mesure], verbose=0)
+    return mesure.debit
+
+
+def mesurer_profils(composant_nom: str,
+                    profils: list[str] | None = None,
+                    epochs: int = 6) -> list[dict]:
+    """
+    Benchmark des profils sur la simulation du composant, chacun dans un
+    processus séparé (réglage des threads possible). Les débits sont
+    enregistrés dans DEBITS_PATH.
+
+    Returns:
+        Liste {profil, debit_echantillons_s} triée du plus rapide au plus lent
+    """
+    from sklearn.preprocessing import MinMaxScaler
+    from simulateur import charger_simulation
+
+    sim = charger_simulation(composant_nom)
+    if sim is None:
+        raise ValueError(f"Aucune simulation pour '{composant_nom}'. "
+                         f"Lancez simulateur.py d'abord.")
+    V = MinMaxScaler().fit_transform(sim[0].reshape(-1, 1)).astype(np.float32)
+    I = MinMaxScaler().fit_transform(sim[1].reshape(-1, 1)).astype(np.float32)
+
+    ctx = multiprocessing.get_context("spawn")
+    resultats = []
+    for nom in profils or list(PROFILS):
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                debit = pool.submit(_mesurer_dans_processus, (nom, V, I, epochs)).result()
+        except Exception as e:
+            print(f"[IA] Profil '{nom}' non supporté: {e}")
+            continue
+        enregistrer_debit(resoudre_profil(nom), debit, composant_nom)
+        resultats.append({"profil": nom, "debit_echantillons_s": debit})
+        print(f"[IA] Profil {nom:<12} {debit:>12,.0f} échantillons/s")
+
+    resultats.sort(key=lambda r: -r["debit_echantillons_s"])
+    if resultats:
+        print(f"[IA] Profil le plus rapide sur {cle_machine()}: {resultats[0]['profil']}")
+    return resultats
+
+
+if __name__ == "__main__":
+    import sys
+    nom = sys.argv[1] if len(sys.argv) > 1 else "1N4007"
+    mesurer_profils(nom)
@@ -0,0 +1,202 @@
+"""
+QUANTIFICATION POST-ENTRAÎNEMENT — quantification_ptq.py
+Quantification entière calibrée du MLP pour la conversion HLS (NumPy,
+sans TensorFlow), en remplacement de l'échelle unique 127/max|w| :
+  - poids      : échelle symétrique par canal de sortie (colonne de W)
+  - biais      : entiers 32 bits à l'échelle de l'accumulateur
+                 (s_entrée × s_poids[j]), indépendants de l'échelle des poids
+  - activations: plages calibrées sur le balayage de simulation
+                 ('max', 'percentile' ou 'mse'), non signées après ReLU
+  - sortie     : accumulateur déquantifié (pas de re-quantification)
+Types HLS correspondants : quant_type 'ptq<bits>[a<bits_act>][-methode]',
+ex: 'ptq6', 'ptq6a8', 'ptq8-percentile' (cf. hls_converter.convertir_hls).
+"""
+
+import re
+
+import numpy as np
+
+METHODES         = ("max", "percentile", "mse")
+METHODE_DEFAUT   = "mse"
+PERCENTILE       = 99.99
+BITS_BIAIS       = 32
+N_SEUILS_MSE     = 64      # seuils de coupure essayés (fraction du max) en calibration MSE
+
+_RE_PTQ = re.compile(r"^ptq(\d+)(?:a(\d+))?(?:-(\w+))?$")
+
+
+def parse_quant_type(quant_type: str) -> tuple[int, int, str] | None:
+    """'ptq6a8-mse' → (6, 8, 'mse') ; 'ptq6' → (6, 6, 'mse') ; None si ce n'est pas un type PTQ."""
+    m = _RE_PTQ.match(quant_type)
+    if not m:
+        return None
+    bits = int(m.group(1))
+    bits_act = int(m.group(2)) if m.group(2) else bits
+    methode = m.group(3) or METHODE_DEFAUT
+    if not (2 <= bits <= 16 and 2 <= bits_act <= 16):
+        raise ValueError(f"Largeur PTQ hors plage (2..16): '{quant_type}'")
+    if methode not in METHODES:
+        raise ValueError(f"Méthode de calibration inconnue '{methode}' (choix: {METHODES})")
+    return bits, bits_act, methode
+
+
+def _niveaux(bits: int, signe: bool) -> tuple[int, int]:
+    """Codes entiers extrêmes (symétrique si signé)."""
+    if signe:
+        q = 2 ** (bits - 1) - 1
+        return -q, q
+    return 0, 2 ** bits - 1
+
+
+def quantifier_poids_canal(W: np.ndarray, bits: int) -> tuple[np.ndarray, np.ndarray]:
+    """Codes entiers et échelle par colonne : W ≈ W_int × echelles[None, :]."""
+    q = 2 ** (bits - 1) - 1
+    w_max = np.abs(W).max(axis=0)
+    echelles = np.where(w_max > 0, w_max / q, 1.0)
+    return np.clip(np.rint(W / echelles), -q, q), echelles
+
+
+def _quantifier(v: np.ndarray, seuil: float, bits: int, signe: bool) -> np.ndarray:
+    lo, hi = _niveaux(bits, signe)
+    echelle = seuil / hi
+    return np.clip(np.rint(v / echelle), lo, hi) * echelle
+
+
+def calibrer_plage(valeurs: np.ndarray, bits: int, methode: str = METHODE_DEFAUT,
+                   signe: bool = True) -> float:
+    """
+    Seuil de coupure d'une activation :
+      'max'        : max |v|
+      'percentile' : PERCENTILE-ième centile de |v|
+      'mse'        : seuil minimisant l'erreur quadratique de quantification
+    """
+    a = np.abs(np.asarray(valeurs, dtype=np.float64).ravel())
+    v_max = float(a.max()) if a.size else 0.0
+    if v_max == 0.0:
+        return 1.0
+    if methode == "max":
+        return v_max
+    if methode == "percentile":
+        return max(float(np.percentile(a, PERCENTILE)), v_max * 1e-6)
+    v = np.asarray(valeurs, dtype=np.float64).ravel()
+    seuils = v_max * np.linspace(1.0 / N_SEUILS_MSE, 1.0, N_SEUILS_MSE)
+    erreurs = [np.mean((_quantifier(v, s, bits, signe) - v) ** 2) for s in seuils]
+    return float(seuils[int(np.argmin(erreurs))])
+
+
+def construire(couches: list[dict], x_calib: np.ndarray, bits: int,
+               methode: str = METHODE_DEFAUT, bits_act: int | None = None) -> list[dict]:
+    """
+    Réseau quantifié par couche :
+      {W_int, s_w (par canal), b_int, s_in, in_signe, bits, bits_act, activation,
+       echelle = s_in·s_w et inv_s_in en float32, tels qu'écrits dans le firmware}
+    Plages d'entrée de chaque couche calibrées en flottant sur x_calib ;
+    bits_act (défaut: bits) fixe la largeur des activations.
+    """
+    bits_act = bits_act or bits
+    h = np.asarray(x_calib, dtype=np.float64).reshape(len(x_calib), -1)
+    reseau = []
+    for couche in couches:
+        signe = bool(h.min() < 0)
+        seuil = calibrer_plage(h, bits_act, methode, signe)
+        s_in = seuil / _niveaux(bits_act, signe)[1]
+        W_int, s_w = quantifier_poids_canal(couche["W"], bits)
+        q_b = 2 ** (BITS_BIAIS - 1) - 1
+        b_int = np.clip(np.rint(couche["b"] / (s_in * s_w)), -q_b, q_b)
+        reseau.append({"W_int": W_int, "s_w": s_w, "b_int": b_int, "s_in": s_in,
+                       "in_signe": signe, "bits": bits, "bits_act": bits_act,
+                       "activation": couche["activation"],
+                       "echelle": (s_in * s_w).astype(np.float32),
+                       "inv_s_in": np.float32(1.0 / s_in)})
+        acc = h @ couche["W"] + couche["b"]
+        h = np.maximum(acc, 0.0) if couche["activation"] == "relu" else acc
+    return reseau
+
+
+def coder_entree(reseau: list[dict], x: np.ndarray) -> np.ndarray:
+    """Codes entiers de l'entrée du réseau (données du banc de test firmware)."""
+    lo, hi = _niveaux(reseau[0]["bits_act"], reseau[0]["in_signe"])
+    x = np.asarray(x, dtype=np.float64).reshape(len(x), -1)
+    return np.clip(np.rint(x / reseau[0]["s_in"]), lo, hi)
+
+
+def inferer(reseau: list[dict], x: np.ndarray) -> np.ndarray:
+    """
+    Inférence entière identique au firmware : accumulation exacte (int32),
+    mise à l'échelle float32, ReLU, re-quantification (arrondi au pair)
+    vers les codes de la couche suivante.
+    """
+    codes = coder_entree(reseau, x)
+    for k, couche in enumerate(reseau):
+        acc = codes @ couche["W_int"] + couche["b_int"]
+        y = acc.astype(np.float32) * couche["echelle"]
+        if couche["activation"] == "relu":
+            y = np.maximum(y, np.float32(0.0))
+        if k + 1 < len(reseau):
+            suivante = reseau[k + 1]
+            lo, hi = _niveaux(suivante["bits_act"], suivante["in_signe"])
+            codes = np.clip(np.rint(y * suivante["inv_s_in"]), lo, hi).astype(np.float64)
+    return y.astype(np.float64)
+
+
+def quantifier_par_tenseur(couches: list[dict], bits: int) -> list[dict]:
+    """Référence : une échelle symétrique par tenseur (poids et biais), activations flottantes."""
+    q = 2 ** (bits - 1) - 1
+    resultat = []
+    for couche in couches:
+        nouvelle = dict(couche)
+        for cle in ("W", "b"):
+            v_max = np.abs(couche[cle]).max()
+            echelle = v_max / q if v_max > 0 else 1.0
+            nouvelle[cle] = np.rint(couche[cle] / echelle) * echelle
+        resultat.append(nouvelle)
+    return resultat
+
+
+def comparer(composant_nom: str, bits=(8, 7, 6, 5, 4), methodes=METHODES,
+             bits_act: int | None = None, modele: str = "auto") -> list[dict]:
+    """
+    E_rel (vs MLP flottant, simulation du composant) par largeur :
+      par_tenseur : schéma historique (échelle par tenseur, activations flottantes)
+      par_canal   : échelles par canal, activations flottantes
+      <methode>   : par canal + activations entières calibrées (bits_act)
+    """
+    import registre_modeles
+    from hls_converter import chemin_modele_hls
+    from metriques import SEUIL_HLS_PASS, calcul_erreur_rel
+    from simulateur import charger_simulation
+    from virgule_fixe import charger_couches, emuler_reseau
+
+    V_sim, _ = charger_simulation(composant_nom)
+    couches = charger_couches(chemin_modele_hls(composant_nom, modele))
+    scaler_V, scaler_I = registre_modeles.charger_scalers(composant_nom)
+    x = scaler_V.transform(V_sim.reshape(-1, 1))
+    flottant = {t: "float" for t in ("data", "weight", "accum", "result")}
+
+    def courant(y):
+        return scaler_I.inverse_transform(np.asarray(y).reshape(-1, 1)).ravel()
+
+    I_ref = courant(emuler_reseau(x, couches, flottant))
+    lignes = []
+    for b in bits:
+        par_canal = [dict(c, W=np.multiply(*quantifier_poids_canal(c["W"], b))) for c in couches]
+        ligne = {
+            "bits":        b,
+            "par_tenseur": calcul_erreur_rel(
+                I_ref, courant(emuler_reseau(x, quantifier_par_tenseur(couches, b), flottant))),
+            "par_canal":   calcul_erreur_rel(I_ref, courant(emuler_reseau(x, par_canal, flottant))),
+        }
+        for methode in methodes:
+            reseau = construire(couches, x, b, methode, bits_act)
+            ligne[methode] = calcul_erreur_rel(I_ref, courant(inferer(reseau, x)))
+        lignes.append(ligne)
+        print(f"[HLS] {b} bits : par tenseur {ligne['par_tenseur']:>9.2f}% | "
+              f"par canal {ligne['par_canal']:>8.2f}% | " +
+              " | ".join(f"{m} {ligne[m]:>8.2f}%" for m in methodes) +
+              f"  (seuil {SEUIL_HLS_PASS}%)")
+    return lignes
+
+
+if __name__ == "__main__":
+    import sys
+    comparer(sys.argv[1] if len(sys.argv) > 1 else "1N4007")
@@ -0,0 +1,325 @@
+"""
+ENTRAÎNEMENT SENSIBLE À LA QUANTIFICATION — quantification_qat.py
+Étape optionnelle entre trainer.py et hls_converter.convertir_hls : le MLP
+entraîné ({nom}_model.keras) est affiné avec une fausse quantification
+(straight-through estimator) reproduisant le type HLS visé :
+  - 'ap_fixed<W,I[,Q,O]>' : entrée, poids, biais et sorties quantifiés,
+    chaque produit arrondi dans l'accumulateur comme le firmware généré
+    (virgule_fixe) — le biais systématique de troncature est donc appris
+  - 'ptq<bits>[a<bits_act>][-methode]' : poids par canal, activations
+    calibrées à chaque époque (quantification_ptq)
+Les variables restent flottantes ; le modèle enregistré
+({nom}_model_qat.keras) est un MLP Dense ordinaire que convertir_hls
+quantifie à l'identique. Les métadonnées ({nom}_model_qat.json) gardent
+le type visé : chemin_modele_hls('auto') n'utilise le modèle QAT que pour
+ce type.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from metriques import toutes_metriques
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
+
+PATIENCE_QAT = 10
+BATCH_QAT    = 64
+
+
+def chemin_modele_qat(composant_nom: str) -> str:
+    return os.path.join(MODELS_DIR, f"{composant_nom}_model_qat.keras")
+
+
+def charger_meta_qat(composant_nom: str) -> dict | None:
+    chemin = chemin_modele_qat(composant_nom).replace(".keras", ".json")
+    if not os.path.exists(chemin):
+        return None
+    with open(chemin, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _verifier_type(quant_type: str):
+    """(parse ap_fixed, parse ptq) ; ValueError si le type n'est pas émulable."""
+    from quantification_ptq import parse_quant_type
+    from virgule_fixe import parse_type
+
+    ptq = parse_quant_type(quant_type)
+    if ptq:
+        return None, ptq
+    if quant_type.startswith("ap_"):
+        return parse_type(quant_type), None
+    raise ValueError(
+        f"QAT: type '{quant_type}' non supporté (ap_fixed<W,I,...> ou ptq<bits> requis)."
+    )
+
+
+def sortie_hls(couches: list[dict], quant_type: str, x: np.ndarray) -> np.ndarray:
+    """Sortie normalisée du firmware pour quant_type (même chemin que convertir_hls)."""
+    from quantification_ptq import construire, inferer
+    from virgule_fixe import emuler_reseau
+
+    t_fixe, ptq = _verifier_type(quant_type)
+    if ptq:
+        bits, bits_act, methode = ptq
+        return inferer(construire(couches, x, bits, methode, bits_act), x)
+    return emuler_reseau(x, couches, {"data": quant_type, "weight": quant_type,
+                                      "accum": quant_type, "result": quant_type})
+
+
+# ── Fausse quantification TensorFlow ──────────────────────────────────────────
+
+def _ste(tf, x, x_q):
+    """Valeur quantifiée en avant (exacte : x - x = 0), gradient identité en arrière."""
+    return tf.stop_gradient(x_q) + (x - tf.stop_gradient(x))
+
+
+def _arrondis_tf(tf) -> dict:
+    return {
+        "AP_TRN":         tf.floor,
+        "AP_TRN_ZERO":    lambda x: tf.sign(x) * tf.floor(tf.abs(x)),
+        "AP_RND":         lambda x: tf.floor(x + 0.5),
+        "AP_RND_ZERO":    lambda x: tf.sign(x) * tf.math.ceil(tf.abs(x) - 0.5),
+        "AP_RND_INF":     lambda x: tf.sign(x) * tf.floor(tf.abs(x) + 0.5),
+        "AP_RND_MIN_INF": lambda x: tf.math.ceil(x - 0.5),
+        "AP_RND_CONV":    tf.round,     # arrondi au pair
+    }
+
+
+def _fq_fixe(tf, t: dict):
+    """(cast complet, arrondi seul) vers le type ap_fixed décodé t."""
+    from virgule_fixe import bornes
+
+    echelle = 2.0 ** t["F"]
+    arrondi = _arrondis_tf(tf)[t["quant"]]
+    lo, hi = (b * echelle for b in bornes(t))
+    n = 2.0 ** t["W"]
+
+    def debordement(m):
+        if t["debordement"] == "AP_WRAP":
+            return tf.math.floormod(m - lo, n) + lo
+        if t["debordement"] == "AP_SAT":
+            return tf.clip_by_value(m, lo, hi)
+        if t["debordement"] == "AP_SAT_ZERO":
+            return tf.where((m < lo) | (m > hi), tf.zeros_like(m), m)
+        return tf.clip_by_value(m, -hi if t["signe"] else 0.0, hi)
+
+    def cast(x):
+        return _ste(tf, x, debordement(arrondi(x * echelle)) / echelle)
+
+    def arrondir(x):
+        return _ste(tf, x, arrondi(x * echelle) / echelle)
+
+    return cast, arrondir
+
+
+def _propagation_fixe(tf, t: dict):
+    """
+    Propagation avant du firmware ap_fixed (data = weight = accum = result = t).
+    Produits arrondis individuellement puis sommés : exact pour AP_TRN,
+    AP_RND, AP_RND_MIN_INF en AP_WRAP (cf. virgule_fixe.emuler_dense),
+    approché (débordement en fin d'accumulation) sinon.
+    """
+    cast, arrondir = _fq_fixe(tf, t)
+
+    def propager(x, variables, activations):
+        h = cast(x)
+        for (W, b), activation in zip(variables, activations):
+            W_q = cast(tf.cast(W, tf.float64))
+            b_q = cast(tf.cast(b, tf.float64))
+            produits = arrondir(h[:, :, None] * W_q[None, :, :])
+            acc = cast(b_q + tf.reduce_sum(produits, axis=1))
+            if activation == "relu":
+                acc = tf.nn.relu(acc)
+            h = cast(acc)
+        return h
+
+    return propager
+
+
+def _propagation_ptq(tf, bits: int):
+    """Propagation avant PTQ : seuils d'activation fournis (calibrés à chaque époque)."""
+    from quantification_ptq import _niveaux
+
+    q_w = 2 ** (bits - 1) - 1
+
+    def propager(x, variables, activations, seuils, signes, bits_act):
+        h = x
+        for k, ((W, b), activation) in enumerate(zip(variables, activations)):
+            lo, hi = _niveaux(bits_act, signes[k])
+            s_in = seuils[k] / hi
+            h = _ste(tf, h, tf.clip_by_value(tf.round(h / s_in), lo, hi) * s_in)
+            W = tf.cast(W, tf.float64)
+            s_w = tf.stop_gradient(tf.maximum(tf.reduce_max(tf.abs(W), axis=0), 1e-12) / q_w)
+            W_q = _ste(tf, W, tf.clip_by_value(tf.round(W / s_w), -q_w, q_w) * s_w)
+            h = tf.matmul(h, W_q) + tf.cast(b, tf.float64)
+            if activation == "relu":
+                h = tf.nn.relu(h)
+        return h
+
+    return propager
+
+
+def _calibrer(couches: list[dict], x: np.ndarray, bits_act: int, methode: str):
+    """Seuils et signes d'entrée de chaque couche sur le réseau flottant courant."""
+    from quantification_ptq import calibrer_plage
+
+    h, seuils, signes = x, [], []
+    for c in couches:
+        signe = bool(h.min() < 0)
+        seuils.append(calibrer_plage(h, bits_act, methode, signe))
+        signes.append(signe)
+        acc = h @ c["W"] + c["b"]
+        h = np.maximum(acc, 0.0) if c["activation"] == "relu" else acc
+    return seuils, signes
+
+
+def entrainer_qat(composant_nom: str,
+                  quant_type: str = "ap_fixed<16,6>",
+                  epochs: int | None = None,
+                  learning_rate: float | None = None,
+                  modele: str = "base",
+                  patience: int = PATIENCE_QAT) -> dict:
+    """
+    Affine le MLP du composant avec fausse quantification pour quant_type.
+
+    Args:
+        composant_nom: Nom du composant (modèle + simulation requis)
+        quant_type:    Type HLS visé (ap_fixed<...> ou ptq<bits>...)
+        epochs:        Époques max (défaut: trainer.EPOCHS_FINETUNE)
+        learning_rate: Taux d'apprentissage (défaut: trainer.LR_FINETUNE)
+        modele:        Modèle de départ ('base', 'compact' ou 'elague' :
+                       les poids nuls d'un modèle élagué le restent)
+        patience:      Époques sans amélioration de la validation quantifiée
+
+    Returns:
+        Métadonnées : E_rel/R² de la sortie HLS avant et après QAT
+    """
+    import tensorflow as tf
+    from tensorflow import keras
+    import registre_modeles
+    from hls_converter import chemin_modele_hls
+    from simulateur import charger_simulation
+    from trainer import (EPOCHS_FINETUNE, LR_FINETUNE, poids_regions,
+                         regions_iv, split_stratifie)
+    from virgule_fixe import couches_depuis_keras
+
+    t_fixe, ptq = _verifier_type(quant_type)
+    epochs = epochs or EPOCHS_FINETUNE
+    learning_rate = learning_rate or LR_FINETUNE
+
+    source_path = chemin_modele_hls(composant_nom, modele)
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(
+            f"Modèle introuvable: {source_path}. Entraînez d'abord avec trainer.py."
+        )
+    sim = charger_simulation(composant_nom)
+    if sim is None:
+        raise ValueError(f"Aucune simulation pour '{composant_nom}'.")
+    V_sim, I_sim = sim
+
+    source = registre_modeles.charger_modele(source_path)
+    scaler_V, scaler_I = registre_modeles.charger_scalers(composant_nom)
+    x = scaler_V.transform(V_sim.reshape(-1, 1))
+    y = scaler_I.transform(I_sim.reshape(-1, 1))
+
+    regions = regions_iv(V_sim, I_sim)
+    idx_train, idx_val = split_stratifie(regions)
+    poids = poids_regions(regions)
+
+    def evaluer(model) -> dict:
+        I_hls = scaler_I.inverse_transform(
+            sortie_hls(couches_depuis_keras(model), quant_type, x)).ravel()
+        return toutes_metriques(I_sim, I_hls)
+
+    # Copie entraînable (Dense ordinaires, float32) du modèle source
+    model = keras.models.clone_model(source)
+    model.set_weights(source.get_weights())
+    denses = [l for l in model.layers if l.get_weights()]
+    variables = [(l.kernel, l.bias) for l in denses]
+    activations = [couches_depuis_keras(model)[k]["activation"] for k in range(len(denses))]
+    entrainables = [v for paire in variables for v in paire]
+    masques = [tf.constant(W.numpy() != 0, W.dtype) for W, _ in variables]
+
+    avant = evaluer(model)
+    print(f"[QAT] '{composant_nom}' ({quant_type}) avant: "
+          f"E_rel={avant['E_rel_%']:.2f}% | R²={avant['R2']:.6f}")
+
+    if ptq:
+        bits, bits_act, methode = ptq
+        propager_ptq = _propagation_ptq(tf, bits)
+    else:
+        propager_fixe = _propagation_fixe(tf, t_fixe)
+
+    optimiseur = keras.optimizers.Adam(learning_rate=learning_rate)
+    x_tf, y_tf = tf.constant(x, tf.float64), tf.constant(y, tf.float64)
+    w_tf = tf.constant(poids, tf.float64)
+
+    def perte(idx, reglages):
+        xb, yb, wb = (tf.gather(t, idx) for t in (x_tf, y_tf, w_tf))
+        if ptq:
+            pred = propager_ptq(xb, variables, activations, *reglages, bits_act)
+        else:
+            pred = propager_fixe(xb, variables, activations)
+        return tf.reduce_sum(wb * tf.reduce_sum((pred - yb) ** 2, axis=1)) / tf.reduce_sum(wb)
+
+    def pas(idx, reglages):
+        with tf.GradientTape() as tape:
+            valeur = perte(idx, reglages)
+        gradients = tape.gradient(valeur, entrainables)
+        optimiseur.apply_gradients(zip(gradients, entrainables))
+        for (W, _), masque in zip(variables, masques):
+            W.assign(W * masque)
+        return valeur
+
+    rng = np.random.default_rng(0)
+    meilleure, meilleurs_poids, meilleure_epoch, attente = np.inf, model.get_weights(), 0, 0
+    for epoch in range(epochs):
+        reglages = ()
+        if ptq:
+            seuils, signes = _calibrer(couches_depuis_keras(model), x, bits_act, methode)
+            reglages = (seuils, signes)
+        ordre = rng.permutation(idx_train)
+        pertes = [float(pas(tf.constant(ordre[d:d + BATCH_QAT]), reglages))
+                  for d in range(0, len(ordre), BATCH_QAT)]
+        val = float(perte(tf.constant(idx_val), reglages))
+        if val < meilleure:
+            meilleure, meilleurs_poids, meilleure_epoch, attente = val, model.get_weights(), epoch, 0
+        else:
+            attente += 1
+        if epoch % 10 == 0 or attente == 0:
+            print(f"[QAT] Époque {epoch + 1}/{epochs} loss={np.mean(pertes):.3e} val={val:.3e}")
+        if attente >= patience:
+            break
+    model.set_weights(meilleurs_poids)
+
+    apres = evaluer(model)
+    print(f"[QAT] '{composant_nom}' ({quant_type}) après : "
+          f"E_rel={apres['E_rel_%']:.2f}% | R²={apres['R2']:.6f} "
+          f"(meilleure époque {meilleure_epoch + 1})")
+
+    model.compile(optimizer=keras.optimizers.Adam(learning_rate), loss="mse")
+    chemin = chemin_modele_qat(composant_nom)
+    model.save(chemin)
+    registre_modeles.invalider(chemin)
+    meta = {
+        "quant_type":      quant_type,
+        "source":          os.path.basename(source_path),
+        "epochs":          epoch + 1,
+        "meilleure_epoch": meilleure_epoch + 1,
+        "val_loss":        meilleure,
+        "avant":           {"E_rel_%": avant["E_rel_%"], "R2": avant["R2"], "MAE": avant["MAE"]},
+        "apres":           {"E_rel_%": apres["E_rel_%"], "R2": apres["R2"], "MAE": apres["MAE"]},
+    }
+    with open(chemin.replace(".keras", ".json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    print(f"[QAT] Modèle sauvegardé: {chemin}")
+    return meta
+
+
+if __name__ == "__main__":
+    import sys
+    nom   = sys.argv[1] if len(sys.argv) > 1 else "1N4007"
+    quant = sys.argv[2] if len(sys.argv) > 2 else "ap_fixed<16,6>"
+    print(entrainer_qat(nom, quant_type=quant))
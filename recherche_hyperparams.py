@@ -0,0 +1,224 @@
+"""
+RECHERCHE D'HYPERPARAMÈTRES — recherche_hyperparams.py
+Exploration de l'architecture IV_approximator (largeur, profondeur,
+activation, learning rate) par successive halving :
+  - n configurations tirées au hasard, entraînées `budget_min` époques
+  - à chaque palier, seul le meilleur 1/eta (val_loss) continue, avec un
+    budget multiplié par eta (reprise des poids du palier précédent)
+Les essais tournent en parallèle dans des processus séparés.
+Sortie : models/{composant}_hp_search.json avec tous les essais et le front
+de Pareto val_loss / nombre de paramètres (≈ DSP sur FPGA).
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
+
+ESPACE_RECHERCHE = {
+    "largeurs":       [8, 16, 32, 64, 128],
+    "profondeurs":    [1, 2, 3, 4, 5],
+    "activations":    ["relu", "tanh", "elu"],
+    "learning_rates": [3e-4, 1e-3, 3e-3],
+}
+
+
+def _echantillonner_configs(n_configs: int, rng: np.random.Generator,
+                            espace: dict = ESPACE_RECHERCHE) -> list[dict]:
+    """Tire n configurations distinctes dans l'espace de recherche."""
+    configs, vues = [], set()
+    for _ in range(n_configs * 20):
+        if len(configs) >= n_configs:
+            break
+        profondeur = int(rng.choice(espace["profondeurs"]))
+        config = {
+            "couches":       tuple(int(rng.choice(espace["largeurs"]))
+                                   for _ in range(profondeur)),
+            "activation":    str(rng.choice(espace["activations"])),
+            "learning_rate": float(rng.choice(espace["learning_rates"])),
+        }
+        cle = json.dumps(config, sort_keys=True)
+        if cle not in vues:
+            vues.add(cle)
+            configs.append(config)
+    return configs
+
+
+def nb_parametres(couches: tuple[int, ...], n_in: int = 1, n_out: int = 1) -> int:
+    """Nombre de paramètres (poids + biais) d'un MLP Dense."""
+    tailles = [n_in, *couches, n_out]
+    return int(sum((a + 1) * b for a, b in zip(tailles[:-1], tailles[1:])))
+
+
+def front_pareto(essais: list[dict]) -> list[dict]:
+    """
+    Essais non dominés au sens (val_loss ↓, n_params ↓).
+    Retournés triés par nombre de paramètres croissant.
+    """
+    front, meilleure_loss = [], float("inf")
+    for essai in sorted(essais, key=lambda e: (e["n_params"], e["val_loss"])):
+        if essai["val_loss"] < meilleure_loss:
+            front.append(essai)
+            meilleure_loss = essai["val_loss"]
+    return front
+
+
+def _init_worker(n_threads: int):
+    """Limite les threads TensorFlow de chaque processus (évite la sursouscription)."""
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _evaluer_essai(args: tuple) -> dict:
+    """
+    Entraîne une configuration pendant `epochs` époques supplémentaires
+    (reprise depuis `chemin_poids` s'il existe) et retourne la val_loss.
+    Exécuté dans un processus du pool.
+    """
+    (idx, config, epochs, V_tr, I_tr, V_val, I_val, chemin_poids, seed) = args
+    import tensorflow as tf
+    from trainer import _build_model
+
+    tf.keras.utils.set_random_seed(seed)
+    model = _build_model(**config)
+    if os.path.exists(chemin_poids):
+        model.load_weights(chemin_poids)
+
+    history = model.fit(
+        V_tr, I_tr,
+        epochs=epochs,
+        batch_size=64,
+        validation_data=(V_val, I_val),
+        verbose=0,
+    )
+    model.save_weights(chemin_poids)
+    return {
+        "idx":      idx,
+        "val_loss": float(min(history.history["val_loss"])),
+        "n_params": int(model.count_params()),
+    }
+
+
+def rechercher_architecture(composant_nom: str,
+                            n_configs: int = 27,
+                            budget_min: int = 15,
+                            eta: int = 3,
+                            n_workers: int | None = None,
+                            seed: int = 0) -> dict:
+    """
+    Successive halving sur l'architecture du MLP.
+
+    Args:
+        composant_nom: Nom du composant (simulation requise)
+        n_configs:     Nombre de configurations au premier palier
+        budget_min:    Époques par essai au premier palier
+        eta:           Facteur de réduction (garde 1/eta, budget ×eta)
+        n_workers:     Processus parallèles (défaut: nb CPU, max 4)
+        seed:          Graine (tirage des configs et split validation)
+
+    Returns:
+        dict avec 'essais', 'pareto' et 'meilleur' (config à passer à
+        trainer.entrainer(..., architecture=...))
+    """
+    if eta < 2:
+        raise ValueError(f"eta doit être ≥ 2 (reçu {eta}) : sinon les paliers ne réduisent rien.")
+
+    from sklearn.preprocessing import MinMaxScaler
+    from simulateur import charger_simulation
+
+    sim = charger_simulation(composant_nom)
+    if sim is None:
+        raise ValueError(f"Aucune simulation pour '{composant_nom}'. "
+                         f"Lancez simulateur.py d'abord.")
+    V_sim, I_sim = sim
+
+    # Split validation aléatoire fixe (commun à tous les essais)
+    rng = np.random.default_rng(seed)
+    V_s = MinMaxScaler().fit_transform(V_sim.reshape(-1, 1)).astype(np.float32)
+    I_s = MinMaxScaler().fit_transform(I_sim.reshape(-1, 1)).astype(np.float32)
+    perm  = rng.permutation(len(V_s))
+    n_val = max(1, len(V_s) // 10)
+    val, tr = perm[:n_val], perm[n_val:]
+
+    configs = _echantillonner_configs(n_configs, rng)
+    n_workers = n_workers or min(4, os.cpu_count() or 1)
+    n_threads = max(1, (os.cpu_count() or 1) // n_workers)
+    dossier_tmp = tempfile.mkdtemp(prefix=f"hp_{composant_nom}_")
+
+    print(f"[HP] {len(configs)} configurations, budget initial {budget_min} "
+          f"époques, eta={eta}, {n_workers} processus.")
+
+    essais = [{"idx": i, "config": c, "epochs": 0, "val_loss": float("inf"),
+               "n_params": nb_parametres(c["couches"]), "palier": 0}
+              for i, c in enumerate(configs)]
+    survivants = list(range(len(configs)))
+    budget, palier = budget_min, 0
+
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx,
+                                 initializer=_init_worker,
+                                 initargs=(n_threads,)) as pool:
+            while survivants:
+                taches = []
+                for i in survivants:
+                    supplement = budget - essais[i]["epochs"]
+                    taches.append((i, essais[i]["config"], supplement,
+                                   V_s[tr], I_s[tr], V_s[val], I_s[val],
+                                   os.path.join(dossier_tmp, f"essai_{i}.weights.h5"),
+                                   seed + i))
+                for res in pool.map(_evaluer_essai, taches):
+                    e = essais[res["idx"]]
+                    e.update(val_loss=res["val_loss"], n_params=res["n_params"],
+                             epochs=budget, palier=palier)
+
+                classement = sorted(survivants, key=lambda i: essais[i]["val_loss"])
+                meilleur = essais[classement[0]]
+                print(f"[HP] Palier {palier}: {len(survivants)} essais × {budget} "
+                      f"époques — meilleur val_loss={meilleur['val_loss']:.3e} "
+                      f"({meilleur['config']['couches']})")
+
+                n_garder = len(survivants) // eta
+                if n_garder < 1:
+                    break
+                survivants = classement[:n_garder]
+                budget *= eta
+                palier += 1
+    finally:
+        shutil.rmtree(dossier_tmp, ignore_errors=True)
+
+    pareto   = front_pareto(essais)
+    meilleur = min(essais, key=lambda e: (-e["palier"], e["val_loss"]))
+    resultat = {
+        "composant": composant_nom,
+        "espace":    ESPACE_RECHERCHE,
+        "eta":       eta,
+        "essais":    essais,
+        "pareto":    pareto,
+        "meilleur":  meilleur["config"],
+    }
+
+    chemin = os.path.join(MODELS_DIR, f"{composant_nom}_hp_search.json")
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump(resultat, f, indent=2)
+
+    print(f"[HP] Front de Pareto ({len(pareto)} points):")
+    for e in pareto:
+        print(f"[HP]   {e['n_params']:>7} params | val_loss={e['val_loss']:.3e} "
+              f"| {e['config']}")
+    print(f"[HP] Résultats sauvegardés: {chemin}")
+    return resultat
+
+
+if __name__ == "__main__":
+    import sys
+    nom = sys.argv[1] if len(sys.argv) > 1 else "1N4007"
+    res = rechercher_architecture(nom)
+    print(f"\nMeilleure configuration pour {nom}: {res['meilleur']}")
@@ -0,0 +1,127 @@
+"""
+REGISTRE DE MODÈLES — registre_modeles.py
+Cache LRU en mémoire (par processus) des modèles Keras et scalers joblib :
+les validations / conversions HLS répétées dans un même processus Streamlit
+réutilisent les objets déjà chargés au lieu de relire le disque.
+  - clé   : (chemin absolu, mtime_ns, taille) → un fichier réécrit (nouvel
+            entraînement, distillation...) invalide automatiquement l'entrée
+  - borne : nombre d'entrées et mémoire estimée (poids + taille fichier),
+            éviction du moins récemment utilisé
+Les objets retournés sont partagés : ne pas les modifier (fit, set_weights),
+en faire une copie si nécessaire.
+Limites : MODEL_CACHE_MAX_ENTRIES (défaut 8), MODEL_CACHE_MAX_MB (défaut 256).
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
+
+MAX_ENTREES = int(os.getenv("MODEL_CACHE_MAX_ENTRIES", "8"))
+MAX_OCTETS  = int(os.getenv("MODEL_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+_cache: "OrderedDict[str, tuple[tuple, object, int]]" = OrderedDict()
+_verrou = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _empreinte_fichier(chemin: str) -> tuple:
+    st = os.stat(chemin)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _taille_objet(obj, taille_fichier: int) -> int:
+    """Mémoire estimée : octets des poids Keras, sinon taille du fichier."""
+    poids = getattr(obj, "weights", None)
+    if poids:
+        try:
+            return int(sum(np.prod(w.shape) * w.dtype.size for w in poids))
+        except Exception:
+            pass
+    return taille_fichier
+
+
+def _evincer():
+    """Supprime les entrées les plus anciennes au-delà des limites (verrou tenu)."""
+    total = sum(taille for _, _, taille in _cache.values())
+    while _cache and (len(_cache) > MAX_ENTREES or total > MAX_OCTETS):
+        _, (_, _, taille) = _cache.popitem(last=False)
+        total -= taille
+        _stats["evictions"] += 1
+
+
+def obtenir(chemin: str, chargeur, espace: str = "") -> object:
+    """
+    Objet chargé depuis `chemin` via `chargeur(chemin)`, mis en cache.
+    Rechargé si le fichier a changé depuis (mtime / taille).
+    `espace` distingue plusieurs objets dérivés d'un même fichier.
+    """
+    if not os.path.exists(chemin):
+        raise FileNotFoundError(chemin)
+    chemin = os.path.realpath(chemin)
+    cle = f"{espace}|{chemin}" if espace else chemin
+    empreinte = _empreinte_fichier(chemin)
+
+    with _verrou:
+        entree = _cache.get(cle)
+        if entree and entree[0] == empreinte:
+            _cache.move_to_end(cle)
+            _stats["hits"] += 1
+            return entree[1]
+        _stats["misses"] += 1
+
+    # Chargement hors verrou (peut être long) ; le dernier arrivé gagne
+    obj = chargeur(chemin)
+    with _verrou:
+        _cache[cle] = (empreinte, obj, _taille_objet(obj, empreinte[1]))
+        _cache.move_to_end(cle)
+        _evincer()
+    return obj
+
+
+def charger_modele(chemin: str):
+    """Modèle Keras (.keras / .h5) depuis le cache."""
+    def _charger(p):
+        from tensorflow import keras
+        return keras.models.load_model(p)
+    return obtenir(chemin, _charger)
+
+
+def charger_scaler(chemin: str):
+    """Scaler joblib (.pkl) depuis le cache."""
+    import joblib
+    return obtenir(chemin, joblib.load)
+
+
+def charger_scalers(composant_nom: str) -> tuple:
+    """(scaler_V, scaler_I) du composant, produits par trainer.entrainer."""
+    return (
+        charger_scaler(os.path.join(MODELS_DIR, f"{composant_nom}_scaler_V.pkl")),
+        charger_scaler(os.path.join(MODELS_DIR, f"{composant_nom}_scaler_I.pkl")),
+    )
+
+
+def invalider(chemin: str | None = None):
+    """Retire les entrées d'un fichier (ou tout le cache si chemin est None)."""
+    with _verrou:
+        if chemin is None:
+            _cache.clear()
+            return
+        chemin = os.path.realpath(chemin)
+        for cle in [c for c in _cache if c == chemin or c.endswith(f"|{chemin}")]:
+            del _cache[cle]
+
+
+def statistiques() -> dict:
+    """Compteurs du cache (pour la page plateforme / le débogage)."""
+    with _verrou:
+        return {
+            **_stats,
+            "entrees": len(_cache),
+            "octets":  int(sum(taille for _, _, taille in _cache.values())),
+            "max_entrees": MAX_ENTREES,
+            "max_octets":  MAX_OCTETS,
+        }
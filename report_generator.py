@@ -16,6 +16,7 @@ from datetime import datetime
 
 DB_PATH     = os.path.join(os.path.dirname(__file__), "composants_db.sqlite")
 REPORTS_DIR = os.path.join(os.path.dirname(__file__), "reports")
+MODELS_DIR  = os.path.join(os.path.dirname(__file__), "models")
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
 
@@ -278,6 +279,9 @@ def generer_rapport(composant_nom: str, quant_type: str = "int8") -> str:
         pdf.ln(4)
         pdf.image(tmp4, x=10, w=190)
 
+    # Surrogate PWL vs MLP Dense
+    _ecrire_comparaison_pwl(pdf, composant_nom, V_sim, I_sim, ia)
+
     # Sauvegarder
     pdf_path = os.path.join(REPORTS_DIR, f"{composant_nom}_validation.pdf")
     pdf.output(pdf_path)
@@ -293,6 +297,59 @@ def generer_rapport(composant_nom: str, quant_type: str = "int8") -> str:
     return pdf_path
 
 
+def _ecrire_comparaison_pwl(pdf, composant_nom: str, V_sim: np.ndarray,
+                            I_sim: np.ndarray, ia) -> None:
+    """Tableau d'empreinte : table PWL (surrogate_pwl.py) vs MLP Dense."""
+    from metriques import toutes_metriques, verdict_pass_fail
+    from surrogate_pwl import (construire_table_pwl, evaluer_pwl,
+                               empreinte_pwl, taille_mlp)
+
+    table = construire_table_pwl(V_sim, I_sim)
+    m_pwl = toutes_metriques(I_sim, evaluer_pwl(table, V_sim))
+    emp   = empreinte_pwl(table)
+    mlp   = taille_mlp(os.path.join(MODELS_DIR, f"{composant_nom}_model.keras"))
+
+    e_rel_ia = "N/A"
+    if ia is not None:
+        I_pred = np.interp(V_sim, np.array(json.loads(ia[0])), np.array(json.loads(ia[1])))
+        e_rel_ia = f"{toutes_metriques(I_sim, I_pred)['E_rel_%']:.2f}"
+
+    lignes = [
+        ("Mots mémoire", f"{mlp['params_total']:,}" if mlp else "N/A",
+         f"{emp['mots_memoire']:,}"),
+        ("Multiplications / éval.", f"{mlp['mac_operations']:,}" if mlp else "N/A",
+         str(emp["multiplications"])),
+        ("Comparaisons / éval.", "0", str(emp["comparaisons"])),
+        ("E_rel (%)", e_rel_ia, f"{m_pwl['E_rel_%']:.2f}"),
+        ("Verdict (seuil IA)",
+         verdict_pass_fail(float(e_rel_ia), "ia") if ia is not None else "N/A",
+         verdict_pass_fail(m_pwl["E_rel_%"], "ia")),
+    ]
+
+    pdf.add_page()
+    pdf.set_font("Helvetica", "B", 11)
+    pdf.set_fill_color(236, 240, 241)
+    pdf.cell(0, 8, "7. Surrogate PWL vs MLP Dense (empreinte)", fill=True)
+    pdf.ln(4)
+    pdf.set_font("Helvetica", size=9)
+    pdf.cell(0, 6, f"Table linéaire par morceaux : {emp['points_rupture']} points "
+                   f"de rupture, recherche dichotomique + 1 multiplication.")
+    pdf.ln(8)
+
+    col_w = [70, 60, 60]
+    pdf.set_fill_color(44, 62, 80)
+    pdf.set_text_color(255, 255, 255)
+    for i, h in enumerate(["Critère", "MLP Dense", "Table PWL"]):
+        pdf.cell(col_w[i], 7, h, border=1, fill=True, align="C")
+    pdf.ln()
+    pdf.set_text_color(0, 0, 0)
+    for critere, v_mlp, v_pwl in lignes:
+        pdf.cell(col_w[0], 6, critere, border=1)
+        pdf.cell(col_w[1], 6, v_mlp, border=1, align="C")
+        pdf.cell(col_w[2], 6, v_pwl, border=1, align="C")
+        pdf.ln()
+
+
 def _ecrire_verdict(pdf, verdict: str, mode: str):
     """Écrit le verdict PASS/FAIL dans le PDF avec couleur."""
     pdf.set_font("Helvetica", "B", 13)
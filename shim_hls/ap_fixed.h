@@ -0,0 +1,12 @@
+// Shim portable ap_fixed / ap_ufixed (cf. ap_int.h).
+#ifndef AP_FIXED_SHIM_H_
+#define AP_FIXED_SHIM_H_
+
+#include "ap_int.h"
+
+template <int _AP_W, int _AP_I, ap_q_mode _AP_Q = AP_TRN, ap_o_mode _AP_O = AP_WRAP, int _AP_N = 0>
+using ap_fixed = ap_fixed_base<_AP_W, _AP_I, true, _AP_Q, _AP_O>;
+template <int _AP_W, int _AP_I, ap_q_mode _AP_Q = AP_TRN, ap_o_mode _AP_O = AP_WRAP, int _AP_N = 0>
+using ap_ufixed = ap_fixed_base<_AP_W, _AP_I, false, _AP_Q, _AP_O>;
+
+#endif
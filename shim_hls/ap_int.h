@@ -0,0 +1,107 @@
+// Shim portable (en-tête seul) des types Vivado/Vitis HLS ap_fixed /
+// ap_ufixed / ap_int / ap_uint, pour compiler le firmware généré avec
+// g++/clang++ hors Vivado (cf. banc_de_test.py).
+//
+// Même arithmétique que l'émulateur Python virgule_fixe : valeurs en
+// double sur la grille du type ; les opérations mixtes se font en pleine
+// précision (conversion implicite vers double, ou long long pour les types
+// entiers), la quantification puis le débordement s'appliquent à chaque
+// conversion vers un type ap_*. Exact tant que chaque résultat intermédiaire
+// tient sur 53 bits significatifs : produit a * b si W_a + W_b <= 53, somme
+// acc + produit selon les grilles (cf. virgule_fixe._bits_calcul, qui
+// refuse l'émulation au-delà).
+// Sous-ensemble : pas d'accès aux bits, ni de AP_WRAP_SM.
+#ifndef AP_INT_SHIM_H_
+#define AP_INT_SHIM_H_
+
+#include <cmath>
+#include <type_traits>
+
+enum ap_q_mode { AP_RND, AP_RND_ZERO, AP_RND_MIN_INF, AP_RND_INF, AP_RND_CONV, AP_TRN, AP_TRN_ZERO };
+enum ap_o_mode { AP_SAT, AP_SAT_ZERO, AP_SAT_SYM, AP_WRAP };
+
+#if defined(__GNUC__) || defined(__clang__)
+#define AP_SHIM_NOINLINE __attribute__((noinline))
+#else
+#define AP_SHIM_NOINLINE
+#endif
+
+namespace ap_shim {
+
+inline double signe(double m) { return (m > 0) - (m < 0); }
+
+inline double quantifier(double m, ap_q_mode q) {
+    switch (q) {
+        case AP_TRN:         return std::floor(m);
+        case AP_TRN_ZERO:    return std::trunc(m);
+        case AP_RND:         return std::floor(m + 0.5);
+        case AP_RND_ZERO:    return signe(m) * std::ceil(std::fabs(m) - 0.5);
+        case AP_RND_INF:     return signe(m) * std::floor(std::fabs(m) + 0.5);
+        case AP_RND_MIN_INF: return std::ceil(m - 0.5);
+        case AP_RND_CONV:    return std::nearbyint(m);   // arrondi au pair
+    }
+    return m;
+}
+
+// 2^e évalué à la compilation (échelles et bornes des types)
+constexpr double puissance2(int e) {
+    return e == 0 ? 1.0 : (e > 0 ? 2.0 * puissance2(e - 1) : 0.5 * puissance2(e + 1));
+}
+
+inline double deborder(double m, int W, bool S, ap_o_mode o) {
+    const double n  = puissance2(W);
+    const double lo = S ? -n / 2 : 0.0;
+    const double hi = S ? n / 2 - 1 : n - 1;
+    switch (o) {
+        case AP_WRAP:
+            if (m >= lo && m <= hi) return m;   // cas courant : pas de repliement
+            return m - n * std::floor((m - lo) / n);   // modulo au signe du diviseur (np.mod)
+        case AP_SAT:      return m < lo ? lo : (m > hi ? hi : m);
+        case AP_SAT_ZERO: return (m < lo || m > hi) ? 0.0 : m;
+        case AP_SAT_SYM: {
+            const double bas = S ? -hi : 0.0;
+            return m < bas ? bas : (m > hi ? hi : m);
+        }
+    }
+    return m;
+}
+
+}  // namespace ap_shim
+
+template <int _AP_W, int _AP_I, bool _AP_S, ap_q_mode _AP_Q, ap_o_mode _AP_O>
+struct ap_fixed_base {
+    static_assert(_AP_W >= 1 && _AP_W <= 52, "shim ap_fixed : largeur 1..52");
+    // Types entiers : conversion vers long long (arithmétique entière exacte,
+    // long long * float reste en float comme avec les en-têtes Vivado)
+    typedef typename std::conditional<_AP_W == _AP_I, long long, double>::type conv_t;
+
+    double v;
+
+    static double cast(double x) {
+        constexpr double echelle = ap_shim::puissance2(_AP_W - _AP_I);
+        constexpr double inverse = ap_shim::puissance2(_AP_I - _AP_W);   // exact : puissance de 2
+        return ap_shim::deborder(ap_shim::quantifier(x * echelle, _AP_Q), _AP_W, _AP_S, _AP_O) * inverse;
+    }
+
+    ap_fixed_base() : v(0.0) {}
+    // Hors ligne : les tableaux de poids (des milliers de constantes) sont
+    // initialisés par autant d'appels, inlinés ils rendent g++ -O2 très lent
+    AP_SHIM_NOINLINE ap_fixed_base(double x) : v(cast(x)) {}
+    template <int W2, int I2, bool S2, ap_q_mode Q2, ap_o_mode O2>
+    ap_fixed_base(const ap_fixed_base<W2, I2, S2, Q2, O2>& o) : v(cast(o.v)) {}
+
+    operator conv_t() const { return static_cast<conv_t>(v); }
+    double to_double() const { return v; }
+    float to_float() const { return static_cast<float>(v); }
+
+    template <typename T> ap_fixed_base& operator+=(const T& x) { v = cast(v + static_cast<double>(x)); return *this; }
+    template <typename T> ap_fixed_base& operator-=(const T& x) { v = cast(v - static_cast<double>(x)); return *this; }
+    template <typename T> ap_fixed_base& operator*=(const T& x) { v = cast(v * static_cast<double>(x)); return *this; }
+};
+
+template <int _AP_W>
+using ap_int = ap_fixed_base<_AP_W, _AP_W, true, AP_TRN, AP_WRAP>;
+template <int _AP_W>
+using ap_uint = ap_fixed_base<_AP_W, _AP_W, false, AP_TRN, AP_WRAP>;
+
+#endif
@@ -0,0 +1,56 @@
+// Shim portable hls::stream (cf. ap_int.h) : FIFO non bornée, suffisante
+// pour la simulation C séquentielle d'un DATAFLOW (chaque processus lit
+// ce que le précédent a entièrement écrit). Lire un flux vide est une
+// erreur, comme un blocage en co-simulation.
+#ifndef HLS_STREAM_SHIM_H_
+#define HLS_STREAM_SHIM_H_
+
+#include <cstddef>
+#include <cstdio>
+#include <cstdlib>
+#include <deque>
+#include <string>
+
+namespace hls {
+
+template <typename T>
+class stream {
+  public:
+    stream() : nom_("stream") {}
+    explicit stream(const char* nom) : nom_(nom) {}
+
+    void write(const T& valeur) { fifo_.push_back(valeur); }
+    bool write_nb(const T& valeur) { write(valeur); return true; }
+    T read() {
+        if (fifo_.empty()) {
+            std::fprintf(stderr, "hls::stream %s : lecture d'un flux vide\n", nom_.c_str());
+            std::abort();
+        }
+        T valeur = fifo_.front();
+        fifo_.pop_front();
+        return valeur;
+    }
+    void read(T& valeur) { valeur = read(); }
+    bool read_nb(T& valeur) {
+        if (fifo_.empty()) return false;
+        valeur = read();
+        return true;
+    }
+    void operator<<(const T& valeur) { write(valeur); }
+    void operator>>(T& valeur) { valeur = read(); }
+
+    bool empty() const { return fifo_.empty(); }
+    bool full() const { return false; }
+    std::size_t size() const { return fifo_.size(); }
+
+  private:
+    stream(const stream&);              // non copiable, comme hls::stream
+    stream& operator=(const stream&);
+
+    std::deque<T> fifo_;
+    std::string nom_;
+};
+
+}  // namespace hls
+
+#endif
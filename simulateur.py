@@ -99,6 +99,60 @@ def _calculer_capacite(params: dict, V_sweep: np.ndarray) -> np.ndarray:
     return C
 
 
+def _charger_composant(cursor, composant_nom: str) -> tuple[int, str, dict]:
+    """Retourne (id, type, paramètres) du composant ou lève ValueError."""
+    cursor.execute(
+        "SELECT id, type, params_json FROM composants WHERE nom = ?",
+        (composant_nom,)
+    )
+    row = cursor.fetchone()
+    if not row:
+        raise ValueError(f"Composant '{composant_nom}' introuvable en base. "
+                         f"Lancez d'abord upload_spice.py.")
+    comp_id, comp_type, params_json = row
+    return comp_id, comp_type, json.loads(params_json)
+
+
+def _resoudre(comp_type: str, params: dict, V_sweep: np.ndarray) -> np.ndarray:
+    """Dispatch du solveur selon le type de composant."""
+    if comp_type == "diode":
+        return _simuler_diode(params, V_sweep)
+    raise NotImplementedError(f"Type de composant '{comp_type}' non supporté.")
+
+
+def simuler_points(composant_nom: str, V_points: np.ndarray) -> np.ndarray:
+    """
+    Résout le composant sur des tensions arbitraires, sans rien sauvegarder.
+    Utilisé par l'apprentissage actif pour ne simuler que les points utiles.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        _, comp_type, params = _charger_composant(conn.cursor(), composant_nom)
+    finally:
+        conn.close()
+    return _resoudre(comp_type, params, np.asarray(V_points, dtype=np.float64))
+
+
+def enregistrer_simulation(composant_nom: str, V_sim: np.ndarray,
+                           I_sim: np.ndarray) -> None:
+    """Remplace la simulation stockée du composant par (V_sim, I_sim)."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    try:
+        comp_id, _, _ = _charger_composant(cursor, composant_nom)
+        cursor.execute(
+            "DELETE FROM simulations WHERE composant_id = ?", (comp_id,)
+        )
+        cursor.execute("""
+            INSERT INTO simulations (composant_id, V_json, I_json)
+            VALUES (?, ?, ?)
+        """, (comp_id, json.dumps(np.asarray(V_sim).tolist()),
+              json.dumps(np.asarray(I_sim).tolist())))
+        conn.commit()
+    finally:
+        conn.close()
+
+
 def simuler(composant_nom: str,
             V_min: float = -5.0,
             V_max: float = 1.2,
@@ -121,18 +175,11 @@ def simuler(composant_nom: str,
     cursor = conn.cursor()
 
     # Récupérer le composant
-    cursor.execute(
-        "SELECT id, type, params_json FROM composants WHERE nom = ?",
-        (composant_nom,)
-    )
-    row = cursor.fetchone()
-    if not row:
+    try:
+        comp_id, comp_type, params = _charger_composant(cursor, composant_nom)
+    except ValueError:
         conn.close()
-        raise ValueError(f"Composant '{composant_nom}' introuvable en base. "
-                         f"Lancez d'abord upload_spice.py.")
-
-    comp_id, comp_type, params_json = row
-    params = json.loads(params_json)
+        raise
 
     # Vérifier si simulation déjà présente
     if not force:
@@ -149,6 +196,7 @@ def simuler(composant_nom: str,
             print(f"[SIM] Simulation '{composant_nom}' chargée depuis la base "
                   f"({len(V_sim)} points).")
             return V_sim, I_sim
+    conn.close()
 
     # Générer le sweep de tension
     # Points plus denses autour du genou (0.4V–0.9V)
@@ -160,25 +208,11 @@ def simuler(composant_nom: str,
     print(f"[SIM] Simulation de {composant_nom} sur [{V_min}V, {V_max}V] "
           f"({len(V_sweep)} points)...")
 
-    if comp_type == "diode":
-        I_sim = _simuler_diode(params, V_sweep)
-    else:
-        raise NotImplementedError(f"Type de composant '{comp_type}' non supporté.")
-
+    I_sim = _resoudre(comp_type, params, V_sweep)
     V_sim = V_sweep
 
-    # Supprimer l'ancienne simulation
-    cursor.execute(
-        "DELETE FROM simulations WHERE composant_id = ?", (comp_id,)
-    )
-
-    # Sauvegarder
-    cursor.execute("""
-        INSERT INTO simulations (composant_id, V_json, I_json)
-        VALUES (?, ?, ?)
-    """, (comp_id, json.dumps(V_sim.tolist()), json.dumps(I_sim.tolist())))
-    conn.commit()
-    conn.close()
+    # Remplacer l'ancienne simulation
+    enregistrer_simulation(composant_nom, V_sim, I_sim)
 
     print(f"[SIM] Simulation terminée. I_max={I_sim.max():.4f}A, "
           f"I_min={I_sim.min():.4e}A")
@@ -0,0 +1,230 @@
+"""
+SURROGATE LINÉAIRE PAR MORCEAUX — surrogate_pwl.py
+Alternative au MLP pour une courbe I-V 1-D : table de points de rupture non
+uniformes + interpolation linéaire.
+  - construction : insertion gloutonne du point d'erreur relative maximale,
+    puis passe de suppression des points inutiles, jusqu'à respecter le seuil
+    E_rel de metriques (SEUIL_IA_PASS par défaut)
+  - évaluation   : np.searchsorted + pente précalculée (vectorisé)
+  - export HLS   : tables const + recherche dichotomique à nombre
+    d'itérations fixe (pwl_iv.cpp / pwl_iv.h)
+Sortie : models/{composant}_pwl.json, hls_projects/{composant}_pwl/
+"""
+
+import json
+import os
+import zipfile
+import numpy as np
+
+from metriques import SEUIL_IA_PASS, calcul_erreur_rel, toutes_metriques
+
+MODELS_DIR   = os.path.join(os.path.dirname(__file__), "models")
+HLS_PROJ_DIR = os.path.join(os.path.dirname(__file__), "hls_projects")
+
+
+def _erreurs_relatives(I_ref: np.ndarray, I_approx: np.ndarray,
+                       epsilon: float = 1e-15) -> np.ndarray:
+    return np.abs(I_ref - I_approx) / (np.abs(I_ref) + epsilon)
+
+
+def construire_table_pwl(V: np.ndarray, I: np.ndarray,
+                         seuil_rel: float = SEUIL_IA_PASS,
+                         marge: float = 0.5,
+                         max_points: int = 4096) -> dict:
+    """
+    Sélectionne un sous-ensemble minimal de points (V, I) dont l'interpolation
+    linéaire respecte E_rel < seuil_rel × marge sur tous les points fournis.
+
+    Args:
+        V, I:       Courbe de référence (V croissant)
+        seuil_rel:  Seuil E_rel (%) de metriques
+        marge:      Fraction du seuil visée (réserve pour la quantification)
+        max_points: Nombre max de points de rupture
+
+    Returns:
+        dict {V_bp, I_bp, pente, E_rel_%} (listes JSON-sérialisables)
+    """
+    ordre = np.argsort(V)
+    V = np.asarray(V, dtype=np.float64)[ordre]
+    I = np.asarray(I, dtype=np.float64)[ordre]
+    cible = seuil_rel * marge
+
+    garde = np.zeros(len(V), dtype=bool)
+    garde[[0, -1]] = True
+
+    # Insertion gloutonne du point le plus mal approché
+    while garde.sum() < min(max_points, len(V)):
+        I_approx = np.interp(V, V[garde], I[garde])
+        if calcul_erreur_rel(I, I_approx) < cible:
+            break
+        err = _erreurs_relatives(I, I_approx)
+        err[garde] = -1.0
+        garde[int(np.argmax(err))] = True
+
+    # Passe de suppression des points devenus inutiles
+    for idx in np.flatnonzero(garde)[1:-1]:
+        garde[idx] = False
+        if calcul_erreur_rel(I, np.interp(V, V[garde], I[garde])) >= cible:
+            garde[idx] = True
+
+    V_bp, I_bp = V[garde], I[garde]
+    table = {
+        "V_bp":    V_bp.tolist(),
+        "I_bp":    I_bp.tolist(),
+        "pente":   (np.diff(I_bp) / np.diff(V_bp)).tolist(),
+        "E_rel_%": calcul_erreur_rel(I, np.interp(V, V_bp, I_bp)),
+    }
+    return table
+
+
+def evaluer_pwl(table: dict, V: np.ndarray) -> np.ndarray:
+    """Évalue la table sur un tableau de tensions (extrapolation linéaire aux bords)."""
+    V_bp  = np.asarray(table["V_bp"], dtype=np.float64)
+    I_bp  = np.asarray(table["I_bp"], dtype=np.float64)
+    pente = np.asarray(table["pente"], dtype=np.float64)
+    V = np.asarray(V, dtype=np.float64)
+    idx = np.clip(np.searchsorted(V_bp, V, side="right") - 1, 0, len(V_bp) - 2)
+    return I_bp[idx] + (V - V_bp[idx]) * pente[idx]
+
+
+def empreinte_pwl(table: dict, bits: int = 32) -> dict:
+    """Coût mémoire / calcul d'une évaluation de la table."""
+    n = len(table["V_bp"])
+    return {
+        "points_rupture":   n,
+        "mots_memoire":     3 * n - 1,            # V_bp, I_bp, pente
+        "bits_memoire":     (3 * n - 1) * bits,
+        "comparaisons":     int(np.ceil(np.log2(max(n, 2)))),
+        "multiplications":  1,
+    }
+
+
+def taille_mlp(model_path: str) -> dict | None:
+    """
+    Paramètres et MACs d'un MLP Dense .keras, lus dans config.json
+    (sans charger TensorFlow).
+    """
+    if not os.path.exists(model_path):
+        return None
+    with zipfile.ZipFile(model_path) as zf:
+        config = json.loads(zf.read("config.json"))
+    unites = [c["config"]["units"] for c in config["config"]["layers"]
+              if c.get("class_name") == "Dense"]
+    tailles = [1, *unites]
+    macs = int(sum(a * b for a, b in zip(tailles[:-1], tailles[1:])))
+    return {
+        "params_total":   int(sum((a + 1) * b for a, b in zip(tailles[:-1], tailles[1:]))),
+        "mac_operations": macs,
+    }
+
+
+def generer_cpp_pwl(table: dict, composant_nom: str,
+                    proj_dir: str | None = None,
+                    type_donnees: str = "float") -> str:
+    """
+    Génère le code HLS C++ de la table (pwl_iv.h / pwl_iv.cpp).
+    Retourne le dossier du projet.
+    """
+    proj_dir = proj_dir or os.path.join(HLS_PROJ_DIR, f"{composant_nom}_pwl")
+    firm_dir = os.path.join(proj_dir, "firmware")
+    os.makedirs(firm_dir, exist_ok=True)
+
+    n = len(table["V_bp"])
+    n_iter = int(np.ceil(np.log2(max(n - 1, 2))))
+
+    def _tableau(nom: str, valeurs: list) -> str:
+        corps = ",\n    ".join(
+            ", ".join(f"{v:.9e}" for v in valeurs[i:i + 6])
+            for i in range(0, len(valeurs), 6)
+        )
+        return f"static const pwl_t {nom}[{len(valeurs)}] = {{\n    {corps}\n}};\n"
+
+    header = f"""// Auto-generated by surrogate_pwl.py — {composant_nom}
+#ifndef PWL_IV_H_
+#define PWL_IV_H_
+
+#include "ap_fixed.h"
+
+typedef {type_donnees} pwl_t;
+
+#define PWL_N_POINTS {n}
+#define PWL_N_ITER   {n_iter}
+
+void pwl_iv(pwl_t V, pwl_t &I);
+
+#endif
+"""
+    cpp = f"""// PWL I-V surrogate — {composant_nom} ({n} points de rupture)
+#include "pwl_iv.h"
+
+{_tableau("V_BP", table["V_bp"])}
+{_tableau("I_BP", table["I_bp"])}
+{_tableau("PENTE", table["pente"])}
+void pwl_iv(pwl_t V, pwl_t &I) {{
+#pragma HLS PIPELINE II=1
+    // Recherche dichotomique du segment : V_BP[lo] <= V < V_BP[lo+1]
+    int lo = 0;
+    int hi = PWL_N_POINTS - 2;
+    for (int it = 0; it < PWL_N_ITER; it++) {{
+#pragma HLS UNROLL
+        int mid = (lo + hi + 1) >> 1;
+        if (lo < hi) {{
+            if (V >= V_BP[mid]) lo = mid;
+            else hi = mid - 1;
+        }}
+    }}
+    I = I_BP[lo] + (V - V_BP[lo]) * PENTE[lo];
+}}
+"""
+    with open(os.path.join(firm_dir, "pwl_iv.h"), "w", encoding="utf-8") as f:
+        f.write(header)
+    with open(os.path.join(firm_dir, "pwl_iv.cpp"), "w", encoding="utf-8") as f:
+        f.write(cpp)
+    print(f"[PWL] Firmware C++: {firm_dir}/ ({n} points, {n_iter} itérations)")
+    return proj_dir
+
+
+def construire_depuis_composant(composant_nom: str,
+                                source: str = "simulation",
+                                seuil_rel: float = SEUIL_IA_PASS) -> dict:
+    """
+    Construit, évalue et sauvegarde la table PWL d'un composant.
+    source: 'simulation' (vérité terrain) ou 'mlp' (prédictions IA stockées).
+    L'erreur est toujours mesurée par rapport à la simulation.
+    """
+    from simulateur import charger_simulation
+    from trainer import charger_prediction_ia
+
+    sim = charger_simulation(composant_nom)
+    if sim is None:
+        raise ValueError(f"Aucune simulation pour '{composant_nom}'.")
+    V_sim, I_sim = sim
+
+    if source == "mlp":
+        pred = charger_prediction_ia(composant_nom)
+        if pred is None:
+            raise ValueError(f"Aucune prédiction IA pour '{composant_nom}'.")
+        V_ref, I_ref = pred
+    else:
+        V_ref, I_ref = V_sim, I_sim
+
+    table = construire_table_pwl(V_ref, I_ref, seuil_rel=seuil_rel)
+    m = toutes_metriques(I_sim, evaluer_pwl(table, V_sim))
+    table.update(source=source, metriques=m, empreinte=empreinte_pwl(table))
+
+    chemin = os.path.join(MODELS_DIR, f"{composant_nom}_pwl.json")
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump(table, f, indent=2)
+    generer_cpp_pwl(table, composant_nom)
+
+    print(f"[PWL] '{composant_nom}' ({source}): {len(table['V_bp'])} points "
+          f"| E_rel={m['E_rel_%']:.3f}% | R²={m['R2']:.6f}")
+    return table
+
+
+if __name__ == "__main__":
+    import sys
+    nom    = sys.argv[1] if len(sys.argv) > 1 else "1N4007"
+    source = sys.argv[2] if len(sys.argv) > 2 else "simulation"
+    t = construire_depuis_composant(nom, source)
+    print(f"\nTable PWL {nom}: {t['empreinte']}")
@@ -0,0 +1,219 @@
+"""
+TÉLÉMÉTRIE D'ENTRAÎNEMENT — telemetrie.py
+Persistance de chaque entraînement Keras dans la base :
+  - entrainements       : une ligne par exécution (composant, config,
+                          statut, durée, débit médian)
+  - telemetrie_epochs   : une ligne par époque (loss, val_loss, learning
+                          rate, durée, échantillons/s, pertes par région)
+Alimentée par le callback creer_callback_telemetrie (trainer.entrainer),
+affichée sur la page plateforme. Une exécution interrompue reste au statut
+'en_cours' avec les époques déjà écrites.
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+DB_PATH = os.path.join(os.path.dirname(__file__), "composants_db.sqlite")
+
+SEUIL_REGRESSION = 0.8   # débit < 80 % de la médiane des exécutions précédentes
+
+
+def _ensure_tables(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS entrainements (
+            id               INTEGER PRIMARY KEY AUTOINCREMENT,
+            composant_id     INTEGER NOT NULL,
+            config_json      TEXT,
+            statut           TEXT NOT NULL DEFAULT 'en_cours',
+            epochs           INTEGER DEFAULT 0,
+            duree_s          REAL,
+            echantillons_s   REAL,
+            meilleure_val    REAL,
+            created_at       TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (composant_id) REFERENCES composants(id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS telemetrie_epochs (
+            id               INTEGER PRIMARY KEY AUTOINCREMENT,
+            entrainement_id  INTEGER NOT NULL,
+            epoch            INTEGER NOT NULL,
+            loss             REAL,
+            val_loss         REAL,
+            learning_rate    REAL,
+            duree_s          REAL,
+            echantillons_s   REAL,
+            extras_json      TEXT,
+            FOREIGN KEY (entrainement_id) REFERENCES entrainements(id)
+        )
+    """)
+    conn.commit()
+
+
+def demarrer_entrainement(composant_nom: str, config: dict | None = None) -> int | None:
+    """Crée la ligne de l'exécution. None si le composant est inconnu."""
+    conn = sqlite3.connect(DB_PATH)
+    _ensure_tables(conn)
+    row = conn.execute("SELECT id FROM composants WHERE nom = ?",
+                       (composant_nom,)).fetchone()
+    if not row:
+        conn.close()
+        return None
+    cur = conn.execute(
+        "INSERT INTO entrainements (composant_id, config_json) VALUES (?, ?)",
+        (row[0], json.dumps(config or {}, default=str)),
+    )
+    conn.commit()
+    run_id = cur.lastrowid
+    conn.close()
+    return run_id
+
+
+def enregistrer_epoch(run_id: int, epoch: int, logs: dict,
+                      learning_rate: float | None, duree_s: float,
+                      echantillons_s: float):
+    """Ajoute la ligne d'une époque ; les métriques autres que loss/val_loss vont dans extras_json."""
+    extras = {k: float(v) for k, v in logs.items()
+              if k not in ("loss", "val_loss", "learning_rate")
+              and isinstance(v, (int, float, np.floating))}
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute(
+        "INSERT INTO telemetrie_epochs (entrainement_id, epoch, loss, val_loss, "
+        "learning_rate, duree_s, echantillons_s, extras_json) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (run_id, epoch,
+         float(logs["loss"]) if "loss" in logs else None,
+         float(logs["val_loss"]) if "val_loss" in logs else None,
+         learning_rate, duree_s, echantillons_s, json.dumps(extras)),
+    )
+    conn.execute("UPDATE entrainements SET epochs = epochs + 1 WHERE id = ?", (run_id,))
+    conn.commit()
+    conn.close()
+
+
+def terminer_entrainement(run_id: int, statut: str = "termine"):
+    """Statut final, durée totale, débit médian (hors 1re époque) et meilleure val_loss."""
+    conn = sqlite3.connect(DB_PATH)
+    rows = conn.execute(
+        "SELECT duree_s, echantillons_s, val_loss FROM telemetrie_epochs "
+        "WHERE entrainement_id = ? ORDER BY epoch", (run_id,)
+    ).fetchall()
+    duree = float(sum(r[0] for r in rows)) if rows else None
+    debits = [r[1] for r in rows[1:]] or [r[1] for r in rows]
+    debit = float(np.median(debits)) if debits else None
+    vals = [r[2] for r in rows if r[2] is not None]
+    conn.execute(
+        "UPDATE entrainements SET statut = ?, duree_s = ?, echantillons_s = ?, "
+        "meilleure_val = ? WHERE id = ?",
+        (statut, duree, debit, min(vals) if vals else None, run_id),
+    )
+    conn.commit()
+    conn.close()
+
+
+def creer_callback_telemetrie(composant_nom: str, n_echantillons: int,
+                              config: dict | None = None):
+    """
+    Callback Keras : crée l'exécution au début de l'entraînement, écrit une
+    ligne par époque, clôt l'exécution à la fin. Les erreurs d'écriture en
+    base n'interrompent jamais l'entraînement.
+    """
+    from tensorflow import keras
+
+    class _Telemetrie(keras.callbacks.Callback):
+        def __init__(self):
+            super().__init__()
+            self.run_id = None
+
+        def on_train_begin(self, logs=None):
+            try:
+                self.run_id = demarrer_entrainement(composant_nom, config)
+            except sqlite3.Error as e:
+                print(f"[IA] Télémétrie désactivée: {e}")
+
+        def on_epoch_begin(self, epoch, logs=None):
+            self._t0 = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            if self.run_id is None:
+                return
+            duree = time.perf_counter() - self._t0
+            try:
+                lr = float(np.asarray(self.model.optimizer.learning_rate))
+            except (AttributeError, TypeError, ValueError):
+                lr = None
+            try:
+                enregistrer_epoch(self.run_id, epoch, logs or {}, lr, duree,
+                                  n_echantillons / duree if duree > 0 else 0.0)
+            except sqlite3.Error as e:
+                print(f"[IA] Télémétrie: époque {epoch} non enregistrée ({e})")
+
+        def on_train_end(self, logs=None):
+            if self.run_id is None:
+                return
+            try:
+                terminer_entrainement(self.run_id)
+            except sqlite3.Error as e:
+                print(f"[IA] Télémétrie: exécution {self.run_id} non clôturée ({e})")
+
+    return _Telemetrie()
+
+
+def lister_entrainements(composant_nom: str | None = None, limite: int = 20) -> list[dict]:
+    """Dernières exécutions (plus récente en premier)."""
+    conn = sqlite3.connect(DB_PATH)
+    _ensure_tables(conn)
+    requete = (
+        "SELECT e.id, c.nom, e.statut, e.epochs, e.duree_s, e.echantillons_s, "
+        "e.meilleure_val, e.config_json, e.created_at FROM entrainements e "
+        "JOIN composants c ON c.id = e.composant_id "
+    )
+    args: tuple = ()
+    if composant_nom:
+        requete += "WHERE c.nom = ? "
+        args = (composant_nom,)
+    rows = conn.execute(requete + "ORDER BY e.id DESC LIMIT ?", args + (limite,)).fetchall()
+    conn.close()
+    cles = ("id", "composant", "statut", "epochs", "duree_s", "echantillons_s",
+            "meilleure_val", "config", "created_at")
+    runs = [dict(zip(cles, r)) for r in rows]
+    for run in runs:
+        run["config"] = json.loads(run["config"] or "{}")
+    return runs
+
+
+def charger_epochs(run_id: int) -> dict[str, np.ndarray]:
+    """Courbes d'une exécution : epoch, loss, val_loss, learning_rate, duree_s, echantillons_s."""
+    conn = sqlite3.connect(DB_PATH)
+    _ensure_tables(conn)
+    rows = conn.execute(
+        "SELECT epoch, loss, val_loss, learning_rate, duree_s, echantillons_s "
+        "FROM telemetrie_epochs WHERE entrainement_id = ? ORDER BY epoch", (run_id,)
+    ).fetchall()
+    conn.close()
+    cles = ("epoch", "loss", "val_loss", "learning_rate", "duree_s", "echantillons_s")
+    colonnes = list(zip(*rows)) if rows else [()] * len(cles)
+    return {k: np.array(v, dtype=float) for k, v in zip(cles, colonnes)}
+
+
+def detecter_regression(composant_nom: str, seuil: float = SEUIL_REGRESSION) -> dict | None:
+    """
+    Compare le débit de la dernière exécution terminée à la médiane des
+    précédentes du même composant. None si moins de deux exécutions.
+    """
+    runs = [r for r in lister_entrainements(composant_nom, limite=50)
+            if r["statut"] == "termine" and r["echantillons_s"]]
+    if len(runs) < 2:
+        return None
+    reference = float(np.median([r["echantillons_s"] for r in runs[1:]]))
+    ratio = runs[0]["echantillons_s"] / reference
+    return {
+        "entrainement_id": runs[0]["id"],
+        "echantillons_s":  runs[0]["echantillons_s"],
+        "reference":       reference,
+        "ratio":           ratio,
+        "regression":      ratio < seuil,
+    }
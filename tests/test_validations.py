@@ -424,5 +424,1306 @@ class TestIntegration:
         assert 0.5 < V_seuil < 0.9, f"Seuil inattendu: {V_seuil:.3f}V"
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests Warm-start (trainer.py)
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestWarmStart:
+    """Tests pour la sélection du modèle d'initialisation."""
+
+    def test_distance_nulle_parametres_identiques(self):
+        from trainer import _distance_parametres
+        assert _distance_parametres(TEST_PARAMS, TEST_PARAMS) == pytest.approx(0.0)
+
+    def test_distance_croissante(self):
+        """Une petite retouche est plus proche qu'un changement d'une décade."""
+        from trainer import _distance_parametres
+        proche = dict(TEST_PARAMS, N=1.9)
+        loin   = dict(TEST_PARAMS, IS=TEST_PARAMS["IS"] * 10)
+        assert (_distance_parametres(TEST_PARAMS, proche)
+                < _distance_parametres(TEST_PARAMS, loin))
+
+    def test_distance_sans_cle_commune(self):
+        from trainer import _distance_parametres
+        assert _distance_parametres({"IS": 1e-9}, {"VTO": 3.6}) == float("inf")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests Checkpoints d'entraînement (trainer.py)
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestCheckpoint:
+    """Tests pour la reprise d'entraînement depuis un checkpoint."""
+
+    def test_checkpoint_incomplet_ignore(self, tmp_path):
+        """etat.json qui référence un modèle absent → pas de reprise."""
+        from trainer import _charger_etat_checkpoint
+        assert _charger_etat_checkpoint(str(tmp_path)) is None
+        (tmp_path / "etat.json").write_text(json.dumps(
+            {"epoch": 9, "model_file": "ckpt_00009.keras"}))
+        assert _charger_etat_checkpoint(str(tmp_path)) is None
+        (tmp_path / "ckpt_00009.keras").write_bytes(b"")
+        assert _charger_etat_checkpoint(str(tmp_path))["epoch"] == 9
+
+    def test_empreinte_simulation(self):
+        """Même grille V, courbe I différente → empreinte différente (pas de reprise)."""
+        from trainer import _empreinte_simulation
+        V = np.linspace(-1.0, 1.0, 50)
+        I = np.exp(V)
+        assert _empreinte_simulation(V, I) == _empreinte_simulation(V.copy(), I.copy())
+        assert _empreinte_simulation(V, I) != _empreinte_simulation(V, I * 1.01)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests Split par région I-V
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestRegionsIV:
+    """Tests pour le split stratifié et la pondération par région."""
+
+    @pytest.fixture
+    def courbe(self):
+        from simulateur import _simuler_diode
+        V = np.linspace(-5.0, 1.2, 400)
+        return V, _simuler_diode(TEST_PARAMS, V)
+
+    def test_trois_regions_ordonnees(self, courbe):
+        from trainer import regions_iv
+        V, I = courbe
+        r = regions_iv(V, I)
+        assert set(r) == {0, 1, 2}
+        assert np.all(np.diff(r) >= 0)          # inverse → genou → direct
+        assert np.all(r[V < 0] == 0)
+
+    def test_split_couvre_chaque_region(self, courbe):
+        from trainer import regions_iv, split_stratifie
+        r = regions_iv(*courbe)
+        train, val = split_stratifie(r, fraction=0.1)
+        assert len(np.intersect1d(train, val)) == 0
+        assert len(train) + len(val) == len(r)
+        assert set(r[val]) == {0, 1, 2}
+
+    def test_poids_equilibres(self, courbe):
+        from trainer import regions_iv, poids_regions
+        r = regions_iv(*courbe)
+        w = poids_regions(r)
+        assert w.mean() == pytest.approx(1.0)
+        totaux = [w[r == k].sum() for k in range(3)]
+        assert totaux == pytest.approx([totaux[0]] * 3)
+        w2 = poids_regions(r, {"genou": 2.0})
+        assert w2[r == 1].sum() == pytest.approx(2 * w2[r == 0].sum())
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests Profils d'entraînement
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestProfilsEntrainement:
+    """Tests pour la résolution des profils et l'historique des débits."""
+
+    def test_profil_nomme_complete_defaut(self):
+        from profils_entrainement import resoudre_profil, PROFIL_DEFAUT
+        p = resoudre_profil("bf16")
+        assert p["precision"] == "mixed_bfloat16"
+        assert p["intra_op"] == PROFIL_DEFAUT["intra_op"]
+        assert p["nom"] == "bf16"
+
+    def test_profil_inconnu(self):
+        from profils_entrainement import resoudre_profil
+        with pytest.raises(ValueError):
+            resoudre_profil("inexistant")
+        assert resoudre_profil(None) is None
+
+    def test_meilleur_profil_par_machine(self, tmp_path, monkeypatch):
+        import profils_entrainement as pe
+        monkeypatch.setattr(pe, "MODELS_DIR", str(tmp_path))
+        monkeypatch.setattr(pe, "DEBITS_PATH", str(tmp_path / "debits.json"))
+        assert pe.meilleur_profil() is None
+        assert pe.resoudre_profil("auto")["nom"] == "defaut"
+        pe.enregistrer_debit(pe.resoudre_profil("defaut"), 1000.0)
+        pe.enregistrer_debit(pe.resoudre_profil("xla"), 3000.0)
+        pe.enregistrer_debit(pe.resoudre_profil("xla"), 1000.0)   # moyenne 2000
+        assert pe.meilleur_profil() == "xla"
+        assert pe.meilleur_profil("autre_machine") is None
+        assert pe.resoudre_profil("auto")["jit_compile"] is True
+
+    def test_profil_personnalise_non_enregistre(self, tmp_path, monkeypatch):
+        import profils_entrainement as pe
+        monkeypatch.setattr(pe, "MODELS_DIR", str(tmp_path))
+        monkeypatch.setattr(pe, "DEBITS_PATH", str(tmp_path / "debits.json"))
+        pe.enregistrer_debit(pe.resoudre_profil("defaut"), 1000.0)
+        pe.enregistrer_debit(pe.resoudre_profil({"intra_op": 2}), 5000.0)
+        assert pe.meilleur_profil() == "defaut"
+        # Historique écrit avant le filtrage : le nom inconnu est ignoré
+        debits = json.loads((tmp_path / "debits.json").read_text())
+        debits[pe.cle_machine()]["personnalise"] = {"debit_echantillons_s": 9000.0}
+        (tmp_path / "debits.json").write_text(json.dumps(debits))
+        assert pe.resoudre_profil("auto")["nom"] == "defaut"
+        with pytest.raises(ValueError):
+            pe.resoudre_profil({"nom": "xla", "intra_op": 2})
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests Recherche d'hyperparamètres
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestRechercheHyperparams:
+    """Tests pour recherche_hyperparams.py (sans entraînement)."""
+
+    def test_nb_parametres_architecture_defaut(self):
+        """64-128-128-64-32 → 35 329 paramètres (cf. IV_approximator)."""
+        from recherche_hyperparams import nb_parametres
+        assert nb_parametres((64, 128, 128, 64, 32)) == 35329
+
+    def test_front_pareto_non_domine(self):
+        from recherche_hyperparams import front_pareto
+        essais = [
+            {"n_params": 100,  "val_loss": 0.05},
+            {"n_params": 500,  "val_loss": 0.08},   # dominé
+            {"n_params": 1000, "val_loss": 0.01},
+        ]
+        front = front_pareto(essais)
+        assert [e["n_params"] for e in front] == [100, 1000]
+
+    def test_configs_distinctes(self):
+        from recherche_hyperparams import _echantillonner_configs
+        configs = _echantillonner_configs(10, np.random.default_rng(0))
+        cles = {json.dumps(c, sort_keys=True) for c in configs}
+        assert len(cles) == len(configs) == 10
+
+    def test_eta_invalide(self):
+        from recherche_hyperparams import rechercher_architecture
+        for eta in (0, 1):
+            with pytest.raises(ValueError, match="eta"):
+                rechercher_architecture("1N4007", eta=eta)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests Apprentissage actif
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestApprentissageActif:
+    """Tests pour la sélection des points à simuler."""
+
+    def test_selection_points_erreur_max(self):
+        """Les points retenus sont ceux de plus forte erreur estimée."""
+        from apprentissage_actif import selectionner_points
+        V_grille = np.linspace(0.0, 1.0, 101)
+        erreur = np.zeros_like(V_grille)
+        erreur[[20, 70]] = [5.0, 10.0]
+        V_new = selectionner_points(V_grille, erreur, np.array([0.0, 1.0]), 5)
+        assert V_new.tolist() == pytest.approx([0.2, 0.7])
+
+    def test_selection_evite_points_connus(self):
+        from apprentissage_actif import selectionner_points
+        V_grille = np.linspace(0.0, 1.0, 101)
+        erreur = np.ones_like(V_grille)
+        V_new = selectionner_points(V_grille, erreur, V_grille[::2], 100)
+        assert len(V_new) == 0
+
+    def test_max_iterations_invalide(self):
+        from apprentissage_actif import entrainer_actif
+        with pytest.raises(ValueError):
+            entrainer_actif("1N4007", max_iterations=0)
+
+    def test_reference_requise(self, tmp_path, monkeypatch):
+        """Arrêt et métriques sur la simulation de référence : elle doit exister."""
+        pytest.importorskip("tensorflow")
+        import apprentissage_actif
+        import simulateur
+        import upload_spice
+        db = str(tmp_path / "actif.sqlite")
+        conn = sqlite3.connect(db)
+        upload_spice.init_db(conn)
+        conn.execute("INSERT INTO composants (nom, type, params_json) VALUES ('D1', 'diode', ?)",
+                     (json.dumps(TEST_PARAMS),))
+        conn.commit()
+        conn.close()
+        monkeypatch.setattr(apprentissage_actif, "DB_PATH", db)
+        monkeypatch.setattr(simulateur, "DB_PATH", db)
+        with pytest.raises(ValueError, match="Aucune simulation"):
+            apprentissage_actif.entrainer_actif("D1", max_iterations=1)
+
+    def test_points_actifs_separes(self, tmp_path, monkeypatch):
+        import apprentissage_actif
+        monkeypatch.setattr(apprentissage_actif, "MODELS_DIR", str(tmp_path))
+        assert apprentissage_actif.charger_points_actifs("D1") is None
+        V, I = np.array([0.0, 0.5, 0.8]), np.array([0.0, 1e-6, 2e-3])
+        chemin = apprentissage_actif.enregistrer_points_actifs("D1", V, I)
+        assert os.path.basename(chemin) == "D1_points_actifs.npz"
+        V2, I2 = apprentissage_actif.charger_points_actifs("D1")
+        assert V2.tolist() == V.tolist() and I2.tolist() == I.tolist()
+
+    def test_simuler_points_sans_persistance(self, test_db_path, composant_1n4007):
+        import simulateur
+        simulateur.DB_PATH = test_db_path
+        I = simulateur.simuler_points("1N4007", np.array([0.0, 0.7]))
+        assert abs(I[0]) < 1e-6 and I[1] > 0
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests Surrogate PWL
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestSurrogatePWL:
+    """Tests pour surrogate_pwl.py"""
+
+    @pytest.fixture
+    def courbe(self):
+        from simulateur import _simuler_diode
+        V = np.linspace(-2.0, 1.0, 600)
+        return V, _simuler_diode(TEST_PARAMS, V)
+
+    def test_table_respecte_seuil(self, courbe):
+        from surrogate_pwl import construire_table_pwl, evaluer_pwl
+        from metriques import calcul_erreur_rel, SEUIL_IA_PASS
+        V, I = courbe
+        table = construire_table_pwl(V, I)
+        assert calcul_erreur_rel(I, evaluer_pwl(table, V)) < SEUIL_IA_PASS
+        assert len(table["V_bp"]) < len(V) // 4
+
+    def test_evaluation_equivaut_interp(self, courbe):
+        """searchsorted + pente == np.interp à l'intérieur du domaine."""
+        from surrogate_pwl import construire_table_pwl, evaluer_pwl
+        V, I = courbe
+        table = construire_table_pwl(V, I)
+        V_q = np.random.default_rng(0).uniform(-2.0, 1.0, 1000)
+        attendu = np.interp(V_q, table["V_bp"], table["I_bp"])
+        assert np.allclose(evaluer_pwl(table, V_q), attendu, rtol=1e-9, atol=1e-18)
+
+    def test_generation_cpp(self, courbe, tmp_path):
+        from surrogate_pwl import construire_table_pwl, generer_cpp_pwl
+        V, I = courbe
+        table = construire_table_pwl(V, I)
+        proj = generer_cpp_pwl(table, "TEST", proj_dir=str(tmp_path))
+        cpp = open(os.path.join(proj, "firmware", "pwl_iv.cpp")).read()
+        assert f"V_BP[{len(table['V_bp'])}]" in cpp
+        assert "void pwl_iv" in cpp
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests Registre de modèles
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestRegistreModeles:
+    """Tests pour le cache LRU des modèles / scalers."""
+
+    @pytest.fixture
+    def registre(self, monkeypatch):
+        import registre_modeles as rm
+        rm.invalider()
+        monkeypatch.setitem(rm._stats, "hits", 0)
+        monkeypatch.setitem(rm._stats, "misses", 0)
+        monkeypatch.setitem(rm._stats, "evictions", 0)
+        yield rm
+        rm.invalider()
+
+    def test_reutilise_objet_charge(self, registre, tmp_path):
+        import joblib
+        from sklearn.preprocessing import MinMaxScaler
+        chemin = str(tmp_path / "scaler.pkl")
+        joblib.dump(MinMaxScaler().fit([[0.0], [2.0]]), chemin)
+        a = registre.charger_scaler(chemin)
+        b = registre.charger_scaler(chemin)
+        assert a is b
+        assert registre.statistiques()["hits"] == 1
+
+    def test_recharge_si_fichier_modifie(self, registre, tmp_path):
+        chemin = tmp_path / "f.txt"
+        chemin.write_text("v1")
+        lire = lambda p: open(p).read()
+        assert registre.obtenir(str(chemin), lire) == "v1"
+        chemin.write_text("v2 plus long")
+        assert registre.obtenir(str(chemin), lire) == "v2 plus long"
+
+    def test_eviction_lru(self, registre, tmp_path, monkeypatch):
+        monkeypatch.setattr(registre, "MAX_ENTREES", 2)
+        chemins = []
+        for k in range(3):
+            f = tmp_path / f"{k}.txt"
+            f.write_text(str(k))
+            chemins.append(str(f))
+        lire = lambda p: open(p).read()
+        registre.obtenir(chemins[0], lire)
+        registre.obtenir(chemins[1], lire)
+        registre.obtenir(chemins[0], lire)   # 0 redevient le plus récent
+        registre.obtenir(chemins[2], lire)   # évince 1
+        stats = registre.statistiques()
+        assert stats["entrees"] == 2 and stats["evictions"] == 1
+        registre.obtenir(chemins[0], lire)
+        assert registre.statistiques()["hits"] == 2
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests Prédiction par lots
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestPrediction:
+    """Tests pour le repliement des scalers et la propagation NumPy."""
+
+    def test_affine_minmax(self):
+        from sklearn.preprocessing import MinMaxScaler
+        from prediction import _affine
+        scaler = MinMaxScaler().fit([[-5.0], [1.2]])
+        a, b = _affine(scaler.transform)
+        x = np.array([-3.0, 0.0, 1.0])
+        np.testing.assert_allclose(a * x + b, scaler.transform(x.reshape(-1, 1)).ravel())
+
+    def test_affine_refuse_non_lineaire(self):
+        from prediction import _affine
+        with pytest.raises(ValueError):
+            _affine(lambda x: x ** 2)
+
+    def test_propagation_par_blocs(self):
+        """Réseau relu connu : sortie exacte, indépendante du découpage."""
+        from prediction import _propager
+        reseau = [
+            (np.array([[1.0, -1.0]], dtype=np.float32), np.zeros(2, np.float32), "relu"),
+            (np.array([[2.0], [3.0]], dtype=np.float32), np.array([0.5], np.float32), "linear"),
+        ]
+        V = np.array([-2.0, 0.0, 1.5])
+        np.testing.assert_allclose(_propager(reseau, V), [6.5, 0.5, 3.5])
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests Entraînement informé par la physique
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestEntrainementPhysique:
+    """Tests pour le résidu diode et le sous-échantillonnage."""
+
+    def test_residu_nul_sur_solution(self):
+        from simulateur import _simuler_diode
+        from entrainement_physique import residu_diode
+        V = np.linspace(-2.0, 1.0, 50)
+        I = _simuler_diode(TEST_PARAMS, V)
+        assert np.max(np.abs(residu_diode(V, I, TEST_PARAMS, 1e-3))) < 1e-6
+
+    def test_residu_borne_loin_solution(self):
+        from entrainement_physique import residu_diode
+        V = np.array([0.8, 0.8])
+        r = residu_diode(V, np.array([1e3, -1e3]), TEST_PARAMS, 1e-3)
+        assert np.all(np.abs(r) <= 1.0)
+        assert r[0] > 0 > r[1]
+
+    def test_sous_echantillon_garde_bornes(self):
+        from entrainement_physique import _sous_echantillonner
+        V = np.linspace(-5.0, 1.2, 2000)
+        V_s, I_s = _sous_echantillonner(V, V ** 2, 30)
+        assert len(V_s) == 30
+        assert V_s[0] == V[0] and V_s[-1] == V[-1]
+        np.testing.assert_allclose(I_s, V_s ** 2)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests Télémétrie d'entraînement
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestTelemetrie:
+    """Tests pour le stockage des époques et la détection de régression."""
+
+    @pytest.fixture
+    def telemetrie(self, test_db_path, composant_1n4007, monkeypatch):
+        import telemetrie
+        monkeypatch.setattr(telemetrie, "DB_PATH", test_db_path)
+        return telemetrie
+
+    def _executer(self, tm, debit: float, n_epochs: int = 3) -> int:
+        run_id = tm.demarrer_entrainement("1N4007", {"epochs": n_epochs})
+        for e in range(n_epochs):
+            tm.enregistrer_epoch(run_id, e, {"loss": 1.0 / (e + 1), "val_loss": 2.0 / (e + 1),
+                                             "val_loss_genou": 0.5},
+                                 1e-3, 1000.0 / debit, debit)
+        tm.terminer_entrainement(run_id)
+        return run_id
+
+    def test_tables_creees_par_init_db(self, test_db_path):
+        conn = sqlite3.connect(test_db_path)
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        conn.close()
+        assert {"entrainements", "telemetrie_epochs"}.issubset(tables)
+
+    def test_courbes_et_resume(self, telemetrie):
+        run_id = self._executer(telemetrie, debit=5000.0)
+        courbes = telemetrie.charger_epochs(run_id)
+        np.testing.assert_allclose(courbes["val_loss"], [2.0, 1.0, 2.0 / 3])
+        run = next(r for r in telemetrie.lister_entrainements("1N4007") if r["id"] == run_id)
+        assert run["statut"] == "termine" and run["epochs"] == 3
+        assert run["meilleure_val"] == pytest.approx(2.0 / 3)
+        assert run["echantillons_s"] == pytest.approx(5000.0)
+
+    def test_composant_inconnu(self, telemetrie):
+        assert telemetrie.demarrer_entrainement("INEXISTANT") is None
+
+    def test_fin_entrainement_base_verrouillee(self, telemetrie, monkeypatch):
+        """Une base verrouillée en fin de fit() n'interrompt pas l'entraînement."""
+        pytest.importorskip("tensorflow")
+        callback = telemetrie.creer_callback_telemetrie("1N4007", 100)
+        callback.run_id = 1
+
+        def verrouillee(*args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+
+        monkeypatch.setattr(telemetrie, "terminer_entrainement", verrouillee)
+        callback.on_train_end()
+
+    def test_detection_regression(self, telemetrie):
+        for _ in range(3):
+            self._executer(telemetrie, debit=5000.0)
+        self._executer(telemetrie, debit=2000.0)
+        res = telemetrie.detecter_regression("1N4007")
+        assert res["regression"] and res["ratio"] == pytest.approx(0.4)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests Émulateur virgule fixe
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestVirguleFixe:
+    """Tests pour l'émulation bit-exacte ap_fixed (sans TensorFlow)."""
+
+    def test_parse_type(self):
+        from virgule_fixe import parse_type
+        t = parse_type("ap_fixed<16,6,AP_RND,AP_SAT>")
+        assert (t["W"], t["I"], t["F"], t["signe"]) == (16, 6, 10, True)
+        assert (t["quant"], t["debordement"]) == ("AP_RND", "AP_SAT")
+        assert parse_type("ap_uint<8>")["F"] == 0
+        assert parse_type("float") is None
+        with pytest.raises(ValueError):
+            parse_type("ap_fixed<16>")
+
+    def test_modes_quantification(self):
+        from virgule_fixe import quantifier
+        x = [0.5, -0.5, 1.5, 2.5, -2.5]
+        np.testing.assert_array_equal(quantifier(x, "ap_fixed<8,8>"), [0, -1, 1, 2, -3])
+        np.testing.assert_array_equal(quantifier(x, "ap_fixed<8,8,AP_TRN_ZERO>"), [0, 0, 1, 2, -2])
+        np.testing.assert_array_equal(quantifier(x, "ap_fixed<8,8,AP_RND>"), [1, 0, 2, 3, -2])
+        np.testing.assert_array_equal(quantifier(x, "ap_fixed<8,8,AP_RND_ZERO>"), [0, 0, 1, 2, -2])
+        np.testing.assert_array_equal(quantifier(x, "ap_fixed<8,8,AP_RND_INF>"), [1, -1, 2, 3, -3])
+        np.testing.assert_array_equal(quantifier(x, "ap_fixed<8,8,AP_RND_CONV>"), [0, 0, 2, 2, -2])
+        assert quantifier(1.3, "ap_fixed<6,3>") == 1.25
+
+    def test_modes_debordement(self):
+        from virgule_fixe import quantifier
+        x = [8.0, -9.0, 20.0]
+        np.testing.assert_array_equal(quantifier(x, "ap_fixed<4,4>"), [-8, 7, 4])
+        np.testing.assert_array_equal(quantifier(x, "ap_fixed<4,4,AP_TRN,AP_SAT>"), [7, -8, 7])
+        np.testing.assert_array_equal(quantifier(x, "ap_fixed<4,4,AP_TRN,AP_SAT_ZERO>"), [0, 0, 0])
+        np.testing.assert_array_equal(quantifier(x, "ap_fixed<4,4,AP_TRN,AP_SAT_SYM>"), [7, -7, 7])
+        np.testing.assert_array_equal(quantifier([-1.0, 20.0], "ap_ufixed<4,4,AP_TRN,AP_SAT>"), [0, 15])
+
+    def test_reseau_calcul_manuel(self):
+        """Accumulateur <6,3> TRN : chaque produit est tronqué au pas 1/8."""
+        from virgule_fixe import emuler_reseau
+        couches = [
+            {"W": np.array([[0.75, -0.5]]), "b": np.array([0.1, 0.0]), "activation": "relu"},
+            {"W": np.array([[0.5], [1.0]]), "b": np.array([0.0]), "activation": "linear"},
+        ]
+        types = {"data": "ap_fixed<6,3>", "weight": "ap_fixed<6,3>",
+                 "accum": "ap_fixed<6,3>", "result": "ap_fixed<6,3>"}
+        y, sorties = emuler_reseau(np.array([0.625]), couches, types, intermediaires=True)
+        # acc1 = 0 (0.1 tronqué) + floor8(0.46875)=0.375 ; acc2 = floor8(-0.3125) → relu 0
+        np.testing.assert_array_equal(sorties[0], [[0.375, 0.0]])
+        # 0.5 × 0.375 = 0.1875 → 0.125
+        np.testing.assert_array_equal(y, [[0.125]])
+
+    def test_vectorise_egal_boucle(self, monkeypatch):
+        import virgule_fixe
+        rng = np.random.default_rng(0)
+        x = virgule_fixe.quantifier(rng.uniform(-1, 1, (50, 16)), "ap_fixed<10,2>")
+        W, b = rng.normal(0, 0.5, (16, 8)), rng.normal(0, 0.1, 8)
+        types = virgule_fixe._types_couche({"accum": "ap_fixed<10,3,AP_RND>",
+                                             "weight": "ap_fixed<8,2>"}, None)
+        vect = virgule_fixe.emuler_dense(x, W, b, "relu", types)
+        monkeypatch.setattr(virgule_fixe, "_INVARIANTS_TRANSLATION", ())
+        boucle = virgule_fixe.emuler_dense(x, W, b, "relu", types)
+        np.testing.assert_array_equal(vect, boucle)
+
+    def test_surcharge_par_couche(self):
+        from virgule_fixe import emuler_reseau
+        couches = [{"W": np.array([[1.0]]), "b": np.array([0.0]), "activation": "linear"}] * 2
+        y = emuler_reseau(np.array([0.3]), couches, {"data": "float", "weight": "float",
+                                                    "accum": "float", "result": "float"},
+                          types_par_couche=[None, {"result": "ap_fixed<8,4>"}])
+        assert y[0, 0] == 0.25
+
+    def test_largeur_hors_mantisse_refusee(self):
+        """Produit 40 × 40 bits : non représentable exactement en float64."""
+        import virgule_fixe
+        couche = [{"W": np.ones((4, 2)), "b": np.zeros(2), "activation": "linear"}]
+        with pytest.raises(ValueError, match="non exacte"):
+            virgule_fixe.emuler_reseau(np.ones((3, 4)), couche, {k: "ap_fixed<40,8>" for k in
+                                                                 ("data", "weight", "accum", "result")})
+        types = virgule_fixe._types_couche({k: "ap_fixed<26,8>" for k in ("data", "weight", "accum")}, None)
+        assert virgule_fixe._bits_calcul(types, 4, vectorise=True) <= virgule_fixe.BITS_MANTISSE
+
+    def test_sorties_cachees_type_data_suivant(self):
+        """layerN_out cachés en data_t de la couche suivante, result_t en sortie."""
+        from virgule_fixe import emuler_reseau
+        couches = [{"W": np.array([[1.0]]), "b": np.array([0.0]), "activation": "linear"}] * 3
+        types = {"data": "float", "weight": "float", "accum": "float",
+                 "result": "ap_fixed<4,2>"}
+        y, sorties = emuler_reseau(np.array([0.4]), couches, types, intermediaires=True,
+                                   types_par_couche=[None, {"data": "ap_fixed<8,4>"}, None])
+        # couche 1 → data de la couche 2 (pas 1/16) ; couche 2 → data float de
+        # la couche 3 ; result (pas 1/4) uniquement pour la dernière
+        assert sorties[0][0, 0] == 0.375
+        assert sorties[1][0, 0] == 0.375
+        np.testing.assert_array_equal(y, [[0.25]])
+        y = emuler_reseau(np.array([0.4]), couches[:2], types,
+                          types_par_couche=[None, {"data": "ap_fixed<8,4>",
+                                                   "result": "float"}])
+        assert y[0, 0] == 0.375
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests Balayage de précision
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestBalayagePrecision:
+    """Tests pour l'exploration ap_fixed<W,I> (émulation, sans TensorFlow)."""
+
+    @pytest.fixture
+    def reseau(self):
+        rng = np.random.default_rng(1)
+        couches = [
+            {"nom": "dense",   "W": rng.normal(0, 0.8, (1, 8)), "b": rng.normal(0, 0.1, 8),
+             "activation": "relu"},
+            {"nom": "dense_1", "W": rng.normal(0, 0.5, (8, 1)), "b": np.array([0.5]),
+             "activation": "linear"},
+        ]
+        x = np.linspace(0.0, 1.0, 200).reshape(-1, 1)
+        return couches, x
+
+    def test_bits_entiers(self):
+        from balayage_precision import _bits_entiers
+        assert _bits_entiers(0.3) == 1
+        assert _bits_entiers(1.0) == 2
+        assert _bits_entiers(5.0) == 4
+
+    def test_dsp_par_multiplication(self):
+        from balayage_precision import _dsp_par_multiplication
+        assert _dsp_par_multiplication(8, 8) == 0
+        assert _dsp_par_multiplication(16, 16) == 1
+        assert _dsp_par_multiplication(18, 30) == 2
+
+    def test_poids_nuls_sans_multiplieur(self):
+        from balayage_precision import estimer_ressources
+        couches = [{"W": np.array([[0.001, 0.5]]), "b": np.zeros(2), "activation": "linear"}]
+        types = [{t: "ap_fixed<16,2>" for t in ("data", "weight", "bias", "accum", "result")}]
+        assert estimer_ressources(couches, types)["estimated_dsp"] == 2
+        types = [{**types[0], "weight": "ap_fixed<8,2>", "data": "ap_fixed<8,2>"}]   # 0.001 → 0
+        res = estimer_ressources(couches, types)
+        assert res["estimated_dsp"] == 0 and res["estimated_lut_mult"] == 8 * 8
+
+    def test_optimal_le_moins_couteux(self, reseau):
+        from balayage_precision import _cout, balayer
+        from virgule_fixe import emuler_reseau
+        couches, x = reseau
+        reference = emuler_reseau(x, couches, {t: "float" for t in
+                                               ("data", "weight", "accum", "result")})
+        res = balayer(couches, x, reference, largeurs=(6, 10, 14, 18), n_processus=1)
+        optimal = res["optimal"]
+        assert optimal["passe"]
+        assert all(_cout(optimal) <= _cout(r) for r in res["configurations"] if r["passe"])
+        assert res["optimal_uniforme"]["precision"].startswith("ap_fixed<")
+        noms = [r["nom"] for r in res["configurations"]]
+        assert len(noms) == len(set(noms))
+        front = [r for r in res["configurations"] if r["nom"] in res["front_pareto"]]
+        erreurs = [r["E_rel_%"] for r in sorted(front, key=_cout)]
+        assert erreurs == sorted(erreurs, reverse=True)
+
+    def test_aucune_config_sous_seuil(self, reseau):
+        from balayage_precision import balayer
+        couches, x = reseau
+        res = balayer(couches, x, np.full(len(x), 1e3), largeurs=(8,), n_processus=1)
+        assert res["optimal"] is None and res["optimal_uniforme"] is None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests Quantification post-entraînement
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestQuantificationPTQ:
+    """Tests pour la quantification par canal et la calibration des activations."""
+
+    def test_parse_quant_type(self):
+        from quantification_ptq import parse_quant_type
+        assert parse_quant_type("ptq6") == (6, 6, "mse")
+        assert parse_quant_type("ptq6a8-percentile") == (6, 8, "percentile")
+        assert parse_quant_type("int8") is None
+        with pytest.raises(ValueError):
+            parse_quant_type("ptq8-median")
+
+    def test_echelle_par_canal(self):
+        from quantification_ptq import quantifier_poids_canal
+        W = np.array([[0.01, 2.0], [-0.02, 1.0]])
+        W_int, echelles = quantifier_poids_canal(W, 8)
+        np.testing.assert_array_equal(np.abs(W_int).max(axis=0), [127, 127])
+        assert np.all(np.abs(W_int * echelles - W) <= echelles / 2)
+
+    def test_par_canal_meilleur_que_par_tenseur(self):
+        from quantification_ptq import quantifier_par_tenseur, quantifier_poids_canal
+        rng = np.random.default_rng(0)
+        W = rng.normal(0, 1, (32, 8)) * np.logspace(-3, 0, 8)
+        couche = {"W": W, "b": np.zeros(8), "activation": "linear"}
+        err_tenseur = np.abs(quantifier_par_tenseur([couche], 6)[0]["W"] - W).max(axis=0)
+        err_canal = np.abs(np.multiply(*quantifier_poids_canal(W, 6)) - W).max(axis=0)
+        assert np.all(err_canal <= err_tenseur + 1e-15)
+        assert err_canal[0] < err_tenseur[0] / 10
+
+    def test_calibration_coupe_les_valeurs_aberrantes(self):
+        from quantification_ptq import calibrer_plage
+        rng = np.random.default_rng(0)
+        v = np.abs(rng.normal(0, 1, 100_000))
+        v[0] = 20.0
+        assert calibrer_plage(v, 6, "max") == 20.0
+        assert calibrer_plage(v, 6, "percentile") < 5.0
+        assert calibrer_plage(v, 6, "mse", signe=False) < 10.0
+
+    def test_inference_haute_precision(self):
+        from quantification_ptq import construire, inferer
+        rng = np.random.default_rng(2)
+        couches = [
+            {"W": rng.normal(0, 1, (1, 16)), "b": rng.normal(0, 0.1, 16), "activation": "relu"},
+            {"W": rng.normal(0, 1, (16, 1)), "b": np.array([0.3]), "activation": "linear"},
+        ]
+        x = np.linspace(0, 1, 100).reshape(-1, 1)
+        attendu = np.maximum(x @ couches[0]["W"] + couches[0]["b"], 0) @ couches[1]["W"] + couches[1]["b"]
+        y = inferer(construire(couches, x, 16, "max"), x)
+        np.testing.assert_allclose(y, attendu, atol=1e-3)
+
+    def test_biais_echelle_accumulateur(self):
+        """Un biais grand devant les poids n'est ni saturé ni arrondi à l'échelle des poids."""
+        from quantification_ptq import construire, inferer
+        couches = [{"W": np.array([[0.01]]), "b": np.array([5.0]), "activation": "linear"}]
+        x = np.array([[0.0], [1.0]])
+        reseau = construire(couches, x, 4, "max")
+        np.testing.assert_allclose(inferer(reseau, x).ravel(), [5.0, 5.01], atol=1e-6)
+
+
+class TestQuantificationQAT:
+    """Tests pour la sélection du modèle QAT et les types supportés."""
+
+    def _modeles(self, tmp_path, monkeypatch, quant_type):
+        import hls_converter
+        monkeypatch.setattr(hls_converter, "MODELS_DIR", str(tmp_path))
+        for suffixe in ("", "_qat"):
+            (tmp_path / f"D1_model{suffixe}.keras").write_bytes(b"")
+        os.utime(tmp_path / "D1_model.keras", (1, 1))
+        (tmp_path / "D1_model_qat.json").write_text(json.dumps({"quant_type": quant_type}))
+        return hls_converter.chemin_modele_hls
+
+    def test_auto_choisit_qat_pour_son_type(self, tmp_path, monkeypatch):
+        chemin_modele_hls = self._modeles(tmp_path, monkeypatch, "ap_fixed<16,6>")
+        assert chemin_modele_hls("D1", "auto", "ap_fixed<16,6>").endswith("D1_model_qat.keras")
+        assert chemin_modele_hls("D1", "auto", "int8").endswith("D1_model.keras")
+        assert chemin_modele_hls("D1", "auto").endswith("D1_model.keras")
+
+    def test_qat_perime_ignore(self, tmp_path, monkeypatch):
+        chemin_modele_hls = self._modeles(tmp_path, monkeypatch, "ptq6")
+        os.utime(tmp_path / "D1_model_qat.keras", (0, 0))
+        assert chemin_modele_hls("D1", "auto", "ptq6").endswith("D1_model.keras")
+        assert chemin_modele_hls("D1", "qat").endswith("D1_model_qat.keras")
+
+    def test_type_non_emulable_refuse(self):
+        from quantification_qat import sortie_hls
+        with pytest.raises(ValueError):
+            sortie_hls([], "int8", np.zeros((2, 1)))
+
+    @pytest.mark.parametrize("quant", ["AP_TRN", "AP_TRN_ZERO", "AP_RND", "AP_RND_ZERO",
+                                       "AP_RND_INF", "AP_RND_MIN_INF", "AP_RND_CONV"])
+    @pytest.mark.parametrize("debordement", ["AP_WRAP", "AP_SAT", "AP_SAT_ZERO", "AP_SAT_SYM"])
+    def test_fausse_quantification_egale_emulateur(self, quant, debordement):
+        tf = pytest.importorskip("tensorflow")
+        from quantification_qat import _fq_fixe
+        from virgule_fixe import parse_type, quantifier
+        t = f"ap_fixed<6,3,{quant},{debordement}>"
+        # Demi-pas (égalités d'arrondi), bornes et valeurs hors plage
+        x = np.concatenate([np.arange(-10.0, 10.0, 1 / 16),
+                            np.random.default_rng(0).uniform(-12, 12, 200)])
+        cast, _ = _fq_fixe(tf, parse_type(t))
+        np.testing.assert_array_equal(cast(tf.constant(x, tf.float64)).numpy(), quantifier(x, t))
+
+    def test_propagation_egale_emulateur(self):
+        tf = pytest.importorskip("tensorflow")
+        from quantification_qat import _propagation_fixe
+        from virgule_fixe import emuler_reseau, parse_type
+        rng = np.random.default_rng(1)
+        t = "ap_fixed<10,3,AP_TRN,AP_WRAP>"
+        tailles = [1, 8, 8, 1]
+        couches = [{"W": rng.normal(0, 0.8, (n_in, n_out)), "b": rng.normal(0, 0.3, n_out),
+                    "activation": "relu" if k < 2 else "linear"}
+                   for k, (n_in, n_out) in enumerate(zip(tailles[:-1], tailles[1:]))]
+        x = rng.uniform(-2, 2, (64, 1))
+        propager = _propagation_fixe(tf, parse_type(t))
+        y = propager(tf.constant(x, tf.float64), [(c["W"], c["b"]) for c in couches],
+                     [c["activation"] for c in couches]).numpy()
+        np.testing.assert_array_equal(
+            y, emuler_reseau(x, couches, {k: t for k in ("data", "weight", "accum", "result")}))
+
+
+class TestElagage:
+    """Tests pour l'élagage par magnitude et le décompte des MAC."""
+
+    def test_masque_magnitude(self):
+        from elagage import masque_magnitude
+        W = np.array([[0.1, -2.0], [0.5, -0.01]])
+        np.testing.assert_array_equal(masque_magnitude(W, 0.5), [[False, True], [True, False]])
+        assert masque_magnitude(W, 0.0).all()
+
+    def test_calendrier_croissant(self):
+        from elagage import calendrier
+        paliers = calendrier(0.8, 4)
+        assert np.all(np.diff(paliers) > 0)
+        assert paliers[-1] == pytest.approx(0.8)
+
+    def test_compter_macs(self):
+        from elagage import compter_macs, masque_magnitude
+        W = np.random.default_rng(0).normal(size=(16, 8))
+        macs = compter_macs([{"W": W * masque_magnitude(W, 0.75)}, {"W": np.ones((8, 1))}])
+        assert macs["macs"] == 136
+        assert macs["macs_non_nuls"] == 32 + 8
+
+    def test_auto_prend_le_derive_le_plus_recent(self, tmp_path, monkeypatch):
+        import hls_converter
+        monkeypatch.setattr(hls_converter, "MODELS_DIR", str(tmp_path))
+        for suffixe, t in (("", 1), ("_compact", 3), ("_elague", 2)):
+            (tmp_path / f"D1_model{suffixe}.keras").write_bytes(b"")
+            os.utime(tmp_path / f"D1_model{suffixe}.keras", (t, t))
+        assert hls_converter.chemin_modele_hls("D1").endswith("D1_model_compact.keras")
+        os.utime(tmp_path / "D1_model_elague.keras", (4, 4))
+        assert hls_converter.chemin_modele_hls("D1").endswith("D1_model_elague.keras")
+
+    def test_cache_hls_lie_au_modele(self, tmp_path, monkeypatch):
+        import hls_converter
+        import upload_spice
+        db = str(tmp_path / "cache.sqlite")
+        monkeypatch.setattr(hls_converter, "DB_PATH", db)
+        monkeypatch.setattr(hls_converter, "MODELS_DIR", str(tmp_path))
+        (tmp_path / "D1_model.keras").write_bytes(b"")
+        os.utime(tmp_path / "D1_model.keras", (1, 1))
+        config = hls_converter._config_conversion(str(tmp_path / "D1_model.keras"), 1, "Latency", False)
+        conn = sqlite3.connect(db)
+        upload_spice.init_db(conn)
+        conn.execute("INSERT INTO composants (nom, type, params_json) VALUES ('D1', 'diode', '{}')")
+        conn.execute("INSERT INTO modeles_hls (composant_id, quant_type, V_hls_json, I_hls_json, config_json) "
+                     "VALUES (1, 'int8', '[0.0]', '[1.0]', ?)", (json.dumps(config),))
+        conn.commit()
+        conn.close()
+        V, I = hls_converter.convertir_hls("D1", "int8")
+        np.testing.assert_array_equal(I, [1.0])
+        # Autres options firmware, puis modèle compact plus récent : résultat recalculé
+        with pytest.raises(ValueError, match="Aucune simulation"):
+            hls_converter.convertir_hls("D1", "int8", reuse_factor=4)
+        (tmp_path / "D1_model_compact.keras").write_bytes(b"")
+        with pytest.raises(ValueError, match="Aucune simulation"):
+            hls_converter.convertir_hls("D1", "int8")
+
+
+class TestExplorationConception:
+    """Tests pour l'exploration reuse factor / stratégie / horloge."""
+
+    COUCHE = {"name": "d", "in": 64, "out": 128, "macs": 8192, "macs_dense": 8192, "weights": 8320}
+
+    def test_reuse_factors_valides(self):
+        from digital_hls_service import valid_reuse_factors, _layer_reuse_factor
+        assert valid_reuse_factors(3, 4) == (1, 2, 3, 4, 6, 12)
+        assert _layer_reuse_factor({"name": "d", "in": 3, "out": 4}, 5) == 4
+        assert _layer_reuse_factor({"name": "d", "in": 3, "out": 4}, {"d": 12}) == 12
+
+    def test_reuse_divise_multiplieurs(self):
+        from digital_hls_service import _estimate_layer
+        r1 = _estimate_layer(self.COUCHE, 1, "Latency", 16, 10.0)
+        r4 = _estimate_layer(self.COUCHE, 4, "Latency", 16, 10.0)
+        assert r1["dsp"] == 4 * r4["dsp"] == 8192
+        assert r4["ii_cycles"] == 4 and r4["latency_cycles"] > r1["latency_cycles"]
+
+    def test_strategie_resource_en_bram(self):
+        from digital_hls_service import _estimate_layer
+        creuse = dict(self.COUCHE, macs=2048)
+        latence = _estimate_layer(creuse, 64, "Latency", 16, 5.0)
+        ressource = _estimate_layer(creuse, 64, "Resource", 16, 5.0)
+        assert latence["bram18"] == 0 and ressource["bram18"] > 0
+        # Resource ne profite pas des poids nuls
+        assert ressource["dsp"] == 4 * latence["dsp"]
+        with pytest.raises(ValueError):
+            _estimate_layer(creuse, 1, "Dataflow", 16, 5.0)
+
+    def test_io_stream_dataflow(self):
+        from digital_hls_service import STREAM_IO_CYCLES, _estimate_design, _estimate_layer
+        couches = [dict(self.COUCHE, name="d1"), dict(self.COUCHE, name="d2", **{"in": 128, "out": 8})]
+        parallele = _estimate_design(couches, 16, 5.0, 8, "Resource")
+        flux = _estimate_design(couches, 16, 5.0, 8, "Resource", io_type="io_stream")
+        assert flux["ii_cycles"] == parallele["ii_cycles"] == 8
+        assert flux["latency_cycles"] == parallele["latency_cycles"] + 2 * STREAM_IO_CYCLES
+        # FIFO de sortie (SRL) sauf pour la dernière couche
+        assert [c["fifo_lut"] for c in flux["layers"]] == [128 * 16, 0]
+        assert flux["lut"] == parallele["lut"] + 128 * 16
+        with pytest.raises(ValueError):
+            _estimate_layer(self.COUCHE, 1, "Latency", 16, 5.0, io_type="io_axi")
+
+    def test_couche_creuse_plafond_deroulage(self, monkeypatch):
+        import poids_hls
+        from digital_hls_service import _dense_body
+        W = np.zeros((8, 4))
+        W[::2] = 1.0
+        corps = "\n".join(_dense_body(1, W, "ap_fixed<16,6>", 1, "Latency", "x", "y", True))
+        assert "sparse layer: 16/32 MACs" in corps
+        assert corps.count("acc += weight1[") == 16 and "for (int i" not in corps
+        monkeypatch.setattr(poids_hls, "MAC_DEROULES_MAX", 15)
+        corps = "\n".join(_dense_body(1, W, "ap_fixed<16,6>", 1, "Latency", "x", "y", True))
+        assert corps.count("acc += weight1[") == 1
+        assert "if (weight1[i][j] != 0) acc += weight1[i][j] * x[i];" in corps
+
+    def test_front_pareto(self):
+        from digital_hls_service import pareto_front
+        points = [
+            {"latency_ns": 10, "dsp": 100},
+            {"latency_ns": 20, "dsp": 50},
+            {"latency_ns": 30, "dsp": 60},
+            {"latency_ns": 10, "dsp": 120},
+        ]
+        front = pareto_front(points, keys=("latency_ns", "dsp"))
+        assert [(p["latency_ns"], p["dsp"]) for p in front] == [(10, 100), (20, 50)]
+
+
+class TestFpgaParts:
+    """Tests pour la table de capacités FPGA et le modèle DSP par largeur."""
+
+    def test_resolution_reference(self):
+        from fpga_parts import resolve_part
+        assert resolve_part("xc7a35tcpg236-1")["dsp"] == 90
+        assert resolve_part("XCZU9EG-FFVB1156-2-E")["name"] == "xczu9eg"
+        assert resolve_part("ep4ce22") is None
+
+    def test_depassement_signale(self):
+        from fpga_parts import utilization
+        usage = utilization({"dsp": 120, "bram18": 10, "lut": 18000, "ff": 100}, "xc7a35tcpg236-1", 10.0)
+        assert not usage["fits"]
+        assert usage["resources"]["dsp"]["over"]
+        assert not usage["resources"]["lut"]["over"]
+        assert len(usage["warnings"]) == 2   # DSP dépassé, LUT > 80 %
+        assert utilization({"dsp": 10}, "xc7a35t", 1.0)["fits"] is False   # 1 GHz > fmax
+
+    def test_dsp_par_largeur(self):
+        from digital_hls_service import dsp_per_multiplier
+        assert dsp_per_multiplier(8, "DSP48E2") == 0.5
+        assert dsp_per_multiplier(8, "DSP48E1") == 1
+        assert dsp_per_multiplier(16) == 1
+        assert dsp_per_multiplier(24, "DSP48E1") == 2
+
+
+class TestBancDeTest:
+    """Tests pour le banc de test C++ et le shim ap_fixed (g++/clang++ requis pour la compilation)."""
+
+    @staticmethod
+    def _projet(dossier, type_entree, type_sortie):
+        os.makedirs(os.path.join(dossier, "firmware"))
+        os.makedirs(os.path.join(dossier, "tb_data"))
+        with open(os.path.join(dossier, "firmware", "myproject.h"), "w") as f:
+            f.write('#include "ap_fixed.h"\n#define N_INPUTS 1\n#define N_OUTPUTS 1\n'
+                    f"typedef {type_entree} data_t;\ntypedef {type_sortie} result_t;\n"
+                    "void myproject(data_t input[N_INPUTS], result_t output[N_OUTPUTS]);\n")
+        with open(os.path.join(dossier, "firmware", "myproject.cpp"), "w") as f:
+            f.write('#include "myproject.h"\n'
+                    "void myproject(data_t input[N_INPUTS], result_t output[N_OUTPUTS]) {\n"
+                    "    output[0] = input[0] * 3;\n}\n")
+        x = np.linspace(-6.0, 6.0, 97)
+        np.savetxt(os.path.join(dossier, "tb_data", "tb_input_features.dat"), x, fmt="%.17g")
+        return x
+
+    @pytest.mark.skipif(shutil.which("g++") is None and shutil.which("clang++") is None,
+                        reason="compilateur C++ absent")
+    @pytest.mark.parametrize("type_entree,type_sortie", [
+        ("ap_fixed<8,3,AP_RND,AP_SAT>", "ap_fixed<6,2>"),
+        ("ap_fixed<10,4,AP_RND_CONV,AP_WRAP>", "ap_ufixed<8,4,AP_RND_ZERO,AP_SAT_SYM>"),
+        ("ap_fixed<12,5,AP_TRN_ZERO,AP_SAT_ZERO>", "ap_fixed<9,3,AP_RND_MIN_INF,AP_SAT>"),
+    ])
+    def test_shim_identique_virgule_fixe(self, type_entree, type_sortie):
+        from banc_de_test import executer_csim
+        from virgule_fixe import quantifier
+        dossier = tempfile.mkdtemp()
+        try:
+            x = self._projet(dossier, type_entree, type_sortie)
+            attendu = quantifier(quantifier(x, type_entree) * 3, type_sortie)
+            res = executer_csim(dossier, attendu[:, None])
+            assert res["statut"] == "ok", res.get("erreur")
+            assert res["echantillons"] == len(x)
+            assert res["debit_inferences_s"] > 0
+            assert res["bit_exact"], res
+        finally:
+            shutil.rmtree(dossier)
+
+    @pytest.mark.skipif(shutil.which("g++") is None and shutil.which("clang++") is None,
+                        reason="compilateur C++ absent")
+    def test_flux_io_stream(self):
+        from banc_de_test import executer_csim
+        from virgule_fixe import quantifier
+        dossier = tempfile.mkdtemp()
+        try:
+            x = self._projet(dossier, "ap_fixed<8,3,AP_RND,AP_SAT>", "ap_fixed<10,5>")
+            # Deux processus DATAFLOW reliés par un hls::stream de paquets
+            with open(os.path.join(dossier, "firmware", "myproject.h"), "w") as f:
+                f.write('#include "ap_fixed.h"\n#include "hls_stream.h"\n#define IO_STREAM\n'
+                        "#define N_INPUTS 1\n#define N_OUTPUTS 1\n"
+                        "typedef ap_fixed<8,3,AP_RND,AP_SAT> data_t;\ntypedef ap_fixed<10,5> result_t;\n"
+                        "template <typename T, int N> struct array_t { T data[N]; };\n"
+                        "typedef array_t<data_t, 1> input_t;\ntypedef array_t<result_t, 1> output_t;\n"
+                        "void myproject(hls::stream<input_t>& input, hls::stream<output_t>& output);\n")
+            with open(os.path.join(dossier, "firmware", "myproject.cpp"), "w") as f:
+                f.write('#include "myproject.h"\n'
+                        "static void triple(hls::stream<input_t>& in, hls::stream<output_t>& out) {\n"
+                        "    output_t y; y.data[0] = in.read().data[0] * 3; out.write(y);\n}\n"
+                        "static void plus_un(hls::stream<output_t>& in, hls::stream<output_t>& out) {\n"
+                        "    output_t y; y.data[0] = in.read().data[0] + 1; out.write(y);\n}\n"
+                        "void myproject(hls::stream<input_t>& input, hls::stream<output_t>& output) {\n"
+                        "#pragma HLS DATAFLOW\n"
+                        '    hls::stream<output_t> milieu("milieu");\n'
+                        "    triple(input, milieu);\n    plus_un(milieu, output);\n}\n")
+            triple = quantifier(quantifier(x, "ap_fixed<8,3,AP_RND,AP_SAT>") * 3, "ap_fixed<10,5>")
+            attendu = quantifier(triple + 1, "ap_fixed<10,5>")
+            res = executer_csim(dossier, attendu[:, None])
+            assert res["statut"] == "ok", res.get("erreur")
+            assert res["bit_exact"], res
+        finally:
+            shutil.rmtree(dossier)
+
+    def test_banc_de_test_ecrit(self):
+        from banc_de_test import ecrire_banc_de_test
+        dossier = tempfile.mkdtemp()
+        try:
+            chemin = ecrire_banc_de_test(dossier)
+            assert os.path.basename(chemin) == "myproject_test.cpp"
+            for fichier in ("ap_fixed.h", "ap_int.h", "hls_stream.h"):
+                assert os.path.exists(os.path.join(dossier, "firmware", "shim", fichier))
+            with open(chemin) as f:
+                assert "tb_data/tb_input_features.dat" in f.read()
+        finally:
+            shutil.rmtree(dossier)
+
+    def test_comparaison(self):
+        from banc_de_test import comparer
+        ref = np.array([[0.5], [1.25], [-2.0]])
+        assert comparer(ref.ravel(), ref)["bit_exact"]
+        ecart = comparer(ref + np.array([[0.0], [0.25], [0.0]]), ref)
+        assert not ecart["bit_exact"]
+        assert ecart["n_differences"] == 1
+        assert ecart["ecart_max"] == 0.25
+
+    def test_resume_debit_non_mesure(self):
+        from banc_de_test import resume
+        texte = resume({"statut": "ok", "compilateur": "g++", "compilation_s": 1.2,
+                        "debit_inferences_s": None, "bit_exact": True})
+        assert "débit non mesuré" in texte and "bit-exact" in texte
+
+    def test_firmware_simule_sans_csim(self, tmp_path, monkeypatch):
+        pytest.importorskip("tensorflow")
+        from tensorflow import keras
+        from sklearn.preprocessing import StandardScaler
+        import banc_de_test
+        import hls_converter
+
+        def interdit(*args, **kwargs):
+            raise AssertionError("csim exécutée alors que csim=False")
+
+        monkeypatch.setattr(hls_converter, "HLS_PROJ_DIR", str(tmp_path))
+        monkeypatch.setattr(banc_de_test, "executer_csim", interdit)
+        model = keras.Sequential([keras.Input((1,)), keras.layers.Dense(4, activation="relu"),
+                                  keras.layers.Dense(1)])
+        V = np.linspace(0.0, 1.0, 20)
+        scaler_V, scaler_I = StandardScaler().fit(V[:, None]), StandardScaler().fit(V[:, None])
+        proj_dir, _ = hls_converter._generer_firmware_simule(
+            "D1", model, scaler_V, scaler_I, V, "ap_fixed<16,6>")
+        with open(os.path.join(proj_dir, "digital_report.json"), encoding="utf-8") as f:
+            assert json.load(f)["csim"] is None
+        # Banc de test écrit pour build_prj.tcl, sans compilation
+        assert os.path.exists(os.path.join(proj_dir, "myproject_test.cpp"))
+        assert not os.path.exists(os.path.join(proj_dir, "csim.out"))
+
+
+class TestPoidsHLS:
+    """Tests pour l'émission en flux de weights.h (texte et binaire)."""
+
+    W = np.array([[0.5, -1.25, 3.0], [1e-3, 0.0, -7.5]])
+    b = np.array([0.125, -2.0, 4.0])
+
+    def _ecrire(self, dossier, binaire):
+        from poids_hls import EcrivainPoids
+        with EcrivainPoids(dossier, ["// test"], binaire) as ecrivain:
+            ecrivain.tableau("weight1", "weight_t", self.W, "%.17g", dat="w1")
+            ecrivain.tableau("bias1", "weight_t", self.b, "%.17g", dat="b1")
+            ecrivain.ligne("#define ACT_MAX1 63")
+        with open(os.path.join(dossier, "weights.h")) as f:
+            return f.read()
+
+    def test_texte_identique_savetxt(self):
+        import re
+        dossier = tempfile.mkdtemp()
+        try:
+            texte = self._ecrire(dossier, False)
+            assert "static weight_t weight1[2][3] = {" in texte
+            assert "#define ACT_MAX1 63" in texte
+            valeurs = re.search(r"weight1\[2\]\[3\] = \{(.*?)\};", texte, re.S).group(1)
+            lu = [float(v) for v in re.findall(r"[-+0-9.e]+", valeurs)]
+            np.testing.assert_array_equal(lu, self.W.ravel())
+            np.testing.assert_array_equal(np.loadtxt(os.path.join(dossier, "w1.dat")), self.W)
+            np.testing.assert_array_equal(np.loadtxt(os.path.join(dossier, "b1.dat")), self.b)
+        finally:
+            shutil.rmtree(dossier)
+
+    def test_binaire(self):
+        dossier = tempfile.mkdtemp()
+        try:
+            texte = self._ecrire(dossier, True)
+            assert "static weight_t weight1[2][3];" in texte
+            assert 'lire_bin(dossier, "weight1.bin", &weight1[0][0], 6)' in texte
+            assert not os.path.exists(os.path.join(dossier, "w1.dat"))
+            np.testing.assert_array_equal(
+                np.fromfile(os.path.join(dossier, "weight1.bin"), dtype="<f8").reshape(2, 3), self.W)
+        finally:
+            shutil.rmtree(dossier)
+
+    @pytest.mark.skipif(shutil.which("g++") is None, reason="g++ absent")
+    def test_chargement_binaire_compile(self):
+        import subprocess
+        dossier = tempfile.mkdtemp()
+        try:
+            w_dir = os.path.join(dossier, "weights")
+            os.makedirs(w_dir)
+            with open(os.path.join(dossier, "parameters.h"), "w") as f:
+                f.write("typedef double weight_t;\n")
+            self._ecrire(w_dir, True)
+            with open(os.path.join(dossier, "main.cpp"), "w") as f:
+                f.write('#include "weights/weights.h"\n'
+                        "int main() {\n"
+                        '    if (!load_weights("weights")) return 1;\n'
+                        '    std::printf("%.17g %.17g\\n", weight1[1][2], bias1[2]);\n'
+                        "    return 0;\n}\n")
+            subprocess.run(["g++", "-std=c++14", "main.cpp", "-o", "main.out"], cwd=dossier, check=True)
+            sortie = subprocess.run(["./main.out"], cwd=dossier, capture_output=True, text=True, check=True)
+            assert [float(v) for v in sortie.stdout.split()] == [-7.5, 4.0]
+        finally:
+            shutil.rmtree(dossier)
+
+    def test_corps_dense_creux_plafonne(self, monkeypatch):
+        import poids_hls
+        W_nz = np.zeros((4, 2), dtype=bool)
+        W_nz[0] = True
+        sortie = lambda j: [f"y[{j}] = acc;"]
+        lignes = poids_hls.corps_dense(3, W_nz, "x", sortie)
+        assert lignes.count("    acc += weight3[0][1] * x[0];") == 1 and "for" not in "".join(lignes)
+        monkeypatch.setattr(poids_hls, "MAC_DEROULES_MAX", 1)
+        lignes = poids_hls.corps_dense(3, W_nz, "x", sortie)
+        assert "    for (int i = 0; i < 4; i++) if (weight3[i][j] != 0) acc += weight3[i][j] * x[i];" in lignes
+        assert lignes[-2:] == ["    y[j] = acc;", "  }"]
+
+
+class TestRegenerationIncrementale:
+    """Tests pour la clé de génération et la copie sélective des projets HLS."""
+
+    def test_cle_generation(self):
+        from digital_hls_service import generation_key
+        config = {"precision": "ap_fixed<16,6>", "target_part": "xc7a35t", "clock_period": 10.0}
+        cle = generation_key("abc", config)
+        assert cle == generation_key("abc", dict(reversed(list(config.items()))))
+        assert cle != generation_key("abd", config)
+        assert cle != generation_key("abc", {**config, "clock_period": 5.0})
+
+    def test_copie_fichiers_modifies(self):
+        from digital_hls_service import _sync_tree, _write_if_changed
+        src, dst = tempfile.mkdtemp(), tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(src, "firmware"))
+            for rel, texte in (("firmware/a.h", "a"), ("b.tcl", "b")):
+                with open(os.path.join(src, rel), "w") as f:
+                    f.write(texte)
+            assert sorted(_sync_tree(src, dst)) == ["b.tcl", os.path.join("firmware", "a.h")]
+            assert _sync_tree(src, dst) == []
+            with open(os.path.join(src, "b.tcl"), "w") as f:
+                f.write("b2")
+            assert _sync_tree(src, dst) == ["b.tcl"]
+            chemin = os.path.join(dst, "report.json")
+            assert _write_if_changed(chemin, "{}")
+            assert not _write_if_changed(chemin, "{}")
+        finally:
+            shutil.rmtree(src)
+            shutil.rmtree(dst)
+
+
+class TestFileJobsHLS:
+    """Tests pour la file de jobs HLS (sans démarrer les workers)."""
+
+    @pytest.fixture
+    def file_jobs(self, tmp_path, monkeypatch):
+        import digital_hls_queue
+        from digital_hls_service import _ensure_digital_table, _insert_job
+        monkeypatch.setattr(digital_hls_queue, "DB_PATH", str(tmp_path / "jobs.sqlite"))
+        monkeypatch.setattr(digital_hls_queue, "MAX_CONCURRENT_JOBS", 1)
+        conn = digital_hls_queue._connect()
+        _ensure_digital_table(conn)
+        ids = [_insert_job(conn, f"m{i}", "m.keras", "hls4ml", "ap_fixed<16,6>", "xc7a35t", 10.0,
+                           "io_parallel", status="queued", options={}) for i in range(3)]
+        yield digital_hls_queue, conn, ids
+        conn.close()
+
+    def test_reservation_ordre_et_limite(self, file_jobs):
+        q, conn, ids = file_jobs
+        job = q._claim_next_job(conn)
+        assert job["id"] == ids[0]
+        assert q.get_job(ids[0])["status"] == "running"
+        assert q._claim_next_job(conn) is None   # limite de concurrence atteinte
+        q._update_job_error(conn, ids[0], "x")
+        assert q._claim_next_job(conn)["id"] == ids[1]
+
+    def test_annulation(self, file_jobs):
+        q, conn, ids = file_jobs
+        assert q.cancel_job(ids[1])
+        assert q.get_job(ids[1])["status"] == "cancelled"
+        q._claim_next_job(conn)
+        assert q.cancel_job(ids[0])
+        assert q.get_job(ids[0])["cancel_requested"] == 1
+        progression = q._progress_callback(conn, ids[0])
+        with pytest.raises(q.JobCancelled):
+            progression(0.5, "étape")
+        assert q.get_job(ids[0])["progress"] == 0.5
+        q._update_job_error(conn, ids[0], "Annulé", status="cancelled")
+        assert not q.cancel_job(ids[0])
+
+    def test_jobs_orphelins(self, file_jobs):
+        q, conn, ids = file_jobs
+        q._claim_next_job(conn)
+        conn.execute("UPDATE digital_hls_jobs SET worker_pid = ? WHERE id = ?", (os.getpid(), ids[0]))
+        q._fail_orphaned_jobs(conn)
+        assert q.get_job(ids[0])["status"] == "running"
+        q._fail_orphaned_jobs(conn, first_start=True)
+        assert q.get_job(ids[0])["status"] == "error"
+
+
+class TestRetentionHLS:
+    """Tests pour la rétention du stockage HLS (digital_hls_gc)."""
+
+    class _Televersement:
+        def __init__(self, nom, contenu):
+            self.name, self._contenu = nom, contenu
+
+        def getbuffer(self):
+            return memoryview(self._contenu)
+
+    @pytest.fixture
+    def stockage(self, tmp_path, monkeypatch):
+        import digital_hls_gc
+        import digital_hls_service
+        chemins = {"DB_PATH": str(tmp_path / "jobs.sqlite"), "HLS_ROOT": str(tmp_path / "hls"),
+                   "UPLOADS_ROOT": str(tmp_path / "uploads"),
+                   "UPLOADS_STORE": str(tmp_path / "uploads" / ".store")}
+        for nom, chemin in chemins.items():
+            monkeypatch.setattr(digital_hls_gc, nom, chemin)
+            monkeypatch.setattr(digital_hls_service, nom, chemin)
+        os.makedirs(chemins["HLS_ROOT"])
+        os.makedirs(chemins["UPLOADS_STORE"])
+        monkeypatch.setattr(digital_hls_gc, "GRACE_PERIOD_S", 0.0)
+        conn = digital_hls_gc._connect()
+        digital_hls_service._ensure_digital_table(conn)
+        yield digital_hls_gc, digital_hls_service, conn
+        conn.close()
+
+    def _projet(self, svc, conn, nom, octets, age_jours):
+        projet = os.path.join(svc.HLS_ROOT, nom)
+        os.makedirs(projet)
+        with open(os.path.join(projet, "myproject.cpp"), "wb") as f:
+            f.write(b"x" * octets)
+        zip_path = shutil.make_archive(projet, "zip", projet)
+        job_id = svc._insert_job(conn, nom, "m.keras", "hls4ml", "ap_fixed<16,6>", "xc7a35t", 10.0, "io_parallel")
+        svc._update_job_success(conn, job_id, projet, zip_path, {}, {})
+        conn.execute("UPDATE digital_hls_jobs SET finished_at = datetime('now', ?) WHERE id = ?",
+                     (f"-{age_jours} days", job_id))
+        conn.commit()
+        return job_id, projet
+
+    def test_deduplication_televersements(self, stockage):
+        gc, svc, _ = stockage
+        chemin1, _ = svc.save_uploaded_model(self._Televersement("a.keras", b"modele"))
+        chemin2, _ = svc.save_uploaded_model(self._Televersement("a.keras", b"modele"))
+        chemin3, _ = svc.save_uploaded_model(self._Televersement("b.keras", b"modele"))
+        assert chemin1 == chemin2 and chemin1 != chemin3
+        assert os.path.samefile(chemin1, chemin3)
+        assert len(os.listdir(svc.UPLOADS_STORE)) == 1
+        with pytest.raises(ValueError):
+            svc.save_uploaded_model(self._Televersement("a.onnx", b"modele"))
+
+    def test_quota_projets_lru(self, stockage):
+        gc, svc, conn = stockage
+        ancien, projet_ancien = self._projet(svc, conn, "ancien", 4000, 5)
+        recent, projet_recent = self._projet(svc, conn, "recent", 4000, 1)
+        os.makedirs(os.path.join(svc.HLS_ROOT, ".staging_abc"))
+        os.makedirs(os.path.join(svc.HLS_ROOT, "orphelin"))
+        taille = svc.project_bytes(projet_recent, projet_recent + ".zip")
+
+        apercu = gc.collect_garbage(hls_quota_bytes=taille, dry_run=True)
+        assert sorted(apercu["projects"]["removed"]) == [".staging_abc", "ancien", "orphelin"]
+        assert os.path.isdir(projet_ancien)
+
+        rapport = gc.collect_garbage(hls_quota_bytes=taille)
+        assert rapport["projects"]["bytes"] == taille
+        assert sorted(os.listdir(svc.HLS_ROOT)) == ["recent", "recent.zip"]
+        statut = dict(conn.execute("SELECT id, status FROM digital_hls_jobs").fetchall())
+        assert statut == {ancien: "expired", recent: "done"}
+
+        gc.collect_garbage(max_age_days=0.5)   # limite d'âge seule
+        assert os.listdir(svc.HLS_ROOT) == []
+
+    def test_televersements_inutilises(self, stockage):
+        gc, svc, conn = stockage
+        utilise, _ = svc.save_uploaded_model(self._Televersement("a.keras", b"actif"))
+        inutilise, _ = svc.save_uploaded_model(self._Televersement("b.keras", b"ancien"))
+        svc._insert_job(conn, "a", utilise, "hls4ml", "ap_fixed<16,6>", "xc7a35t", 10.0, "io_parallel",
+                        status="queued")
+        for chemin in (utilise, inutilise):
+            os.utime(chemin, (0, 0))
+
+        rapport = gc.collect_garbage(max_age_days=1)
+        assert rapport["uploads"]["removed"] == [os.path.basename(inutilise)]
+        assert rapport["uploads"]["store_removed"] == 1
+        assert os.path.exists(utilise) and not os.path.exists(inutilise)
+        assert len(os.listdir(svc.UPLOADS_STORE)) == 1
+
+
+class TestDistillation:
+    """Tests pour l'ordre des élèves et la règle d'arrêt de distillation.py (evaluer simulé)."""
+
+    def test_ordre_par_parametres(self):
+        from distillation import ETUDIANTS, ordonner_etudiants
+        from recherche_hyperparams import nb_parametres
+        ordre = ordonner_etudiants(ETUDIANTS)
+        tailles = [nb_parametres(c) for c in ordre]
+        assert tailles == sorted(tailles, reverse=True)
+        assert ordre.index((8, 8)) < ordre.index((16,))
+
+    def test_plus_petit_valide_retenu(self):
+        from distillation import selectionner_eleve
+        essais = []
+
+        def evaluer(couches):
+            essais.append(couches)
+            return (1.0 if couches != (4,) else 9.0), f"modele{couches}"
+
+        couches, e_rel, modele = selectionner_eleve([(16,), (8, 8), (4,), (32, 16)], evaluer, limite=5.0)
+        assert couches == (16,) and modele == "modele(16,)"
+        # (8, 8) (97 paramètres) passe avant (16,) (49), arrêt au premier échec
+        assert essais == [(32, 16), (8, 8), (16,), (4,)]
+
+    def test_arret_premier_echec(self):
+        from distillation import selectionner_eleve
+        essais = []
+
+        def evaluer(couches):
+            essais.append(couches)
+            return (9.0 if couches == (16, 8) else 1.0), None
+
+        assert selectionner_eleve([(16, 8), (8,), (4,)], evaluer, limite=5.0) is None
+        assert essais == [(16, 8)]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--tb=short"])
@@ -5,8 +5,10 @@ Architecture : Dense(64,relu) → Dense(128,relu) → Dense(64,relu) → Dense(1
 Sortie : V_pred, I_pred, modèle sauvegardé en .keras
 """
 
+import hashlib
 import json
 import os
+import shutil
 import sqlite3
 import numpy as np
 import joblib
@@ -15,32 +17,346 @@ DB_PATH    = os.path.join(os.path.dirname(__file__), "composants_db.sqlite")
 MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
 os.makedirs(MODELS_DIR, exist_ok=True)
 
+# Architecture par défaut de IV_approximator (couches cachées)
+COUCHES_DEFAUT = (64, 128, 128, 64, 32)
 
-def _build_model():
-    """Construit le MLP Keras."""
+# Fine-tuning (warm-start depuis un modèle existant)
+EPOCHS_FINETUNE = 40
+LR_FINETUNE     = 3e-4
+
+# Checkpoints périodiques (reprise après crash / timeout de session)
+CHECKPOINT_PERIODE = 10   # époques entre deux sauvegardes
+
+# Régions de la caractéristique I-V (split de validation et pondération)
+REGIONS_IV      = ("inverse", "genou", "direct")
+SEUIL_DIRECT    = 0.10    # début du direct : I ≥ SEUIL_DIRECT × I_max
+FRACTION_VAL    = 0.1
+
+# État des callbacks sauvegardé dans les checkpoints
+_ETAT_CALLBACKS = {
+    "EarlyStopping":     ("wait", "best", "best_epoch", "stopped_epoch"),
+    "ReduceLROnPlateau": ("wait", "best", "cooldown_counter"),
+}
+
+
+def _build_model(learning_rate: float = 1e-3,
+                 couches: tuple[int, ...] = COUCHES_DEFAUT,
+                 activation: str = "relu",
+                 jit_compile: bool | str = "auto"):
+    """
+    Construit le MLP Keras (couches cachées Dense + sortie linéaire).
+    Les couches cachées suivent la politique de précision globale (cf.
+    profils_entrainement) ; la sortie reste en float32.
+    """
     import tensorflow as tf
     from tensorflow import keras
 
-    model = keras.Sequential([
-        keras.layers.Input(shape=(1,)),
-        keras.layers.Dense(64,  activation="relu"),
-        keras.layers.Dense(128, activation="relu"),
-        keras.layers.Dense(128, activation="relu"),
-        keras.layers.Dense(64,  activation="relu"),
-        keras.layers.Dense(32,  activation="relu"),
-        keras.layers.Dense(1,   activation="linear"),
-    ], name="IV_approximator")
+    model = keras.Sequential(
+        [keras.layers.Input(shape=(1,))]
+        + [keras.layers.Dense(n, activation=activation) for n in couches]
+        + [keras.layers.Dense(1, activation="linear", dtype="float32")],
+        name="IV_approximator",
+    )
 
     model.compile(
-        optimizer=keras.optimizers.Adam(learning_rate=1e-3),
+        optimizer=keras.optimizers.Adam(learning_rate=learning_rate),
         loss="mse",
-        metrics=["mae"]
+        metrics=["mae"],
+        jit_compile=jit_compile,
     )
     return model
 
 
+def _en_float32(model):
+    """Copie float32 d'un MLP entraîné en précision mixte (pour l'export HLS)."""
+    from tensorflow import keras
+
+    politique = keras.mixed_precision.global_policy().name
+    keras.mixed_precision.set_global_policy("float32")
+    try:
+        copie = _build_model(
+            couches=tuple(l.units for l in model.layers[:-1]),
+            activation=keras.activations.serialize(model.layers[0].activation),
+        )
+    finally:
+        keras.mixed_precision.set_global_policy(politique)
+    copie.set_weights(model.get_weights())
+    copie.optimizer.build(copie.trainable_variables)
+    return copie
+
+
+def _chemin_meta(composant_nom: str) -> str:
+    """Fichier annexe décrivant les paramètres SPICE utilisés à l'entraînement."""
+    return os.path.join(MODELS_DIR, f"{composant_nom}_model.json")
+
+
+def _distance_parametres(p1: dict, p2: dict) -> float:
+    """
+    Distance entre deux jeux de paramètres SPICE.
+    Moyenne quadratique des écarts en décades (log10) sur les clés communes
+    strictement positives, écart relatif symétrique sinon.
+    """
+    ecarts = []
+    for cle in set(p1) & set(p2):
+        a, b = p1[cle], p2[cle]
+        if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
+            continue
+        if a > 0 and b > 0:
+            ecarts.append(np.log10(a / b))
+        elif a != b:
+            ecarts.append((a - b) / (abs(a) + abs(b)))
+        else:
+            ecarts.append(0.0)
+    if not ecarts:
+        return float("inf")
+    return float(np.sqrt(np.mean(np.square(ecarts))))
+
+
+def _composant_le_plus_proche(cursor, composant_nom: str) -> tuple[str, float] | None:
+    """
+    Cherche, parmi les composants du même type disposant d'un modèle .keras,
+    celui dont les paramètres d'entraînement sont les plus proches de ceux
+    actuellement en base pour `composant_nom`.
+    Le modèle existant du composant lui-même est candidat : ses paramètres
+    d'entraînement sont lus dans le fichier annexe {nom}_model.json.
+    """
+    cursor.execute("SELECT type, params_json FROM composants WHERE nom = ?",
+                   (composant_nom,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    comp_type, params = row[0], json.loads(row[1])
+
+    cursor.execute("SELECT nom, params_json FROM composants WHERE type = ?",
+                   (comp_type,))
+    meilleur = None
+    for nom, params_json in cursor.fetchall():
+        if not os.path.exists(os.path.join(MODELS_DIR, f"{nom}_model.keras")):
+            continue
+        params_modele = json.loads(params_json)
+        if os.path.exists(_chemin_meta(nom)):
+            with open(_chemin_meta(nom), "r", encoding="utf-8") as f:
+                params_modele = json.load(f).get("parametres", params_modele)
+        elif nom == composant_nom:
+            # Paramètres d'entraînement inconnus : distance non mesurable
+            continue
+        d = _distance_parametres(params, params_modele)
+        if meilleur is None or d < meilleur[1]:
+            meilleur = (nom, d)
+    return meilleur
+
+
+def _resoudre_init_from(cursor, composant_nom: str, init_from: str) -> str | None:
+    """
+    Résout `init_from` en chemin de modèle .keras.
+    Accepte 'auto' (composant le plus proche), un nom de composant
+    ou un chemin direct vers un fichier .keras/.h5.
+    """
+    if init_from == "auto":
+        proche = _composant_le_plus_proche(cursor, composant_nom)
+        if proche is None:
+            return None
+        print(f"[IA] Composant le plus proche: '{proche[0]}' "
+              f"(distance={proche[1]:.3f})")
+        return os.path.join(MODELS_DIR, f"{proche[0]}_model.keras")
+    if os.path.isfile(init_from):
+        return init_from
+    model_path = os.path.join(MODELS_DIR, f"{init_from}_model.keras")
+    if os.path.exists(model_path):
+        return model_path
+    raise FileNotFoundError(f"Modèle d'initialisation introuvable: {init_from}")
+
+
+def _transferer_poids(source, cible) -> bool:
+    """Copie les poids couche à couche si les architectures sont compatibles."""
+    couches_src = [l for l in source.layers if l.get_weights()]
+    couches_dst = [l for l in cible.layers if l.get_weights()]
+    if len(couches_src) != len(couches_dst):
+        return False
+    for l_src, l_dst in zip(couches_src, couches_dst):
+        formes_src = [w.shape for w in l_src.get_weights()]
+        formes_dst = [w.shape for w in l_dst.get_weights()]
+        if formes_src != formes_dst:
+            return False
+    for l_src, l_dst in zip(couches_src, couches_dst):
+        l_dst.set_weights(l_src.get_weights())
+    return True
+
+
+def _dossier_checkpoint(composant_nom: str) -> str:
+    from utils.storage_paths import get_data_dir
+    return os.path.join(get_data_dir(), "checkpoints", composant_nom)
+
+
+def _empreinte_simulation(V_sim: np.ndarray, I_sim: np.ndarray) -> str:
+    """SHA-256 de la simulation (V, I) : un checkpoint n'est repris que sur les mêmes données."""
+    empreinte = hashlib.sha256()
+    for tableau in (V_sim, I_sim):
+        empreinte.update(np.ascontiguousarray(tableau, dtype=np.float64).tobytes())
+    return empreinte.hexdigest()
+
+
+def _charger_etat_checkpoint(dossier: str) -> dict | None:
+    """Lit etat.json du dernier checkpoint complet, ou None."""
+    chemin = os.path.join(dossier, "etat.json")
+    if not os.path.exists(chemin):
+        return None
+    with open(chemin, "r", encoding="utf-8") as f:
+        etat = json.load(f)
+    if not os.path.exists(os.path.join(dossier, etat["model_file"])):
+        return None
+    return etat
+
+
+def _creer_callback_checkpoint(dossier: str, config: dict,
+                               etat_reprise: dict | None,
+                               periode: int = CHECKPOINT_PERIODE):
+    """
+    Callback Keras de checkpoint : toutes les `periode` époques, sauvegarde
+    le modèle (poids + état de l'optimiseur), les meilleurs poids
+    d'EarlyStopping et l'état des callbacks surveillés.
+    etat.json est écrit en dernier (atomiquement) et référence les fichiers
+    de l'époque : un checkpoint interrompu n'est jamais pris en compte.
+    À la reprise, restaure l'état des callbacks après leur on_train_begin.
+    """
+    from tensorflow import keras
+
+    class _Checkpoint(keras.callbacks.Callback):
+        def __init__(self):
+            super().__init__()
+            self.surveilles = []
+
+        def on_train_begin(self, logs=None):
+            if not etat_reprise:
+                return
+            for cb in self.surveilles:
+                nom = type(cb).__name__
+                for attr, val in etat_reprise["callbacks"].get(nom, {}).items():
+                    setattr(cb, attr, val)
+                best_file = etat_reprise.get("best_weights_file")
+                if isinstance(cb, keras.callbacks.EarlyStopping) and best_file:
+                    with np.load(os.path.join(dossier, best_file)) as npz:
+                        cb.best_weights = [npz[f"arr_{i}"] for i in range(len(npz.files))]
+            self.model.optimizer.learning_rate.assign(etat_reprise["learning_rate"])
+
+        def on_epoch_end(self, epoch, logs=None):
+            if (epoch + 1) % periode:
+                return
+            precedent = _charger_etat_checkpoint(dossier)
+            model_file = f"ckpt_{epoch:05d}.keras"
+            self.model.save(os.path.join(dossier, model_file))
+
+            etat = {
+                "epoch":         int(epoch),
+                "model_file":    model_file,
+                "learning_rate": float(self.model.optimizer.learning_rate.numpy()),
+                "config":        config,
+                "callbacks":     {},
+                "best_weights_file": None,
+            }
+            for cb in self.surveilles:
+                nom = type(cb).__name__
+                etat["callbacks"][nom] = {
+                    attr: float(getattr(cb, attr)) if attr == "best" else int(getattr(cb, attr))
+                    for attr in _ETAT_CALLBACKS.get(nom, ()) if hasattr(cb, attr)
+                }
+                if getattr(cb, "best_weights", None) is not None:
+                    etat["best_weights_file"] = f"ckpt_{epoch:05d}_best.npz"
+                    np.savez(os.path.join(dossier, etat["best_weights_file"]),
+                             *cb.best_weights)
+
+            tmp = os.path.join(dossier, "etat.json.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(etat, f, indent=2)
+            os.replace(tmp, os.path.join(dossier, "etat.json"))
+
+            # Nettoyage du checkpoint précédent
+            if precedent:
+                for fichier in (precedent["model_file"], precedent.get("best_weights_file")):
+                    if fichier and fichier not in (model_file, etat["best_weights_file"]):
+                        try:
+                            os.remove(os.path.join(dossier, fichier))
+                        except OSError:
+                            pass
+            print(f"[IA] Checkpoint époque {epoch + 1}: {dossier}")
+
+    return _Checkpoint()
+
+
+def regions_iv(V: np.ndarray, I: np.ndarray,
+               seuil_direct: float = SEUIL_DIRECT) -> np.ndarray:
+    """
+    Indice de région (cf. REGIONS_IV) de chaque point :
+      0 inverse (V < 0), 1 genou (V ≥ 0, I < seuil × I_max), 2 direct.
+    """
+    regions = np.where(V < 0, 0, 1)
+    i_max = np.max(I) if len(I) else 0.0
+    if i_max > 0:
+        regions[(V >= 0) & (I >= seuil_direct * i_max)] = 2
+    return regions
+
+
+def split_stratifie(regions: np.ndarray, fraction: float = FRACTION_VAL,
+                    seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Indices (entraînement, validation) : `fraction` de chaque région tirée
+    au hasard (au moins un point si la région en a deux ou plus), au lieu
+    des derniers points du tableau (validation_split de Keras).
+    """
+    rng = np.random.default_rng(seed)
+    val = []
+    for r in np.unique(regions):
+        idx = np.flatnonzero(regions == r)
+        n_val = int(round(fraction * len(idx)))
+        if len(idx) >= 2:
+            n_val = min(max(n_val, 1), len(idx) - 1)
+        val.append(rng.choice(idx, size=n_val, replace=False))
+    val = np.sort(np.concatenate(val)) if val else np.array([], dtype=int)
+    train = np.setdiff1d(np.arange(len(regions)), val)
+    return train, val
+
+
+def poids_regions(regions: np.ndarray, poids: dict | None = None) -> np.ndarray:
+    """
+    Poids d'échantillon par point : chaque région pèse autant au total
+    (inverse de son effectif), multiplié par poids[nom_region] si fourni.
+    Normalisés à une moyenne de 1.
+    """
+    w = np.zeros(len(regions), dtype=np.float64)
+    for r in np.unique(regions):
+        masque = regions == r
+        w[masque] = (poids or {}).get(REGIONS_IV[r], 1.0) / masque.sum()
+    return w / w.mean() if len(w) else w
+
+
+def _creer_callback_regions(V_val: np.ndarray, I_val: np.ndarray,
+                            regions_val: np.ndarray):
+    """
+    Callback ajoutant aux logs la MSE de validation par région
+    (val_loss_inverse, val_loss_genou, val_loss_direct), visibles dans
+    l'historique Keras.
+    """
+    from tensorflow import keras
+
+    class _PerteRegions(keras.callbacks.Callback):
+        def on_epoch_end(self, epoch, logs=None):
+            if logs is None:
+                return
+            I_pred = np.asarray(self.model(V_val, training=False)).reshape(-1)
+            err = (I_pred - I_val.reshape(-1)) ** 2
+            for r in np.unique(regions_val):
+                logs[f"val_loss_{REGIONS_IV[r]}"] = float(err[regions_val == r].mean())
+
+    return _PerteRegions()
+
+
 def entrainer(composant_nom: str, epochs: int = 400,
-              force: bool = False) -> tuple[np.ndarray, np.ndarray]:
+              force: bool = False,
+              init_from: str | None = None,
+              architecture: dict | None = None,
+              resume: bool = False,
+              profil: str | dict | None = None,
+              poids_region: dict | None = None) -> tuple[np.ndarray, np.ndarray]:
     """
     Entraîne le MLP sur la simulation I-V du composant.
 
@@ -48,6 +364,23 @@ def entrainer(composant_nom: str, epochs: int = 400,
         composant_nom: Nom du composant (ex: '1N4007')
         epochs:       Nombre max d'époques (EarlyStopping actif)
         force:        Ré-entraîner même si un modèle existe
+        init_from:    Warm-start : 'auto' (modèle existant le plus proche par
+                      distance de paramètres), nom de composant ou chemin
+                      .keras. Le fine-tuning est limité à EPOCHS_FINETUNE
+                      époques avec un learning rate réduit.
+        architecture: Surcharge de _build_model (couches, activation,
+                      learning_rate), ex: meilleure config de
+                      recherche_hyperparams.
+        resume:       Reprendre depuis le dernier checkpoint du composant
+                      (dossier de données, cf. utils.storage_paths) :
+                      modèle, optimiseur, callbacks, scalers et époque.
+        profil:       Profil d'exécution (threads, précision, XLA) : nom de
+                      profils_entrainement.PROFILS, dict de réglages ou
+                      'auto' (plus rapide mesuré sur la machine). Le débit
+                      obtenu est enregistré pour les profils nommés.
+        poids_region: Multiplicateurs de poids par région de REGIONS_IV
+                      (ex: {'genou': 2.0}) ; par défaut chaque région pèse
+                      autant. La validation est stratifiée par région.
 
     Returns:
         (V_pred, I_pred) sur les mêmes points que V_sim
@@ -55,6 +388,7 @@ def entrainer(composant_nom: str, epochs: int = 400,
     import tensorflow as tf
     from tensorflow import keras
     from sklearn.preprocessing import MinMaxScaler
+    import registre_modeles
 
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
@@ -67,9 +401,21 @@ def entrainer(composant_nom: str, epochs: int = 400,
         raise ValueError(f"Composant '{composant_nom}' introuvable.")
     comp_id = row[0]
 
+    # Modèle d'initialisation (warm-start)
+    init_path = None
+    if init_from:
+        init_path = _resoudre_init_from(cursor, composant_nom, init_from)
+
+    cursor.execute("SELECT params_json FROM composants WHERE id = ?", (comp_id,))
+    params = json.loads(cursor.fetchone()[0])
+
+    # Checkpoint à reprendre
+    ckpt_dir = _dossier_checkpoint(composant_nom)
+    etat_reprise = _charger_etat_checkpoint(ckpt_dir) if resume else None
+
     # Vérifier si modèle déjà présent
     model_path = os.path.join(MODELS_DIR, f"{composant_nom}_model.keras")
-    if not force and os.path.exists(model_path):
+    if not force and not etat_reprise and os.path.exists(model_path):
         cursor.execute(
             "SELECT V_pred_json, I_pred_json FROM modeles_ia "
             "WHERE composant_id = ? ORDER BY created_at DESC LIMIT 1",
@@ -101,12 +447,30 @@ def entrainer(composant_nom: str, epochs: int = 400,
 
     print(f"[IA] Entraînement sur {len(V_sim)} points pour '{composant_nom}'...")
 
-    # Normalisation
-    scaler_V = MinMaxScaler(feature_range=(0, 1))
-    scaler_I = MinMaxScaler(feature_range=(0, 1))
-
-    V_scaled = scaler_V.fit_transform(V_sim.reshape(-1, 1))
-    I_scaled = scaler_I.fit_transform(I_sim.reshape(-1, 1))
+    empreinte_sim = _empreinte_simulation(V_sim, I_sim)
+    if etat_reprise and etat_reprise["config"].get("simulation") != empreinte_sim:
+        print("[IA] Checkpoint ignoré: la simulation a changé depuis.")
+        etat_reprise = None
+    if not etat_reprise:
+        # Nouvel entraînement : aucun checkpoint antérieur ne doit pouvoir
+        # être repris avec les scalers de cette exécution
+        shutil.rmtree(ckpt_dir, ignore_errors=True)
+
+    # Normalisation (scalers du checkpoint en cas de reprise)
+    if etat_reprise:
+        scaler_V = joblib.load(os.path.join(ckpt_dir, "scaler_V.pkl"))
+        scaler_I = joblib.load(os.path.join(ckpt_dir, "scaler_I.pkl"))
+    else:
+        scaler_V = MinMaxScaler(feature_range=(0, 1)).fit(V_sim.reshape(-1, 1))
+        scaler_I = MinMaxScaler(feature_range=(0, 1)).fit(I_sim.reshape(-1, 1))
+
+    V_scaled = scaler_V.transform(V_sim.reshape(-1, 1))
+    I_scaled = scaler_I.transform(I_sim.reshape(-1, 1))
+
+    # Split stratifié par région (reproductible : reprise de checkpoint)
+    regions = regions_iv(V_sim, I_sim)
+    idx_train, idx_val = split_stratifie(regions)
+    poids = poids_regions(regions, poids_region)
 
     # Sauvegarde des scalers
     scaler_path_V = os.path.join(MODELS_DIR, f"{composant_nom}_scaler_V.pkl")
@@ -114,37 +478,131 @@ def entrainer(composant_nom: str, epochs: int = 400,
     joblib.dump(scaler_V, scaler_path_V)
     joblib.dump(scaler_I, scaler_path_I)
 
-    # Construction et entraînement
-    model = _build_model()
-
-    callbacks = [
-        keras.callbacks.EarlyStopping(
-            monitor="val_loss", patience=30,
-            restore_best_weights=True, verbose=0
-        ),
-        keras.callbacks.ReduceLROnPlateau(
-            monitor="val_loss", factor=0.5,
-            patience=15, min_lr=1e-6, verbose=0
-        ),
-    ]
-
-    history = model.fit(
-        V_scaled, I_scaled,
-        epochs=epochs,
-        batch_size=64,
-        validation_split=0.1,
-        callbacks=callbacks,
-        verbose=1
-    )
-
-    # Prédiction sur tous les points
-    I_pred_scaled = model.predict(V_scaled, verbose=0)
-    I_pred = scaler_I.inverse_transform(I_pred_scaled).flatten()
-    V_pred = V_sim.copy()
-
-    # Sauvegarde modèle
-    model.save(model_path)
-    print(f"[IA] Modèle sauvegardé: {model_path}")
+    # Profil d'exécution (avant toute opération TensorFlow)
+    from profils_entrainement import (resoudre_profil, appliquer_profil,
+                                      creer_callback_debit, enregistrer_debit)
+    profil = resoudre_profil(profil)
+    politique_precedente = appliquer_profil(profil) if profil else None
+    try:
+
+        # Construction et entraînement
+        archi = dict(architecture or {})
+        if profil:
+            archi.setdefault("jit_compile", profil["jit_compile"])
+        patience_es, patience_lr = 30, 15
+        initial_epoch = 0
+        if etat_reprise:
+            config_ckpt = etat_reprise["config"]
+            model = keras.models.load_model(
+                os.path.join(ckpt_dir, etat_reprise["model_file"]))
+            epochs, init_path = config_ckpt["epochs"], config_ckpt["init_from"]
+            patience_es, patience_lr = config_ckpt["patience_es"], config_ckpt["patience_lr"]
+            initial_epoch = etat_reprise["epoch"] + 1
+            print(f"[IA] Reprise depuis le checkpoint (époque {initial_epoch}/{epochs}).")
+        elif init_path:
+            source = registre_modeles.charger_modele(init_path)
+            model  = _build_model(**dict(archi, learning_rate=LR_FINETUNE))
+            if _transferer_poids(source, model):
+                epochs = min(epochs, EPOCHS_FINETUNE)
+                patience_es, patience_lr = 10, 5
+                print(f"[IA] Warm-start depuis {init_path} "
+                      f"(fine-tuning {epochs} époques max).")
+            else:
+                print(f"[IA] Architecture incompatible ({init_path}) — "
+                      f"entraînement complet.")
+                model = _build_model(**archi)
+        else:
+            model = _build_model(**archi)
+
+        callbacks = [
+            keras.callbacks.EarlyStopping(
+                monitor="val_loss", patience=patience_es,
+                restore_best_weights=True, verbose=0
+            ),
+            keras.callbacks.ReduceLROnPlateau(
+                monitor="val_loss", factor=0.5,
+                patience=patience_lr, min_lr=1e-6, verbose=0
+            ),
+        ]
+
+        # Checkpoint (placé en dernier : restaure l'état après les on_train_begin)
+        os.makedirs(ckpt_dir, exist_ok=True)
+        joblib.dump(scaler_V, os.path.join(ckpt_dir, "scaler_V.pkl"))
+        joblib.dump(scaler_I, os.path.join(ckpt_dir, "scaler_I.pkl"))
+        checkpoint = _creer_callback_checkpoint(ckpt_dir, {
+            "epochs":      epochs,
+            "init_from":   init_path,
+            "patience_es": patience_es,
+            "patience_lr": patience_lr,
+            "simulation":  empreinte_sim,
+        }, etat_reprise)
+        checkpoint.surveilles = list(callbacks)
+        callbacks.append(checkpoint)
+        mesure_debit = creer_callback_debit(len(idx_train))
+        callbacks.append(mesure_debit)
+        # En tête : les pertes par région sont dans les logs de fin d'époque
+        # vus par les autres callbacks et par History
+        callbacks.insert(0, _creer_callback_regions(
+            V_scaled[idx_val], I_scaled[idx_val], regions[idx_val]))
+        from telemetrie import creer_callback_telemetrie
+        callbacks.append(creer_callback_telemetrie(composant_nom, len(idx_train), {
+            "epochs":       epochs,
+            "architecture": archi or None,
+            "init_from":    init_path,
+            "reprise":      initial_epoch,
+            "profil":       profil["nom"] if profil else None,
+            "n_points":     len(V_sim),
+            "poids_region": poids_region,
+        }))
+
+        history = model.fit(
+            V_scaled[idx_train], I_scaled[idx_train],
+            sample_weight=poids[idx_train],
+            epochs=epochs,
+            initial_epoch=initial_epoch,
+            batch_size=64,
+            validation_data=(V_scaled[idx_val], I_scaled[idx_val], poids[idx_val]),
+            callbacks=callbacks,
+            verbose=1
+        )
+        pertes_regions = {
+            nom: float(min(history.history[f"val_loss_{nom}"]))
+            for nom in REGIONS_IV if f"val_loss_{nom}" in history.history
+        }
+        print("[IA] Validation par région (MSE min): " + " | ".join(
+            f"{nom}={v:.3e}" for nom, v in pertes_regions.items()))
+
+        # Prédiction sur tous les points
+        I_pred_scaled = model.predict(V_scaled, verbose=0)
+        I_pred = scaler_I.inverse_transform(I_pred_scaled).flatten()
+        V_pred = V_sim.copy()
+
+        # Débit, copie float32 du modèle entraîné en précision mixte
+        debit = mesure_debit.debit
+        print(f"[IA] Débit d'entraînement: {debit:,.0f} échantillons/s"
+              + (f" (profil '{profil['nom']}')" if profil else ""))
+        if profil:
+            enregistrer_debit(profil, debit, composant_nom)
+            if profil["precision"] != "float32":
+                model = _en_float32(model)
+
+        # Sauvegarde modèle
+        model.save(model_path)
+        with open(_chemin_meta(composant_nom), "w", encoding="utf-8") as f:
+            json.dump({"parametres": params, "init_from": init_path,
+                       "epochs": len(history.history["loss"]),
+                       "profil": profil,
+                       "val_loss_regions": pertes_regions,
+                       "debit_echantillons_s": round(debit, 1)}, f, indent=2)
+        print(f"[IA] Modèle sauvegardé: {model_path}")
+    finally:
+        # Politique globale du processus : restaurée même si l'entraînement
+        # échoue (OOM, NaN, interruption, erreur XLA)
+        if politique_precedente is not None:
+            keras.mixed_precision.set_global_policy(politique_precedente)
+
+    # Entraînement terminé : checkpoints inutiles
+    shutil.rmtree(ckpt_dir, ignore_errors=True)
 
     # Métriques
     from metriques import toutes_metriques
@@ -153,6 +611,15 @@ def entrainer(composant_nom: str, epochs: int = 400,
           f"E_rel={m['E_rel_%']:.2f}% | R²={m['R2']:.6f}")
 
     # Sauvegarde en base
+    _enregistrer_modele_ia(comp_id, model_path, V_pred, I_pred, m)
+
+    return V_pred, I_pred
+
+
+def _enregistrer_modele_ia(comp_id: int, model_path: str,
+                           V_pred: np.ndarray, I_pred: np.ndarray,
+                           m: dict) -> None:
+    """Remplace la ligne modeles_ia du composant (prédictions + métriques)."""
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     cursor.execute(
@@ -171,8 +638,6 @@ def entrainer(composant_nom: str, epochs: int = 400,
     conn.commit()
     conn.close()
 
-    return V_pred, I_pred
-
 
 def charger_prediction_ia(composant_nom: str) -> tuple[np.ndarray, np.ndarray] | None:
     """Charge la dernière prédiction IA depuis la base."""
@@ -197,7 +662,10 @@ def charger_prediction_ia(composant_nom: str) -> tuple[np.ndarray, np.ndarray] |
 
 if __name__ == "__main__":
     import sys
-    nom = sys.argv[1] if len(sys.argv) > 1 else "1N4007"
-    V, I = entrainer(nom, force=True)
+    nom  = sys.argv[1] if len(sys.argv) > 1 else "1N4007"
+    args = [a for a in sys.argv[2:] if not a.startswith("--")]
+    profil = next((a.split("=", 1)[1] for a in sys.argv if a.startswith("--profil=")), None)
+    V, I = entrainer(nom, force=True, init_from=args[0] if args else None,
+                     resume="--resume" in sys.argv, profil=profil)
     print(f"\nPrédiction IA pour {nom}: {len(V)} points")
     print(f"  I à V=0.7V (prédit): {np.interp(0.7, V, I)*1000:.4f} mA")
@@ -69,6 +69,9 @@ def init_db(conn: sqlite3.Connection):
             FOREIGN KEY (composant_id) REFERENCES composants(id)
         )
     """)
+    # Modèle source et options firmware du résultat (cache de convertir_hls)
+    from hls_converter import _ensure_colonnes_hls
+    _ensure_colonnes_hls(conn)
 
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS digital_hls_jobs (
@@ -90,6 +93,10 @@ def init_db(conn: sqlite3.Connection):
         )
     """)
 
+    # Tables de télémétrie : schéma défini une seule fois dans telemetrie.py
+    from telemetrie import _ensure_tables
+    _ensure_tables(conn)
+
     conn.commit()
     print("[DB] Tables initialisées.")
 
@@ -0,0 +1,297 @@
+"""
+ÉMULATEUR VIRGULE FIXE — virgule_fixe.py
+Émulation bit-exacte (NumPy, sans TensorFlow) des types Vivado/Vitis HLS
+ap_fixed / ap_ufixed / ap_int / ap_uint et d'un MLP Dense tel qu'exécuté par
+le firmware généré (hls_converter._generer_firmware_simule) :
+  - input[k]   : data_t
+  - acc        = (accum_t) bias[j]            (bias : type bias, défaut weight)
+  - acc       += weight[k][j] * x[k]          (produit pleine précision,
+                                               quantification/débordement
+                                               de accum_t à chaque addition)
+  - out[j]     = act(acc)                     (activation sur l'accumulateur)
+                 en data_t de la couche suivante (layerN_out), en result_t
+                 pour la dernière couche
+Modes de quantification : AP_TRN (défaut), AP_TRN_ZERO, AP_RND, AP_RND_ZERO,
+AP_RND_INF, AP_RND_MIN_INF, AP_RND_CONV.
+Modes de débordement : AP_WRAP (défaut), AP_SAT, AP_SAT_ZERO, AP_SAT_SYM.
+Calcul en float64 (mantisse de 53 bits) : exact tant que chaque produit
+weight × data tient sur W_weight + W_data ≤ 53 bits et que la somme
+accumulateur + produit tient sur 53 bits significatifs ; emuler_dense
+lève ValueError sinon (ex. ap_fixed<40,8> × ap_fixed<40,8>).
+"""
+
+import io
+import json
+import re
+import zipfile
+from functools import lru_cache
+
+import numpy as np
+
+TYPE_DEFAUT = "ap_fixed<16,6>"
+ELEMENTS_BLOC = 1 << 22   # produits (n × n_in × n_out) matérialisés par bloc : 32 Mo en float64
+
+_RE_TYPE = re.compile(
+    r"^\s*(ap_fixed|ap_ufixed|ap_int|ap_uint)\s*<\s*(\d+)\s*(?:,\s*(-?\d+))?"
+    r"\s*(?:,\s*(AP_\w+))?\s*(?:,\s*(AP_\w+))?\s*(?:,\s*\d+)?\s*>\s*$"
+)
+
+_QUANTIFICATIONS = {
+    "AP_TRN":         np.floor,
+    "AP_TRN_ZERO":    np.trunc,
+    "AP_RND":         lambda x: np.floor(x + 0.5),
+    "AP_RND_ZERO":    lambda x: np.sign(x) * np.ceil(np.abs(x) - 0.5),
+    "AP_RND_INF":     lambda x: np.sign(x) * np.floor(np.abs(x) + 0.5),
+    "AP_RND_MIN_INF": lambda x: np.ceil(x - 0.5),
+    "AP_RND_CONV":    np.rint,
+}
+_DEBORDEMENTS = ("AP_WRAP", "AP_SAT", "AP_SAT_ZERO", "AP_SAT_SYM")
+# round(n + y) = n + round(y) pour n entier : sommation vectorisable
+_INVARIANTS_TRANSLATION = ("AP_TRN", "AP_RND", "AP_RND_MIN_INF")
+
+BITS_MANTISSE = 53   # float64 : entiers exacts jusqu'à 2**53
+
+_ACTIVATIONS = {
+    "linear":  lambda x: x,
+    "relu":    lambda x: np.maximum(x, 0.0),
+}
+
+
+@lru_cache(maxsize=256)
+def parse_type(spec: str | None) -> dict | None:
+    """
+    Décode un type HLS, ex: 'ap_fixed<16,6,AP_RND,AP_SAT>'.
+    Retourne {signe, W, I, F, quant, debordement, spec} ; None pour
+    'float' / None (pas de quantification).
+    """
+    if spec is None or spec.strip() in ("float", "double", ""):
+        return None
+    m = _RE_TYPE.match(spec)
+    if not m:
+        raise ValueError(f"Type virgule fixe invalide: '{spec}'")
+    base, W, I, quant, debordement = m.groups()
+    W = int(W)
+    if base in ("ap_int", "ap_uint"):
+        I = W
+    elif I is None:
+        raise ValueError(f"Nombre de bits entiers manquant: '{spec}'")
+    I = int(I)
+    quant = quant or "AP_TRN"
+    debordement = debordement or "AP_WRAP"
+    if W < 1 or W > 52:
+        raise ValueError(f"Largeur {W} hors plage émulée (1..52): '{spec}'")
+    if quant not in _QUANTIFICATIONS:
+        raise ValueError(f"Mode de quantification inconnu '{quant}'")
+    if debordement not in _DEBORDEMENTS:
+        raise ValueError(f"Mode de débordement inconnu '{debordement}'")
+    return {
+        "signe":       base in ("ap_fixed", "ap_int"),
+        "W":           W,
+        "I":           I,
+        "F":           W - I,
+        "quant":       quant,
+        "debordement": debordement,
+        "spec":        spec.strip(),
+    }
+
+
+def bornes(t: dict) -> tuple[float, float]:
+    """Plus petite et plus grande valeur représentables."""
+    pas = 2.0 ** -t["F"]
+    if t["signe"]:
+        return -(2.0 ** (t["W"] - 1)) * pas, (2.0 ** (t["W"] - 1) - 1) * pas
+    return 0.0, (2.0 ** t["W"] - 1) * pas
+
+
+def quantifier(x, spec: str | dict | None) -> np.ndarray:
+    """Conversion (cast) de valeurs réelles vers le type : quantification puis débordement."""
+    t = parse_type(spec) if not isinstance(spec, dict) else spec
+    x = np.asarray(x, dtype=np.float64)
+    if t is None:
+        return x
+    echelle = 2.0 ** t["F"]
+    m = _QUANTIFICATIONS[t["quant"]](x * echelle)
+
+    n = 2.0 ** t["W"]
+    lo = -(n / 2) if t["signe"] else 0.0
+    hi = (n / 2 - 1) if t["signe"] else n - 1
+    mode = t["debordement"]
+    if mode == "AP_WRAP":
+        m = np.mod(m - lo, n) + lo
+    elif mode == "AP_SAT":
+        m = np.clip(m, lo, hi)
+    elif mode == "AP_SAT_ZERO":
+        m = np.where((m < lo) | (m > hi), 0.0, m)
+    else:  # AP_SAT_SYM
+        m = np.clip(m, -hi if t["signe"] else 0.0, hi)
+    return m / echelle
+
+
+def _types_couche(types: dict | None, types_couche: dict | None) -> dict:
+    """Types effectifs d'une couche : défauts < types globaux < types de la couche."""
+    effectifs = {"data": TYPE_DEFAUT, "weight": TYPE_DEFAUT, "bias": None,
+                 "accum": TYPE_DEFAUT, "result": TYPE_DEFAUT}
+    effectifs.update(types or {})
+    effectifs.update(types_couche or {})
+    if effectifs["bias"] is None:
+        effectifs["bias"] = effectifs["weight"]
+    return effectifs
+
+
+def _bits_calcul(types: dict, n_in: int, vectorise: bool) -> int:
+    """Bits significatifs des produits et sommes partielles de emuler_dense (0 : non vérifiable)."""
+    t_d, t_w, t_acc = (parse_type(types[k]) for k in ("data", "weight", "accum"))
+    if t_d is None or t_w is None:
+        return 0
+    bits = t_d["W"] + t_w["W"]                    # produit weight × data
+    if t_acc is None:
+        return bits
+    i_prod = t_d["W"] - t_d["F"] + t_w["W"] - t_w["F"]
+    i_acc = t_acc["W"] - t_acc["F"]
+    if vectorise:
+        # Produits arrondis à la grille de accum_t, sommés avant repliement
+        somme = max(i_prod + int(np.ceil(np.log2(max(n_in, 1)))), i_acc) + 1 + t_acc["F"]
+    else:
+        # acc (grille accum_t) + produit pleine précision
+        somme = max(i_prod, i_acc) + 1 + max(t_acc["F"], t_d["F"] + t_w["F"])
+    return max(bits, somme)
+
+
+def emuler_dense(x: np.ndarray, W: np.ndarray, b: np.ndarray,
+                 activation: str, types: dict) -> np.ndarray:
+    """
+    Couche Dense bit-exacte. x : (n, n_in) déjà au format d'entrée.
+    Accumulation vectorisée quand le mode le permet (AP_WRAP et arrondi
+    invariant par translation), sinon boucle sur les entrées.
+    ValueError si les produits ou sommes dépassent la mantisse float64.
+    """
+    t_acc = parse_type(types["accum"])
+    vectorise = (t_acc is not None and t_acc["debordement"] == "AP_WRAP"
+                 and t_acc["quant"] in _INVARIANTS_TRANSLATION)
+    bits = _bits_calcul(types, W.shape[0], vectorise)
+    if bits > BITS_MANTISSE:
+        raise ValueError(
+            f"Émulation non exacte : {bits} bits significatifs pour data={types['data']}, "
+            f"weight={types['weight']}, accum={types['accum']} (float64 : {BITS_MANTISSE})."
+        )
+    Wq = quantifier(W, types["weight"])
+    bq = quantifier(b, types["bias"])
+
+    acc = np.broadcast_to(quantifier(bq, t_acc), (x.shape[0], len(bq))).copy()
+    if t_acc is None:
+        acc = acc + x @ Wq
+    elif vectorise:
+        # acc est sur la grille de accum_t et ces arrondis commutent avec une
+        # translation entière : quantifier chaque produit puis sommer donne
+        # les mêmes sommes partielles ; le repliement modulaire se fait en fin
+        echelle = 2.0 ** t_acc["F"]
+        arrondi = _QUANTIFICATIONS[t_acc["quant"]]
+        W_e = Wq * echelle                      # exact : puissance de 2
+        bloc = max(1, ELEMENTS_BLOC // Wq.size)
+        for d in range(0, x.shape[0], bloc):
+            produits = np.multiply(x[d:d + bloc, :, None], W_e[None, :, :])
+            acc[d:d + bloc] += arrondi(produits).sum(axis=1) / echelle
+        acc = quantifier(acc, t_acc)
+    else:
+        for k in range(Wq.shape[0]):
+            acc = quantifier(acc + x[:, k:k + 1] * Wq[k][None, :], t_acc)
+
+    if activation not in _ACTIVATIONS:
+        raise ValueError(f"Activation non émulée: '{activation}'")
+    return quantifier(_ACTIVATIONS[activation](acc), types["result"])
+
+
+def emuler_reseau(x, couches: list[dict], types: dict | None = None,
+                  types_par_couche: list[dict] | None = None,
+                  intermediaires: bool = False):
+    """
+    Sortie bit-exacte du MLP.
+
+    Args:
+        x:                Entrées normalisées (n,) ou (n, n_in)
+        couches:          [{'nom', 'W', 'b', 'activation'}, ...] (cf. charger_couches)
+        types:            Types globaux {'data','weight','bias','accum','result'}
+        types_par_couche: Surcharges par couche (liste alignée sur couches) ;
+                          'result' ne s'applique qu'à la dernière couche
+        intermediaires:   Retourner aussi la sortie de chaque couche
+
+    Returns:
+        sorties (n, n_out) [, liste des sorties de couches]
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if x.ndim == 1:
+        x = x[:, None]
+    types_par_couche = types_par_couche or [None] * len(couches)
+    effectifs = [_types_couche(types, tc) for tc in types_par_couche]
+    # Sorties cachées au type d'entrée (data) de la couche suivante, result
+    # pour la dernière seulement, comme les layerN_out du firmware
+    for k in range(len(effectifs) - 1):
+        effectifs[k] = {**effectifs[k], "result": effectifs[k + 1]["data"]}
+    h = quantifier(x, effectifs[0]["data"])
+    sorties = []
+    for couche, t in zip(couches, effectifs):
+        h = emuler_dense(h, couche["W"], couche["b"], couche["activation"], t)
+        sorties.append(h)
+    return (h, sorties) if intermediaires else h
+
+
+def couches_depuis_keras(model) -> list[dict]:
+    """Couches Dense d'un modèle Keras déjà chargé."""
+    couches = []
+    for layer in model.layers:
+        poids = layer.get_weights()
+        if not poids:
+            continue
+        activation = getattr(layer.activation, "__name__", str(layer.activation))
+        couches.append({"nom": layer.name,
+                        "W": np.asarray(poids[0], np.float64),
+                        "b": np.asarray(poids[1], np.float64),
+                        "activation": activation})
+    return couches
+
+
+def charger_couches(model_path: str) -> list[dict]:
+    """
+    Couches Dense d'un fichier .keras (Keras 3) lues directement dans
+    config.json + model.weights.h5, sans TensorFlow (h5py requis).
+    """
+    import h5py
+
+    with zipfile.ZipFile(model_path) as zf:
+        config = json.loads(zf.read("config.json"))
+        poids_h5 = zf.read("model.weights.h5")
+
+    couches = []
+    with h5py.File(io.BytesIO(poids_h5), "r") as f:
+        for c in config["config"]["layers"]:
+            if c.get("class_name") != "Dense":
+                continue
+            nom = c["config"]["name"]
+            vars_ = f[f"layers/{nom}/vars"]
+            couches.append({"nom": nom,
+                            "W": np.asarray(vars_["0"], np.float64),
+                            "b": np.asarray(vars_["1"], np.float64),
+                            "activation": c["config"].get("activation", "linear")})
+    return couches
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import time
+    import joblib
+
+    nom  = sys.argv[1] if len(sys.argv) > 1 else "1N4007"
+    spec = sys.argv[2] if len(sys.argv) > 2 else TYPE_DEFAUT
+    models_dir = os.path.join(os.path.dirname(__file__), "models")
+    couches  = charger_couches(os.path.join(models_dir, f"{nom}_model.keras"))
+    scaler_V = joblib.load(os.path.join(models_dir, f"{nom}_scaler_V.pkl"))
+    scaler_I = joblib.load(os.path.join(models_dir, f"{nom}_scaler_I.pkl"))
+    V = np.linspace(-5.0, 1.2, 20000)
+    t0 = time.perf_counter()
+    y = emuler_reseau(scaler_V.transform(V.reshape(-1, 1)), couches,
+                      {k: spec for k in ("data", "weight", "accum", "result")})
+    dt = time.perf_counter() - t0
+    I = scaler_I.inverse_transform(y).ravel()
+    print(f"[HLS] Émulation {spec}: {len(V)} points en {dt:.3f}s "
+          f"| I(0.7V)={np.interp(0.7, V, I) * 1000:.4f} mA")